@@ -2,7 +2,7 @@
 # License: BSD-3-Clause
 
 
-from musicbox.core import config, dev
+from musicbox.core import benchmark, config, dev
 from .application import application_class, init_application_class
 
 if config.pyside_version() == 2:
@@ -46,11 +46,16 @@ def main():
 
     """
     from argparse import ArgumentParser, BooleanOptionalAction
+    import sys
 
     parser = ArgumentParser()
     parser.add_argument('--gui', action=BooleanOptionalAction, default=True)
     parser.add_argument('--test', choices=['no-gui', 'gui', 'all'])
     parser.add_argument('--dev', action='store_true')
+    parser.add_argument('--benchmark', action='store_true')
+    parser.add_argument('--benchmark-output', metavar='PATH')
+    parser.add_argument('--benchmark-baseline', metavar='PATH')
+    parser.add_argument('--benchmark-max-size', metavar='BYTES', type=int)
     args = parser.parse_args()
 
     if args.test:
@@ -58,6 +63,12 @@ def main():
             dev.run_tests(gui=False)
         if args.test == 'gui' or args.test == 'all':
             dev.run_tests(gui=True)
+    elif args.benchmark:
+        regressions = benchmark.run_benchmarks(output=args.benchmark_output,
+                                               baseline=args.benchmark_baseline,
+                                               max_size=args.benchmark_max_size)
+        if regressions:
+            sys.exit(1)
     else:
         if args.dev:
             dev.set_auto_reload(True)
@@ -22,12 +22,14 @@ class TestCommandLineOptions(unittest.TestCase):
     def tearDownClass(cls):
         importlib.reload(app)
         importlib.reload(app.dev)
+        importlib.reload(app.benchmark)
 
     def setUp(self):
         self._previous_argv = sys.argv
         app.run = self._function_call_tracker('run_app')
         app.dev.run_tests = self._function_call_tracker('run_tests')
         app.dev.set_auto_reload = self._function_call_tracker('set_auto_reload')
+        app.benchmark.run_benchmarks = self._function_call_tracker('run_benchmarks')
         self._function_calls = []
 
     def tearDown(self):
@@ -55,6 +57,16 @@ class TestCommandLineOptions(unittest.TestCase):
     def test_dev_option_triggers_auto_reload(self):
         self._ensure_options_trigger_function_call(['--dev'], 'set_auto_reload', [[True]])
 
+    def test_benchmark_option(self):
+        expected_options = {'output': None, 'baseline': None, 'max_size': None}
+        self._ensure_options_trigger_function_call(['--benchmark'], 'run_benchmarks', [[expected_options]])
+
+    def test_benchmark_options(self):
+        options = ['--benchmark', '--benchmark-output', 'new.json', '--benchmark-baseline', 'old.json',
+                   '--benchmark-max-size', '1024']
+        expected_options = {'output': 'new.json', 'baseline': 'old.json', 'max_size': 1024}
+        self._ensure_options_trigger_function_call(options, 'run_benchmarks', [[expected_options]])
+
     def test_auto_reload_is_off_by_default(self):
         sys.argv = ['']
         app.main()
@@ -90,9 +90,10 @@ def _create_application_class(base_class, gui):
                 from musicbox.gui.console_widget import ConsoleWidget as Console
             else:
                 from musicbox.core.console import Console
+            from musicbox.core.history import History, default_history_path
 
             globals = {'musicbox' : musicbox, 'mb' : musicbox}
-            console = Console(globals=globals)
+            console = Console(globals=globals, history=History(default_history_path()))
             console.run_ended.connect(self.quit)
             console.run()
 
@@ -0,0 +1,77 @@
+# Copyright (c) 2024 IHU Liryc, Université de Bordeaux, Inria.
+# License: BSD-3-Clause
+
+
+import contextlib
+import importlib
+import io
+import json
+from pathlib import Path
+import sys
+import tempfile
+import types
+import unittest
+from unittest import mock
+
+from .benchmark import *
+
+
+class TestBenchmark(unittest.TestCase):
+
+    def test_measure(self):
+        case = BenchmarkCase('sum', sum, setup=lambda: ([1] * 1000,), parameters={'type': 'int'}, size=8000)
+        result = measure(case, repeat=2)
+        self.assertEqual(result['key'], 'sum(type=int, size=8000)')
+        self.assertGreater(result['throughput'], 0)
+        json.dumps(result)
+
+    def test_peak_memory_includes_native_allocations(self):
+        import vtk
+
+        def allocate(size):
+            array = vtk.vtkFloatArray()
+            array.SetNumberOfValues(size // 4)
+            array.Fill(1.0)
+        case = BenchmarkCase('allocate', allocate, setup=lambda: (2**26,), size=2**26)
+        self.assertGreater(measure(case, repeat=1)['peak_memory'], 2**25)
+
+    def test_compare_results(self):
+        baseline = [{'key': 'a', 'seconds': 1.0}, {'key': 'b', 'seconds': 1.0}]
+        results = [{'key': 'a', 'seconds': 1.1}, {'key': 'b', 'seconds': 2.0}, {'key': 'c', 'seconds': 5.0}]
+        self.assertEqual(compare_results(results, baseline, tolerance=0.25), [('b', 2.0, 1.0)])
+
+    def test_small_differences_are_ignored(self):
+        baseline = [{'key': 'a', 'seconds': 1e-6}]
+        results = [{'key': 'a', 'seconds': 2e-6}]
+        self.assertEqual(compare_results(results, baseline), [])
+
+    def test_benchmark_modules_provide_cases(self):
+        modules = find_benchmark_modules()
+        self.assertIn('musicbox.data._benchmark_image', modules)
+        self.assertIn('musicbox.mesh._benchmark_creation', modules)
+        for name in modules:
+            for case in importlib.import_module(name).benchmark_cases([2**10]):
+                measure(case, repeat=1)
+
+    def test_output_and_baseline(self):
+        stub_module = types.ModuleType('_benchmark_stub')
+        stub_module.benchmark_cases = lambda sizes: [BenchmarkCase('sum', sum, setup=lambda: ([1] * size,), size=size)
+                                                     for size in sizes]
+        run = lambda **kwargs: run_benchmarks(sizes=[2**10, 2**12], repeat=1, modules=['_benchmark_stub'], **kwargs)
+
+        with tempfile.TemporaryDirectory() as directory, \
+                mock.patch.dict(sys.modules, {'_benchmark_stub': stub_module}):
+            output = Path(directory) / 'results.json'
+            with contextlib.redirect_stdout(io.StringIO()) as stdout:
+                self.assertEqual(run(output=output), [])
+            self.assertEqual(len(stdout.getvalue().splitlines()), 2)
+            self.assertIn('sum(size=1024): ', stdout.getvalue())
+
+            report = json.loads(output.read_text())
+            self.assertEqual([result['key'] for result in report['results']], ['sum(size=1024)', 'sum(size=4096)'])
+            report['results'][1]['seconds'] = -1.0
+            output.write_text(json.dumps(report))
+            with contextlib.redirect_stdout(io.StringIO()) as stdout:
+                regressions = run(baseline=output)
+            self.assertEqual([key for key, *_ in regressions], ['sum(size=4096)'])
+            self.assertIn('Regression: sum(size=4096) took ', stdout.getvalue())
@@ -3,6 +3,8 @@
 
 
 import sys
+import threading
+import time
 import unittest
 
 from . import config
@@ -32,6 +34,7 @@ class TestCompleter(unittest.TestCase):
         self._main_scope[name] = None
         self._completer.complete(name[:-4])
         self._process_events()
+        self.assertEqual(self._successful_completion, name)
 
     def test_non_unique_code_completion(self):
         names = ('test_name_1', 'test_name_2', 'test_name_3')
@@ -42,7 +45,57 @@ class TestCompleter(unittest.TestCase):
         for name in names:
             self.assertIn(name, self._possible_completions)
 
+    def test_cancelled_completion(self):
+        self._main_scope['cancelled_name_1'] = None
+        self._successful_completion = None
+        self._completer.complete('cancelled_na')
+        self._completer.cancel()
+        self._process_events()
+        self.assertIsNone(self._successful_completion)
+
+    def test_cached_attributes(self):
+        class Object():
+            dir_calls = 0
+
+            def __dir__(self):
+                type(self).dir_calls += 1
+                return ['attribute_1', 'attribute_2', 'other']
+
+        self._main_scope['test_object'] = Object()
+        completions = self._completer.find_completions('test_object.a')
+        self.assertEqual(sorted(completions), ['test_object.attribute_1', 'test_object.attribute_2'])
+        self.assertEqual(self._completer.find_completions('test_object.attribute_2'), ['test_object.attribute_2'])
+        self.assertEqual(Object.dir_calls, 1)
+        self._main_scope['test_object'] = Object()
+        self._completer.find_completions('test_object.o')
+        self.assertEqual(Object.dir_calls, 2)
+
+    def test_private_attributes_are_not_filtered_out(self):
+        self._main_scope['test_object'] = type('TestObject', (), {'_private': 1, 'public': 2})()
+        self.assertEqual(self._completer.find_completions('test_object.'), ['test_object.public'])
+        self.assertEqual(self._completer.find_completions('test_object._p'), ['test_object._private'])
+
+    def test_slow_evaluation_does_not_block(self):
+        started, event = threading.Event(), threading.Event()
+
+        class Object():
+            def __dir__(self):
+                started.set()
+                event.wait(5)
+                return ['attribute']
+
+        self._main_scope['slow_object'] = Object()
+        self._completer.complete('slow_object.a')
+        started.wait(5)
+        start = time.monotonic()
+        self._completer.complete('slow_object.at')
+        self._completer.cancel()
+        self.assertLess(time.monotonic() - start, 1)
+        event.set()
+        self._completer.wait()
+
     def _process_events(self):
+        self._completer.wait()
         QCoreApplication.processEvents(QEventLoop.ExcludeUserInputEvents)
 
     @Slot(str)
@@ -6,8 +6,14 @@ import sys
 import threading
 import unittest
 
+from . import config
 from .console import Console
 
+if config.pyside_version() == 2:
+    from PySide2.QtCore import Qt
+else:
+    from PySide6.QtCore import Qt
+
 
 class TestConsole(unittest.TestCase):
 
@@ -73,3 +79,47 @@ class TestConsole(unittest.TestCase):
         self.assertEqual(console.current_history_entry(), "")
         console.move_down_history()
         self.assertEqual(console.current_history_entry(), "")
+
+    def test_history_is_deduplicated(self):
+        console = self._console
+        for line in ("foo = 1", "foo = 2", "foo = 1"):
+            console.push(line)
+        self.assertEqual(console.history().entries(), ["foo = 2", "foo = 1"])
+        console.move_up_history()
+        self.assertEqual(console.current_history_entry(), "foo = 1")
+
+
+class TestConsoleWorker(unittest.TestCase):
+
+    def setUp(self):
+        self._main_scope = vars(sys.modules['__main__'])
+        self._previous_main_scope = self._main_scope.copy()
+        self._console = Console()
+        self._console.welcome_text = ''
+        self._console.run(use_worker=True)
+        self._done = threading.Semaphore(0)
+        # Direct connections, since the test does not run an event loop.
+        self._console.submitted_line_done.connect(self._done.release, Qt.DirectConnection)
+
+    def tearDown(self):
+        self._console.end_run()
+        self._console = None
+        self._main_scope.clear()
+        self._main_scope.update(self._previous_main_scope)
+
+    def test_submitted_lines_run_in_worker(self):
+        self._console.submit("import threading; worker_name = threading.current_thread().name")
+        self.assertTrue(self._done.acquire(timeout=10))
+        self.assertEqual(self._main_scope['worker_name'], "Console interpreter")
+        self.assertFalse(self._console.is_busy())
+
+    def test_interrupt(self):
+        started = threading.Event()
+        self._main_scope['started'] = started
+        self._console.submit("started.set(); sum(1 for _ in iter(int, 1))")
+        self.assertTrue(started.wait(timeout=10))
+        self._console.interrupt()
+        self.assertTrue(self._done.acquire(timeout=10))
+        self._console.submit("interrupted = True")
+        self.assertTrue(self._done.acquire(timeout=10))
+        self.assertTrue(self._main_scope['interrupted'])
@@ -0,0 +1,102 @@
+# Copyright (c) 2024 IHU Liryc, Université de Bordeaux, Inria.
+# License: BSD-3-Clause
+
+
+import builtins
+import os
+import sys
+import tempfile
+import threading
+import time
+import types
+import unittest
+from unittest import mock
+
+from . import dev
+
+
+class TestFileWatchers(unittest.TestCase):
+
+    def setUp(self):
+        self._directory = tempfile.TemporaryDirectory()
+        self._paths = [os.path.realpath(os.path.join(self._directory.name, f'module_{i}.py')) for i in range(2)]
+        for path in self._paths:
+            with open(path, 'w') as file:
+                file.write('')
+
+    def tearDown(self):
+        self._directory.cleanup()
+
+    def test_inotify_watcher(self):
+        try:
+            watcher = dev._InotifyWatcher()
+        except OSError:
+            self.skipTest('inotify is not available')
+        self._check_watcher(watcher)
+
+    def test_polling_watcher(self):
+        self._check_watcher(dev._PollingWatcher())
+
+    def _check_watcher(self, watcher):
+        try:
+            watcher.watch(self._paths)
+            self.assertEqual(watcher.wait(timeout=0.01), set())
+            time.sleep(0.01)
+            writer = threading.Timer(0.05, self._write, args=(self._paths[1],))
+            writer.start()
+            changed_files = set()
+            end = time.monotonic() + 5
+            while not changed_files and time.monotonic() < end:
+                changed_files = watcher.wait(timeout=0.1)
+            writer.join()
+            self.assertEqual(changed_files, {self._paths[1]})
+        finally:
+            watcher.close()
+
+    def _write(self, path):
+        with open(path, 'w') as file:
+            file.write('x = 1\n')
+        os.utime(path, (time.time() + 1, time.time() + 1))
+
+
+class TestReloadOrder(unittest.TestCase):
+
+    def test_dependents_are_reloaded_after_dependencies(self):
+        dependencies = {'a': set(), 'b': {'a'}, 'c': {'b'}, 'd': {'a', 'c'}, 'e': set()}
+        order = dev._reload_order({'b'}, dependencies)
+        self.assertEqual(order, ['b', 'c', 'd'])
+        order = dev._reload_order({'a', 'e'}, dependencies)
+        self.assertEqual(set(order), {'a', 'b', 'c', 'd', 'e'})
+        for name, module_dependencies in dependencies.items():
+            for dependency in module_dependencies:
+                self.assertLess(order.index(dependency), order.index(name))
+
+    def test_cycles(self):
+        self.assertEqual(dev._reload_order({'a'}, {'a': {'b'}, 'b': {'a'}}), ['a', 'b'])
+
+    def test_module_dependencies(self):
+        base = types.ModuleType('_test_dev_base')
+        exec('def function(): pass', vars(base))
+        user = types.ModuleType('_test_dev_user')
+        user.base = base
+        other = types.ModuleType('_test_dev_other')
+        other.function = base.function
+        modules = {module.__name__: module for module in (base, user, other)}
+        sys.modules.update(modules)
+        try:
+            dependencies = dev._module_dependencies(modules)
+        finally:
+            for name in modules:
+                del sys.modules[name]
+        self.assertEqual(dependencies, {'_test_dev_base': set(), '_test_dev_user': {'_test_dev_base'},
+                                        '_test_dev_other': {'_test_dev_base'}})
+
+    def test_import_generation(self):
+        with mock.patch.object(dev, '_builtins_import', builtins.__import__, create=True), \
+                mock.patch.dict(dev._import_times, clear=True):
+            dev._import_and_track_time('musicbox.core.config')
+            generation = dev._import_generation
+            dev._import_and_track_time('musicbox.core.config')
+            self.assertEqual(dev._import_generation, generation)
+            dev._import_and_track_time('musicbox.core.history')
+            self.assertEqual(dev._import_generation, generation + 1)
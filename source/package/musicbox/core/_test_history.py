@@ -0,0 +1,65 @@
+# Copyright (c) 2024 IHU Liryc, Université de Bordeaux, Inria.
+# License: BSD-3-Clause
+
+
+from pathlib import Path
+import tempfile
+import unittest
+
+from .history import History
+
+
+class TestHistory(unittest.TestCase):
+
+    def test_deduplication(self):
+        history = History()
+        for entry in ('a = 1', 'b = 2', 'a = 1'):
+            history.add(entry)
+        self.assertEqual(history.entries(), ['b = 2', 'a = 1'])
+        self.assertEqual(history[-1], 'a = 1')
+
+    def test_max_size(self):
+        history = History(max_size=3)
+        for i in range(5):
+            history.add(f'x = {i}')
+        self.assertEqual(history.entries(), ['x = 2', 'x = 3', 'x = 4'])
+        self.assertEqual(history.fuzzy_search('x'), ['x = 4', 'x = 3', 'x = 2'])
+
+    def test_sequences_are_renumbered(self):
+        history = History(max_size=3)
+        for i in range(100):
+            history.add(f'x = {i % 5}')
+        self.assertLessEqual(history._next_sequence, 6)
+        self.assertLess(max(history._character_masks.values()).bit_length(), 7)
+        self.assertEqual(history.entries(), ['x = 2', 'x = 3', 'x = 4'])
+        self.assertEqual(history.fuzzy_search('x'), ['x = 4', 'x = 3', 'x = 2'])
+        self.assertEqual(history.prefix_search('x = 3'), ['x = 3'])
+
+    def test_prefix_search(self):
+        history = History()
+        for entry in ('mesh.box()', 'import vtk', 'mesh.sphere()', 'mb.gui'):
+            history.add(entry)
+        self.assertEqual(history.prefix_search('mesh.'), ['mesh.sphere()', 'mesh.box()'])
+        self.assertEqual(history.prefix_search('m', limit=1), ['mb.gui'])
+        self.assertEqual(history.prefix_search('z'), [])
+
+    def test_fuzzy_search(self):
+        history = History()
+        for entry in ('read_image(path)', 'mesh.box()', 'reader = 1', 'print(image)'):
+            history.add(entry)
+        self.assertEqual(history.fuzzy_search('rdimg'), ['read_image(path)'])
+        self.assertEqual(history.fuzzy_search('rea'), ['reader = 1', 'read_image(path)'])
+        self.assertEqual(history.fuzzy_search('image', limit=1), ['print(image)'])
+        self.assertEqual(history.fuzzy_search('zz'), [])
+
+    def test_persistence(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / 'history'
+            history = History(path, max_size=3)
+            for entry in ('a', 'b\nc', 'a', 'd', 'e', 'f', 'g', 'e'):
+                history.add(entry)
+            history.wait()
+            loaded = History(path, max_size=3)
+            self.assertEqual(loaded.entries(), ['f', 'g', 'e'])
+            self.assertEqual(loaded.fuzzy_search('e'), ['e'])
+            self.assertLessEqual(len(path.read_text().splitlines()), 6)
@@ -0,0 +1,231 @@
+# Copyright (c) 2024 IHU Liryc, Université de Bordeaux, Inria.
+# License: BSD-3-Clause
+
+
+import importlib
+import json
+import os
+from pathlib import Path
+import platform
+import sys
+import time
+import traceback
+
+import musicbox
+from musicbox.core import config
+
+
+default_sizes = (2**10, 2**20, 2**25, 2**30)
+
+
+class BenchmarkCase():
+    """A benchmarked operation.
+
+    """
+
+    def __init__(self, name, function, *, setup=tuple, parameters={}, size=0):
+        """
+        Args:
+            name:       The name of the benchmark (usually the name of the
+                        benchmarked function).
+            function:   The timed function, called with the arguments returned
+                        by 'setup'.
+            setup:      A function returning a tuple with the arguments of
+                        'function', which is not timed.
+            parameters: A dict describing the variant of the benchmark (e.g.
+                        the data type), used along with the name and size to
+                        match results with the baseline.
+            size:       The size of the processed data in bytes, used to
+                        compute the throughput.
+
+        """
+        self.name = name
+        self.function = function
+        self.setup = setup
+        self.parameters = parameters
+        self.size = size
+
+
+def run_benchmarks(*, sizes=default_sizes, max_size=None, repeat=3, output=None, baseline=None, tolerance=0.25,
+                   modules=None):
+    """Run the benchmarks.
+
+    The benchmark cases are produced by the 'benchmark_cases(sizes)' function
+    of the benchmark modules (see find_benchmark_modules). Each case is timed
+    'repeat' times (the best time is kept), then run once more in a forked
+    process to measure the growth of its peak resident memory, which includes
+    the internal allocations of VTK and SimpleITK.
+
+    Args:
+        sizes:     The data sizes to benchmark (in bytes).
+        max_size:  Sizes larger than this are skipped.
+        repeat:    The number of timed runs of each case.
+        output:    An optional path where the results are written as JSON.
+        baseline:  An optional path to the JSON results of a previous run.
+        tolerance: The relative slowdown compared to the baseline above which
+                   a case is reported as a regression.
+        modules:   The names of the benchmark modules to run (the default is
+                   all the modules found by find_benchmark_modules).
+
+    Returns:
+        The list of regressions, as (key, time, baseline time) tuples.
+
+    """
+    if max_size is not None:
+        sizes = [size for size in sizes if size <= max_size]
+
+    results = []
+
+    for name in modules if modules is not None else find_benchmark_modules():
+        module = importlib.import_module(name)
+        for case in module.benchmark_cases(sizes):
+            result = measure(case, repeat=repeat)
+            results.append(result)
+            print(f'{result["key"]}: {result["seconds"]:.6f} s, '
+                  f'{result["throughput"] / 2**20:.1f} MiB/s, '
+                  f'{_format_memory(result["peak_memory"])} peak')
+
+    report = {
+        'platform': platform.platform(),
+        'python': sys.version,
+        'musicbox': config.application_version(),
+        'results': results,
+    }
+
+    if output:
+        with open(output, 'w') as file:
+            json.dump(report, file, indent=2)
+
+    regressions = []
+
+    if baseline:
+        with open(baseline) as file:
+            regressions = compare_results(results, json.load(file)['results'], tolerance=tolerance)
+        for key, seconds, baseline_seconds in regressions:
+            print(f'Regression: {key} took {seconds:.6f} s (baseline: {baseline_seconds:.6f} s)')
+
+    return regressions
+
+
+def measure(case, *, repeat=3):
+    """Time a benchmark case and measure its peak memory.
+
+    The peak memory is the growth of the peak resident set size of a forked
+    process running the case once (after its setup), in bytes. It is None on
+    the platforms which cannot fork processes.
+
+    Returns:
+        A dict of results which can be serialized as JSON.
+
+    """
+    seconds = float('inf')
+
+    for i in range(repeat):
+        arguments = case.setup()
+        start = time.perf_counter()
+        case.function(*arguments)
+        seconds = min(seconds, time.perf_counter() - start)
+        del arguments
+
+    peak_memory = _peak_memory(case)
+
+    return {
+        'key': _result_key(case.name, case.parameters, case.size),
+        'name': case.name,
+        'parameters': case.parameters,
+        'size': case.size,
+        'seconds': seconds,
+        'throughput': case.size / max(seconds, 1e-9),
+        'peak_memory': peak_memory,
+    }
+
+
+def compare_results(results, baseline_results, *, tolerance=0.25, minimum_difference=1e-4):
+    """Find the results that are slower than the baseline.
+
+    Results without a baseline counterpart are ignored, as well as differences
+    smaller than 'minimum_difference' (in seconds), which are mostly noise.
+
+    Returns:
+        The list of regressions, as (key, time, baseline time) tuples.
+
+    """
+    baseline_seconds = {result['key']: result['seconds'] for result in baseline_results}
+    regressions = []
+
+    for result in results:
+        reference = baseline_seconds.get(result['key'])
+        if reference is None:
+            continue
+        difference = result['seconds'] - reference
+        if difference > reference * tolerance and difference > minimum_difference:
+            regressions.append((result['key'], result['seconds'], reference))
+
+    return regressions
+
+
+def find_benchmark_modules():
+    """Find the MusicBox benchmark modules (using the '_benchmark_' prefix).
+
+    """
+    musicbox_root = Path(musicbox.__path__[0])
+    modules = []
+
+    for module_path in sorted(musicbox_root.glob('**/_benchmark_*.py')):
+        relative_path = module_path.relative_to(musicbox_root.parent)
+        modules.append('.'.join(relative_path.parts)[:-3])
+
+    return modules
+
+
+def _peak_memory(case):
+    """Run a benchmark case in a forked process and measure the growth of its
+    peak resident memory.
+
+    The peak of a forked process starts from its current memory, so the peaks
+    of the previous cases and of the timed runs are not included.
+
+    """
+    if not hasattr(os, 'fork'):
+        return None
+
+    read_end, write_end = os.pipe()
+    pid = os.fork()
+
+    if pid == 0:
+        status = 1
+        try:
+            os.close(read_end)
+            arguments = case.setup()
+            start_peak = _max_resident_memory()
+            case.function(*arguments)
+            os.write(write_end, str(_max_resident_memory() - start_peak).encode())
+            status = 0
+        except BaseException:
+            traceback.print_exc()
+        finally:
+            os._exit(status)
+
+    os.close(write_end)
+    with os.fdopen(read_end, 'rb') as file:
+        output = file.read()
+    os.waitpid(pid, 0)
+    if not output:
+        raise RuntimeError(f'The memory measurement of {case.name} failed.')
+    return int(output)
+
+
+def _max_resident_memory():
+    import resource
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS.
+    scale = 1 if sys.platform == 'darwin' else 1024
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+
+
+def _format_memory(size):
+    return 'n/a' if size is None else f'{size / 2**20:.1f} MiB'
+
+
+def _result_key(name, parameters, size):
+    arguments = [f'{k}={v}' for k, v in sorted(parameters.items())] + [f'size={size}']
+    return f'{name}({", ".join(arguments)})'
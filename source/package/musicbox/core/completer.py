@@ -2,8 +2,12 @@
 # License: BSD-3-Clause
 
 
+import __main__
+from collections import OrderedDict
+from concurrent.futures import CancelledError, ThreadPoolExecutor
 import re
 import rlcompleter
+import threading
 
 from musicbox.core import config
 
@@ -14,12 +18,38 @@ else:
 
 
 class Completer(QObject, rlcompleter.Completer):
+    """Code completion for the console.
+
+    Completions requested with 'complete' are computed by a worker thread,
+    since evaluating attributes can be slow, and the results are sent with
+    the 'successful_completion' and 'possible_completions' signals. A new
+    request cancels the previous one (see 'cancel').
+
+    The completions of each expression are cached, and the cache is cleared
+    when the names or values of the namespace change. The completions for a
+    prefix are reused (filtered) as the prefix gets longer. The changes of the
+    attributes of the objects are not detected: 'clear_cache' must be called
+    after running code (the console widget calls it after each line).
+
+    """
+
+    cache_size = 64
 
     successful_completion = Signal(str)
     possible_completions = Signal(list)
 
+    _completed = Signal(str, list, int)
+
     def __init__(self, parent=None):
         super().__init__(parent)
+        self._lock = threading.RLock()
+        self._executor = None
+        self._future = None
+        self._request = 0
+        self._cache = OrderedDict()
+        self._cache_generation = 0
+        self._namespace_state = None
+        self._completed.connect(self._send_completions)
 
     @Slot(str)
     def complete(self, text):
@@ -31,16 +61,107 @@ class Completer(QObject, rlcompleter.Completer):
             except IndexError:
                 return
 
-            completions = self.find_completions(completable_part)
+            with self._lock:
+                self.cancel()
+                if not self._executor:
+                    self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="MusicBox completion")
+                self._future = self._executor.submit(self._complete, text, match.start(0), completable_part,
+                                                     self._request)
+
+    @Slot()
+    def cancel(self):
+        """Cancel the pending completion request.
+
+        A request which is already running is not stopped, but its results
+        are discarded.
+
+        """
+        with self._lock:
+            self._request += 1
+            if self._future:
+                self._future.cancel()
+
+    def wait(self, timeout=None):
+        """Wait until the pending completion request is done.
+
+        """
+        with self._lock:
+            future = self._future
+        if future:
+            try:
+                future.result(timeout)
+            except CancelledError:
+                pass
+
+    def _complete(self, text, start, completable_part, request):
+        with self._lock:
+            if request != self._request:
+                return
+        completions = self.find_completions(completable_part)
+        self._completed.emit(text[:start], completions, request)
+
+    @Slot(str, list, int)
+    def _send_completions(self, text_start, completions, request):
+        # The request is checked again in the thread of the completer, since
+        # it may have been cancelled while the signal was queued.
+        with self._lock:
+            if request != self._request:
+                return
 
-            if completions:
-                if len(completions) == 1:
-                    completion = completions[0]
-                    self.successful_completion.emit(text[:match.start(0)] + completion)
-                else:
-                    self.possible_completions.emit(completions)
+        if completions:
+            if len(completions) == 1:
+                completion = completions[0]
+                self.successful_completion.emit(text_start + completion)
+            else:
+                self.possible_completions.emit(completions)
 
     def find_completions(self, text):
+        if not text.strip():
+            return self._uncached_completions(text)
+
+        # The lock only protects the cache, since evaluating the attributes
+        # can run arbitrary code (e.g. __dir__ or properties) and the thread
+        # of the completer must not wait for it.
+        with self._lock:
+            namespace = __main__.__dict__ if self.use_main_ns else self.namespace
+            self._update_namespace_state(namespace)
+            self.namespace = namespace
+            generation = self._cache_generation
+
+            key = text.rsplit('.', 1)[0] if '.' in text else ''
+            cached = self._cache.get(key)
+            completions = None
+            if cached and _can_filter(cached[0], text):
+                completions = [c for c in cached[1] if c.startswith(text)]
+                self._cache.move_to_end(key)
+
+        if completions is None:
+            if '.' in text:
+                completions = self.attr_matches(text)
+            else:
+                completions = self.global_matches(text)
+            completions = list(dict.fromkeys(completions))
+
+        with self._lock:
+            if generation == self._cache_generation:
+                self._cache[key] = (text, completions)
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+        return completions
+
+    @Slot()
+    def clear_cache(self):
+        with self._lock:
+            self._cache.clear()
+            self._cache_generation += 1
+
+    def _update_namespace_state(self, namespace):
+        state = (id(namespace), list(namespace), list(map(id, namespace.values())))
+        if state != self._namespace_state:
+            self.clear_cache()
+            self._namespace_state = state
+
+    def _uncached_completions(self, text):
         state = 0
         completions = []
 
@@ -53,3 +174,19 @@ class Completer(QObject, rlcompleter.Completer):
                 break
 
         return completions
+
+
+def _can_filter(previous_text, text):
+    """Whether the completions of a text can be filtered to complete a longer
+    text (the completions of attributes omit the private names unless the
+    attribute starts with underscores).
+
+    """
+    if not text.startswith(previous_text):
+        return False
+    previous_attribute = previous_text.rsplit('.', 1)[-1]
+    attribute = text.rsplit('.', 1)[-1]
+    for underscores in ('_', '__'):
+        if attribute.startswith(underscores) and not previous_attribute.startswith(underscores):
+            return False
+    return True
@@ -4,11 +4,14 @@
 
 import builtins
 import code
+import ctypes
 from importlib.metadata import version
+import queue
 import sys
 import threading
 
 from musicbox.core import config
+from musicbox.core.history import History
 
 if config.pyside_version() == 2:
     from PySide2.QtCore import Object, Slot, Signal
@@ -23,26 +26,39 @@ class Console(QObject):
     adds a prompt, a custom welcome message and a history of previously pushed
     expressions, and it also modifies some of the builtin functions that can
     cause issues outside the terminal command line environment.
+
+    Lines can either be pushed directly (in the calling thread) or submitted
+    to an interpreter worker thread (see 'run' and 'submit'), which keeps the
+    calling thread responsive while the code runs. The running statement of
+    the worker can be cancelled with 'interrupt'.
     """
 
     welcome_text = f'Python {sys.version} on {sys.platform}\n\nMusicBox {version("musicbox")}\n'
 
     run_ended = Signal()
+    busy_changed = Signal(bool)
+    submitted_line_done = Signal()
 
     _running_instance = None
 
-    def __init__(self, *, globals={}):
+    def __init__(self, *, globals={}, history=None):
         """
         The 'locals' option will cause the associated dict to be merged into the
         __main__ dict, allowing the symbols to be accessible within the console.
 
+        The 'history' option is the History instance in which the pushed lines
+        are recorded (the default is an empty in-memory history).
+
         """
         super().__init__()
         self._lock = threading.RLock()
         self._globals = globals
         self._thread = None
+        self._worker = None
+        self._worker_queue = queue.Queue()
+        self._busy = False
         self._init_prompt()
-        self._init_history()
+        self._init_history(history)
 
     def _init_prompt(self):
         try:
@@ -55,24 +71,40 @@ class Console(QObject):
             self._ps2 = "... "
         self._prompt = self._ps1
 
-    def _init_history(self):
-        self._history = [""]
-        self._history_index = 0
+    def _init_history(self, history):
+        self._history = history if history is not None else History()
+        self._history_index = len(self._history)
+
+    def run(self, *, command_line_thread=None, use_worker=False):
+        """Start the console.
 
-    def run(self, *, command_line_thread=None):
+        Args:
+            command_line_thread: The thread from which lines are pushed. If
+                                 None (and 'use_worker' is False), a thread
+                                 reading lines from the standard input is
+                                 started.
+            use_worker:          Start an interpreter worker thread, which
+                                 runs the lines passed to 'submit'.
+
+        """
         with self._lock:
             cls = type(self)
             if cls._running_instance:
                 raise RuntimeError("A console instance is already running.")
             cls._running_instance = self
 
+            if use_worker:
+                self._worker = threading.Thread(target=self._worker_loop, name="Console interpreter", daemon=True)
+                command_line_thread = self._worker
             self._command_line_thread = command_line_thread
             self._setup_internal_console()
             self._setup_printing()
 
             print(self.welcome_text)
 
-            if not self._command_line_thread:
+            if self._worker:
+                self._worker.start()
+            elif not self._command_line_thread:
                 self._run_command_line_thread()
 
     def _setup_internal_console(self):
@@ -104,8 +136,72 @@ class Console(QObject):
         finally:
             self.end_run()
 
+    def _worker_loop(self):
+        while True:
+            line = self._worker_queue.get()
+            if line is None:
+                break
+            try:
+                try:
+                    with self._lock:
+                        self._busy = True
+                    self.busy_changed.emit(True)
+                    self.push(line)
+                finally:
+                    with self._lock:
+                        self._busy = False
+            except KeyboardInterrupt:
+                # The interruption arrived after the end of the statement.
+                pass
+            except SystemExit:
+                self.busy_changed.emit(False)
+                self.end_run()
+                break
+            self.busy_changed.emit(False)
+            self.submitted_line_done.emit()
+
+    def submit(self, line):
+        """Push a line of text from the interpreter worker thread.
+
+        The line is queued and this function returns immediately. The
+        'submitted_line_done' signal is emitted once the line has been pushed.
+
+        """
+        if not self._worker:
+            raise RuntimeError("The console was not run with an interpreter worker.")
+        self._worker_queue.put(line)
+
+    def is_busy(self):
+        """Whether the interpreter worker is running a line.
+
+        """
+        with self._lock:
+            return self._busy
+
+    @Slot()
+    def interrupt(self):
+        """Cancel the lines submitted to the interpreter worker.
+
+        A KeyboardInterrupt is raised in the running statement (as soon as it
+        executes Python code), and the lines still in the queue are dropped.
+
+        """
+        while True:
+            try:
+                self._worker_queue.get_nowait()
+            except queue.Empty:
+                break
+        with self._lock:
+            if self._busy:
+                ctypes.pythonapi.PyThreadState_SetAsyncExc(ctypes.c_ulong(self._worker.ident),
+                                                           ctypes.py_object(KeyboardInterrupt))
+        self.reset_input()
+
     def end_run(self):
         with self._lock:
+            if self._worker:
+                self._worker_queue.put(None)
+                self._worker = None
             self_console = None
             builtins.print = builtins._print
             type(self)._running_instance = None
@@ -130,15 +226,15 @@ class Console(QObject):
 
         """
         with self._lock:
-            self._history_index = len(self._history) - 1
-            self._history[self._history_index] = line
-
             if line.strip():
-                self._history.append("")
-                self._history_index += 1
+                self._history.add(line)
+            self._history_index = len(self._history)
 
-            more = self._console.push(line)
+        # The lock is not held while the code runs, so that other threads can
+        # query the console or print in the meantime.
+        more = self._console.push(line)
 
+        with self._lock:
             if more:
                 self._prompt = self._ps2
             else:
@@ -161,16 +257,25 @@ class Console(QObject):
         with self._lock:
             return self._prompt
 
+    def history(self):
+        return self._history
+
     def current_history_entry(self):
+        """The history entry selected with move_up_history/move_down_history
+        (an empty string after the most recent entry).
+
+        """
         with self._lock:
-            return self._history[self._history_index]
+            if self._history_index < len(self._history):
+                return self._history[self._history_index]
+            return ""
 
     @Slot()
     def move_up_history(self):
         with self._lock:
-            self._history_index = max(self._history_index - 1, 0)
+            self._history_index = max(min(self._history_index, len(self._history)) - 1, 0)
 
     @Slot()
     def move_down_history(self):
         with self._lock:
-            self._history_index = min(self._history_index + 1, len(self._history) - 1)
+            self._history_index = min(self._history_index + 1, len(self._history))
@@ -3,10 +3,15 @@
 
 
 import builtins
+import ctypes
+import errno
+import graphlib
 import importlib
 import inspect
 from pathlib import Path
 import os
+import select
+import struct
 import sys
 from threading import Thread, RLock
 import time
@@ -23,7 +28,12 @@ else:
 
 _reload_activated = False
 _reload_setting_lock = RLock()
+_reload_thread = None
 _import_times = {}
+_import_dependencies = {}
+# Incremented when modules are added to _import_times, so that the reload
+# loop only rebuilds the files of the modules when they change.
+_import_generation = 0
 
 
 def set_auto_reload(enable):
@@ -44,6 +54,7 @@ def set_auto_reload(enable):
             for name, module in sys.modules.items():
                 if name.startswith('musicbox') and name not in _import_times:
                     _import_times[name] = current_time
+            _count_new_imports(0)
             _run_module_reload_loop()
         else:
             if '_builtins_import' in globals():
@@ -67,33 +78,254 @@ def _import_and_track_time(name, globals=None, locals=None, fromlist=(), level=0
     if name_parts[0] == 'musicbox':
         global _import_times
         current_time = time.time()
+        module_count = len(_import_times)
         for i in range(len(name_parts)):
             _import_times['.'.join(name_parts[:i + 1])] = current_time
+        full_name = '.'.join(name_parts)
+        imported_names = {full_name}
         if fromlist:
-            full_name = '.'.join(name_parts)
             for item in fromlist:
-                if inspect.ismodule(getattr(module, item)):
+                if inspect.ismodule(getattr(module, item, None)):
                     _import_times[f'{full_name}.{item}'] = current_time
+                    imported_names.add(f'{full_name}.{item}')
+        _count_new_imports(module_count)
+        importer = globals.get('__name__') if globals else None
+        if importer and importer.startswith('musicbox'):
+            _import_dependencies.setdefault(importer, set()).update(imported_names - {importer})
     return module
 
 
+def _count_new_imports(previous_module_count):
+    global _import_generation
+    if len(_import_times) != previous_module_count:
+        _import_generation += 1
+
+
 def _run_module_reload_loop():
+    """Start the thread reloading the modules whose file changed.
+
+    The files are watched with inotify when available (see _InotifyWatcher),
+    and polled otherwise. The changed modules are reloaded along with the
+    modules which depend on them, in dependency order.
+
+    """
+    global _reload_thread
+
     def module_reload_loop():
+        watcher = _create_file_watcher()
+        watched_generation = None
+        try:
+            while auto_reload():
+                module_files = None
+                with _reload_setting_lock:
+                    if _import_generation != watched_generation:
+                        watched_generation = _import_generation
+                        module_files = _module_files()
+                if module_files is not None:
+                    watcher.watch(module_files)
+                changed_files = watcher.wait(timeout=0.5)
+                if changed_files:
+                    with _reload_setting_lock:
+                        if _reload_activated:
+                            _reload_changed_modules(changed_files)
+        finally:
+            watcher.close()
+
+    with _reload_setting_lock:
+        if _reload_thread and _reload_thread.is_alive():
+            return
+        _reload_thread = Thread(target=module_reload_loop, name="Module reload thread", daemon=True)
+        _reload_thread.start()
+
+
+def _module_files():
+    """The files of the tracked modules, as a dict of module names by path.
+
+    """
+    module_files = {}
+    for name in _import_times:
+        module_file = getattr(sys.modules.get(name), '__file__', None)
+        if module_file:
+            module_files[os.path.realpath(module_file)] = name
+    return module_files
+
+
+def _reload_changed_modules(changed_files):
+    module_files = _module_files()
+    changed_modules = set()
+    for path in changed_files:
+        name = module_files.get(os.path.realpath(path))
+        # Only the reported files are checked, since a file can be reported
+        # without being modified (e.g. when it is only opened for writing).
+        try:
+            if name and os.path.getmtime(path) > _import_times[name]:
+                changed_modules.add(name)
+        except OSError:
+            pass
+
+    if changed_modules:
+        for name in _reload_order(changed_modules, _module_dependencies(_import_times)):
+            print(f'Reloading {name}')
+            importlib.reload(sys.modules[name])
+            _import_times[name] = time.time()
+
+
+def _module_dependencies(names):
+    """The dependencies between modules, found from the imports recorded
+    since auto reload was enabled, and from the modules and the objects of
+    other modules referenced by their global variables (for the modules
+    imported before).
+
+    Returns:
+        A dict of the names of the modules on which each module depends.
+
+    """
+    names = {name for name in names if name in sys.modules}
+    dependencies = {}
+    for name in names:
+        dependencies[name] = _import_dependencies.get(name, set()) & names
+        for value in list(vars(sys.modules[name]).values()):
+            if inspect.ismodule(value):
+                dependency = value.__name__
+            else:
+                dependency = getattr(value, '__module__', None)
+            if dependency in names and dependency != name:
+                dependencies[name].add(dependency)
+    return dependencies
+
+
+def _reload_order(changed_modules, dependencies):
+    """The modules to reload, with the dependencies before the dependents.
+
+    Args:
+        changed_modules: The names of the changed modules.
+        dependencies:    The dependencies of the modules (see
+                         _module_dependencies).
+
+    Returns:
+        A list with the changed modules and the modules depending on them
+        (directly or not).
+
+    """
+    dependents = {}
+    for name, module_dependencies in dependencies.items():
+        for dependency in module_dependencies:
+            dependents.setdefault(dependency, set()).add(name)
+
+    affected = set()
+    pending = list(changed_modules)
+    while pending:
+        name = pending.pop()
+        if name not in affected:
+            affected.add(name)
+            pending.extend(dependents.get(name, ()))
+
+    sorter = graphlib.TopologicalSorter({name: dependencies.get(name, set()) & affected for name in affected})
+    try:
+        return list(sorter.static_order())
+    except graphlib.CycleError:
+        return sorted(affected)
+
+
+def _create_file_watcher():
+    try:
+        return _InotifyWatcher()
+    except OSError:
+        return _PollingWatcher()
+
+
+class _InotifyWatcher():
+    """Watch files with the inotify API of Linux.
+
+    The directories of the files are watched rather than the files, so that
+    the files which are replaced (as many editors do when saving) are still
+    reported.
+
+    """
+
+    _event_mask = 0x00000008 | 0x00000080  # IN_CLOSE_WRITE | IN_MOVED_TO
+    _event_header = struct.Struct('iIII')
+
+    def __init__(self):
+        if not sys.platform.startswith('linux'):
+            raise OSError(errno.ENOSYS, 'inotify is only available on Linux')
+        self._libc = ctypes.CDLL(None, use_errno=True)
+        self._fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), 'inotify_init1 failed')
+        self._directories = {}
+        self._files = set()
+
+    def watch(self, paths):
+        self._files = set(paths)
+        for directory in {os.path.dirname(path) for path in self._files} - set(self._directories.values()):
+            descriptor = self._libc.inotify_add_watch(self._fd, os.fsencode(directory), self._event_mask)
+            if descriptor >= 0:
+                self._directories[descriptor] = directory
+
+    def wait(self, timeout):
+        """The watched files which changed, waiting up to 'timeout' seconds
+        for a change.
+
+        """
+        if not select.select([self._fd], [], [], timeout)[0]:
+            return set()
+        changed_files = set()
         while True:
-            with _reload_setting_lock:
-                if _reload_activated:
-                    for name in _import_times:
-                        module = sys.modules[name]
-                        if os.path.getmtime(module.__file__) > _import_times[name]:
-                            print(f'Reloading {name}')
-                            module = importlib.reload(sys.modules[name])
-                            _import_times[name] = time.time()
-                    time.sleep(2)
-                else:
-                    break
-
-    thread = Thread(target=module_reload_loop, name="Module reload thread", daemon=True)
-    thread.start() 
+            try:
+                data = os.read(self._fd, 65536)
+            except BlockingIOError:
+                break
+            offset = 0
+            while offset < len(data):
+                descriptor, _, _, length = self._event_header.unpack_from(data, offset)
+                offset += self._event_header.size
+                name = data[offset:offset + length].rstrip(b'\0')
+                offset += length
+                directory = self._directories.get(descriptor)
+                if directory and name:
+                    path = os.path.join(directory, os.fsdecode(name))
+                    if path in self._files:
+                        changed_files.add(path)
+        return changed_files
+
+    def close(self):
+        os.close(self._fd)
+
+
+class _PollingWatcher():
+    """Watch files by comparing their modification times periodically.
+
+    """
+
+    def __init__(self):
+        self._mtimes = {}
+
+    def watch(self, paths):
+        for path in set(paths) - set(self._mtimes):
+            self._mtimes[path] = _mtime(path)
+        for path in set(self._mtimes) - set(paths):
+            del self._mtimes[path]
+
+    def wait(self, timeout):
+        time.sleep(timeout)
+        changed_files = set()
+        for path, mtime in self._mtimes.items():
+            new_mtime = _mtime(path)
+            if new_mtime != mtime:
+                self._mtimes[path] = new_mtime
+                changed_files.add(path)
+        return changed_files
+
+    def close(self):
+        pass
+
+
+def _mtime(path):
+    try:
+        return os.path.getmtime(path)
+    except OSError:
+        return None
 
 
 def run_tests(*, gui=True):
@@ -0,0 +1,234 @@
+# Copyright (c) 2024 IHU Liryc, Université de Bordeaux, Inria.
+# License: BSD-3-Clause
+
+
+import bisect
+from concurrent.futures import ThreadPoolExecutor
+import json
+import os
+from pathlib import Path
+import re
+import threading
+
+import numpy
+
+from . import config
+
+if config.pyside_version() == 2:
+    from PySide2.QtCore import QSettings
+else:
+    from PySide6.QtCore import QSettings
+
+
+def default_history_path():
+    """The history file of the application, next to its settings.
+
+    """
+    return Path(QSettings('liryc', 'musicbox').fileName()).parent / 'musicbox_history'
+
+
+class History():
+    """Deduplicated command history, with prefix and fuzzy search.
+
+    Entries are ordered from the oldest to the most recently added (adding an
+    existing entry moves it to the end), and the oldest entries are dropped
+    beyond 'max_size' entries.
+
+    The history can be persisted to a file, which is loaded when the history
+    is created. Entries are appended to the file by a background thread so
+    that adding an entry never waits for the disk, and the file is compacted
+    when it contains too many duplicate or dropped entries.
+
+    Searches use two indexes: a sorted list of the entries for prefix
+    searches, and a bit mask of the entries containing each character for
+    fuzzy searches (which only test the entries containing all the characters
+    of the query).
+
+    """
+
+    def __init__(self, path=None, *, max_size=100_000):
+        """
+        Args:
+            path:     The history file (one JSON string per line), or None for
+                      an in-memory history.
+            max_size: The maximum number of entries.
+
+        """
+        self._path = Path(path) if path else None
+        self._max_size = max_size
+        self._lock = threading.RLock()
+        self._sequences = {}
+        self._entries_by_sequence = {}
+        self._next_sequence = 0
+        self._sorted = []
+        self._character_masks = {}
+        self._entry_list = None
+        self._file_line_count = 0
+        self._writer = None
+
+        if self._path and self._path.exists():
+            entries = {}
+            with open(self._path, encoding='utf-8') as file:
+                for line in file:
+                    self._file_line_count += 1
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue
+                    if isinstance(entry, str):
+                        entries.pop(entry, None)
+                        entries[entry] = None
+            self._build_indexes(list(entries)[-max_size:] if max_size else [])
+
+    def __len__(self):
+        with self._lock:
+            return len(self._sequences)
+
+    def __getitem__(self, index):
+        return self.entries()[index]
+
+    def path(self):
+        return self._path
+
+    def max_size(self):
+        return self._max_size
+
+    def entries(self):
+        """The entries, from the oldest to the most recent.
+
+        """
+        with self._lock:
+            if self._entry_list is None:
+                self._entry_list = list(self._sequences)
+            return self._entry_list
+
+    def add(self, entry):
+        """Add an entry, or move it to the end if it already exists.
+
+        """
+        if not isinstance(entry, str):
+            raise TypeError(f'History entries must be strings, not {type(entry).__name__}')
+        with self._lock:
+            self._add(entry)
+            if self._path:
+                self._file_line_count += 1
+                if self._file_line_count > 2 * self._max_size:
+                    lines = [json.dumps(e) + '\n' for e in self._sequences]
+                    self._file_line_count = len(lines)
+                    self._write(self._rewrite_file, lines)
+                else:
+                    self._write(self._append_to_file, json.dumps(entry) + '\n')
+
+    def prefix_search(self, prefix, *, limit=None):
+        """The entries starting with a prefix, the most recent first.
+
+        """
+        with self._lock:
+            start = bisect.bisect_left(self._sorted, prefix)
+            end = start
+            while end < len(self._sorted) and self._sorted[end].startswith(prefix):
+                end += 1
+            matches = sorted(self._sorted[start:end], key=self._sequences.get, reverse=True)
+        return matches[:limit]
+
+    def fuzzy_search(self, query, *, limit=None):
+        """The entries containing the characters of a query in order, the most
+        recent first (like the reverse search of shells, but the characters
+        do not need to be consecutive).
+
+        """
+        pattern = re.compile('.*?'.join(re.escape(c) for c in query))
+        matches = []
+        with self._lock:
+            candidates = (1 << self._next_sequence) - 1
+            for character in set(query):
+                candidates &= self._character_masks.get(character, 0)
+            while candidates and (limit is None or len(matches) < limit):
+                sequence = candidates.bit_length() - 1
+                candidates ^= 1 << sequence
+                entry = self._entries_by_sequence[sequence]
+                if pattern.search(entry):
+                    matches.append(entry)
+        return matches
+
+    def wait(self):
+        """Wait until the pending entries are written to the file.
+
+        """
+        with self._lock:
+            writer = self._writer
+        if writer:
+            writer.submit(lambda: None).result()
+
+    def _build_indexes(self, entries):
+        self._sequences = {entry: i for i, entry in enumerate(entries)}
+        self._entries_by_sequence = dict(enumerate(entries))
+        self._next_sequence = len(entries)
+        self._sorted = sorted(entries)
+        self._character_masks = {}
+        if not entries:
+            return
+
+        # The masks are built at once from the (character, entry) pairs, since
+        # updating large integers one bit at a time is slow.
+        lengths = numpy.fromiter((len(entry) for entry in entries), dtype=numpy.int64, count=len(entries))
+        characters = numpy.frombuffer(''.join(entries).encode('utf-32-le'), dtype=numpy.uint32)
+        sequences = numpy.repeat(numpy.arange(len(entries)), lengths)
+        counts = numpy.bincount(characters)
+        character_values = numpy.flatnonzero(counts)
+        codes = numpy.zeros(len(counts), dtype=numpy.uint16 if len(character_values) < 2**16 else numpy.uint32)
+        codes[character_values] = numpy.arange(len(character_values))
+        sequences = sequences[numpy.argsort(codes[characters], kind='stable')]
+        ends = numpy.cumsum(counts[character_values])
+        for character, start, end in zip(character_values, ends - counts[character_values], ends):
+            bits = numpy.zeros(len(entries), dtype=bool)
+            bits[sequences[start:end]] = True
+            mask = int.from_bytes(numpy.packbits(bits, bitorder='little').tobytes(), 'little')
+            self._character_masks[chr(character)] = mask
+
+    def _add(self, entry):
+        if entry in self._sequences:
+            self._remove(entry)
+        sequence = self._next_sequence
+        self._next_sequence += 1
+        self._sequences[entry] = sequence
+        self._entries_by_sequence[sequence] = entry
+        bisect.insort(self._sorted, entry)
+        bit = 1 << sequence
+        for character in set(entry):
+            self._character_masks[character] = self._character_masks.get(character, 0) | bit
+        self._entry_list = None
+
+        while len(self._sequences) > self._max_size:
+            self._remove(next(iter(self._sequences)))
+
+        # The sequences are renumbered from 0 when they get too sparse, so
+        # that the masks do not grow forever.
+        if self._next_sequence > 2 * self._max_size:
+            self._build_indexes(self.entries())
+
+    def _remove(self, entry):
+        sequence = self._sequences.pop(entry)
+        del self._entries_by_sequence[sequence]
+        del self._sorted[bisect.bisect_left(self._sorted, entry)]
+        bit = 1 << sequence
+        for character in set(entry):
+            self._character_masks[character] &= ~bit
+        self._entry_list = None
+
+    def _write(self, function, arg):
+        if not self._writer:
+            self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="MusicBox history")
+        self._writer.submit(function, arg)
+
+    def _append_to_file(self, line):
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self._path, 'a', encoding='utf-8') as file:
+            file.write(line)
+
+    def _rewrite_file(self, lines):
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        temporary_path = self._path.with_name(f'{self._path.name}.tmp')
+        with open(temporary_path, 'w', encoding='utf-8') as file:
+            file.writelines(lines)
+        os.replace(temporary_path, self._path)
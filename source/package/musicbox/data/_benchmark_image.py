@@ -0,0 +1,46 @@
+# Copyright (c) 2024 IHU Liryc, Université de Bordeaux, Inria.
+# License: BSD-3-Clause
+
+
+from musicbox.core.benchmark import BenchmarkCase
+from .image import *
+
+
+def benchmark_cases(sizes):
+    for data_type in sitk_type_map:
+        for size in sizes:
+            yield from _image_cases(data_type, _shape(size, data_type))
+
+
+def _image_cases(data_type, shape):
+    size = int(numpy.prod(shape)) * numpy.dtype(data_type).itemsize
+    type_name = numpy.dtype(data_type).name
+
+    def case(name, function, setup=tuple, **parameters):
+        return BenchmarkCase(name, function, setup=setup, parameters={'type': type_name, **parameters}, size=size)
+
+    new_array = lambda: (numpy.ones(shape, dtype=data_type),)
+    new_sitk_image = lambda: (create_sitk_image(shape[::-1], data_type),)
+    new_vtk_image = lambda: (create_vtk_image(shape, data_type),)
+
+    return [
+        case('create_sitk_image', lambda: create_sitk_image(shape[::-1], data_type), input='shape'),
+        case('create_sitk_image', create_sitk_image, new_array, input='numpy'),
+        case('create_sitk_image', create_sitk_image, new_vtk_image, input='vtk'),
+        case('create_vtk_image', lambda: create_vtk_image(shape, data_type), input='shape'),
+        case('create_vtk_image', create_vtk_image, new_array, input='numpy'),
+        case('create_vtk_image', lambda a: create_vtk_image(a, share=True), new_array, input='numpy', share=True),
+        case('create_vtk_image', create_vtk_image, new_sitk_image, input='sitk'),
+        case('create_vtk_image', lambda i: create_vtk_image(i, share=True), new_sitk_image, input='sitk', share=True),
+        case('pixels', pixels, new_sitk_image, input='sitk'),
+        case('pixels', pixels, new_vtk_image, input='vtk'),
+    ]
+
+
+def _shape(size, data_type):
+    """A 3D shape, as cubic as possible, for an array of 'size' bytes.
+
+    """
+    count = max(size // numpy.dtype(data_type).itemsize, 1)
+    side = max(round(count ** (1 / 3)), 1)
+    return (max(count // (side * side), 1), side, side)
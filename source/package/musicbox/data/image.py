@@ -2,11 +2,18 @@
 # License: BSD-3-Clause
 
 
+from collections import OrderedDict
+import sys
+import threading
+
 import numpy
 import SimpleITK as sitk
 import vtk
 from vtk.util import numpy_support
 
+from .lazy_image import LazyImage, create_lazy_image
+from .mapped_image import MappedImage, allocate_mapped_image, open_mapped_image
+
 
 sitk_type_map = {
     numpy.int8: sitk.sitkInt8,
@@ -37,19 +44,25 @@ vtk_type_map = {
 }
 
 
-def create_sitk_image(arg_1, data_type=None, *, spacing=None, origin=None, direction=None):
+def create_sitk_image(arg_1, data_type=None, *, spacing=None, origin=None, direction=None, share=False):
     """Create a SimpleITK image.
 
     Args:
         arg_1:     An initializer argument that can be a SimpleITK image, a numpy
-                   array, a vtkImageData or a tuple describing the shape of the
-                   image (the size along each axis). Up to four dimensions are
+                   array, a vtkImageData, a MappedImage, a LazyImage (which
+                   is fully loaded) or a tuple describing the shape of the image
+                   (the size along each axis). Up to four dimensions are
                    supported.
         data_type: If 'arg_1' is a shape, this argument can be used to specify
                    the type of the image (if not specified the default is UInt8).
         spacing,
         origin,
         direction: Optionnally sets the attributes of the created image.
+        share:     If True, the pixel buffer of 'arg_1' is shared instead of
+                   copied. Copies of SimpleITK images always share their buffer
+                   until one of them is modified, but SimpleITK cannot wrap the
+                   buffer of a numpy array or a vtkImageData, so a ValueError is
+                   raised in those cases.
 
     Returns:
         A new instance of SimpleITK.Image.
@@ -62,38 +75,60 @@ def create_sitk_image(arg_1, data_type=None, *, spacing=None, origin=None, direc
     elif isinstance(arg_1, numpy.ndarray):
         if data_type:
             _raise_no_second_argument_needed_error(arg_1)
-        image = sitk.GetImageFromArray(arg_1)
+        if share:
+            _raise_cannot_share_error(arg_1, 'SimpleITK images cannot wrap an external buffer')
+        image = sitk.GetImageFromArray(arg_1, isVector=False)
+    elif isinstance(arg_1, (MappedImage, LazyImage)):
+        if data_type:
+            _raise_no_second_argument_needed_error(arg_1)
+        if share:
+            _raise_cannot_share_error(arg_1, 'SimpleITK images cannot wrap an external buffer')
+        np_array = numpy.asarray(pixels(arg_1))
+        image = sitk.GetImageFromArray(np_array.astype(np_array.dtype.newbyteorder('='), copy=False), isVector=False)
+        image.SetSpacing(arg_1.spacing())
+        image.SetOrigin(arg_1.origin())
+        image.SetDirection(arg_1.direction())
     elif isinstance(arg_1, vtk.vtkImageData):
         if data_type:
             _raise_no_second_argument_needed_error(arg_1)
+        if share:
+            _raise_cannot_share_error(arg_1, 'SimpleITK images cannot wrap an external buffer')
         vtk_array = arg_1.GetPointData().GetScalars()
         np_array = numpy_support.vtk_to_numpy(vtk_array)
         np_array.shape = arg_1.GetDimensions()
-        image = sitk.GetImageFromArray(np_array)
+        image = sitk.GetImageFromArray(np_array, isVector=False)
     else:
+        if share:
+            _raise_cannot_share_error(arg_1, 'there is no buffer to share')
         shape = arg_1
         data_type = data_type or sitk.sitkUInt8
         if data_type in sitk_type_map:
             data_type = sitk_type_map[data_type]
-        image = sitk.Image(*shape, data_type)
+        image = sitk.Image(list(shape), data_type)
 
     _set_image_attributes(image, spacing=spacing, origin=origin, direction=direction)
     return image
 
 
-def create_vtk_image(arg_1, data_type=None, *, spacing=None, origin=None, direction=None):
+def create_vtk_image(arg_1, data_type=None, *, spacing=None, origin=None, direction=None, share=False):
     """Create a VTK image.
 
     Args:
         arg_1:     An initializer argument that can be a SimpleITK image, a numpy
-                   array, a vtkImageData or a tuple describing the shape of the
-                   image (the size along each axis). Only three dimensions are
+                   array, a vtkImageData, a MappedImage, a LazyImage (which
+                   is fully loaded) or a tuple describing the shape of the image
+                   (the size along each axis). Only three dimensions are
                    supported.
         data_type: If 'arg_1' is a shape, this argument can be used to specify
                    the type of the image (if not specified the default is UInt8).
         spacing,
         origin,
         direction: Optionnally sets the attributes of the created image.
+        share:     If True, the created image wraps the pixel buffer of 'arg_1'
+                   instead of copying it, and keeps 'arg_1' alive for as long as
+                   the buffer is used. A ValueError is raised if the buffer
+                   cannot be wrapped as is (because of its type, strides or
+                   memory layout).
 
     Returns:
         A new instance of vtk.vtkImageData.
@@ -104,7 +139,10 @@ def create_vtk_image(arg_1, data_type=None, *, spacing=None, origin=None, direct
     if isinstance(arg_1, vtk.vtkImageData):
         if data_type:
             _raise_no_second_argument_needed_error(arg_1)
-        image.DeepCopy(arg_1)
+        if share:
+            image.ShallowCopy(arg_1)
+        else:
+            image.DeepCopy(arg_1)
     else:
         if isinstance(arg_1, numpy.ndarray):
             if data_type:
@@ -114,14 +152,42 @@ def create_vtk_image(arg_1, data_type=None, *, spacing=None, origin=None, direct
             if data_type:
                 _raise_no_second_argument_needed_error(arg_1)
             np_array = sitk.GetArrayViewFromImage(arg_1)
+        elif isinstance(arg_1, MappedImage):
+            if data_type:
+                _raise_no_second_argument_needed_error(arg_1)
+            np_array = arg_1.pixels()
+            if not share:
+                np_array = np_array.astype(np_array.dtype.newbyteorder('='), copy=False)
+            # The axes of the VTK image are in the reverse order.
+            if spacing is None:
+                spacing = arg_1.spacing()[::-1]
+            if origin is None:
+                origin = arg_1.origin()[::-1]
+        elif isinstance(arg_1, LazyImage):
+            if data_type:
+                _raise_no_second_argument_needed_error(arg_1)
+            if share:
+                _raise_cannot_share_error(arg_1, 'the pixels are not loaded in a single buffer')
+            np_array = numpy.asarray(arg_1)
         else:
+            if share:
+                _raise_cannot_share_error(arg_1, 'there is no buffer to share')
             shape = arg_1
             data_type = data_type or numpy.uint8
             np_array = numpy.zeros(shape, dtype=data_type)
         if np_array.ndim != 3:
             raise TypeError('VTK images must have 3 dimensions (use SimpleITK images for other dimensions).')
 
-        vtk_array = numpy_support.numpy_to_vtk(num_array=np_array.reshape(-1), deep=True)
+        if share:
+            reason = _vtk_sharing_obstacle(np_array)
+            if reason:
+                _raise_cannot_share_error(arg_1, reason)
+            vtk_array = numpy_support.numpy_to_vtk(num_array=np_array.reshape(-1), deep=False)
+            # The numpy array is already referenced by the VTK buffer, but
+            # SimpleITK views do not keep their image alive.
+            vtk_array._musicbox_owner = arg_1
+        else:
+            vtk_array = numpy_support.numpy_to_vtk(num_array=np_array.reshape(-1), deep=True)
         image.SetDimensions(np_array.shape)
         image.GetPointData().SetScalars(vtk_array)
 
@@ -129,20 +195,206 @@ def create_vtk_image(arg_1, data_type=None, *, spacing=None, origin=None, direct
     return image
 
 
+def _vtk_sharing_obstacle(np_array):
+    """The reason why VTK cannot wrap the array without a copy.
+
+    Returns None if the array can be wrapped as is.
+
+    """
+    if np_array.dtype.type not in vtk_type_map:
+        return f'the data type {np_array.dtype} has no VTK equivalent'
+    if not np_array.dtype.isnative:
+        return 'the data is not in native byte order'
+    if not np_array.flags.c_contiguous:
+        return 'the pixels are not contiguous in memory (strided or Fortran-ordered array)'
+    return None
+
+
+def _raise_no_second_argument_needed_error(arg_1):
+    raise TypeError(f'No second argument is accepted with {type(arg_1).__name__} as an initializer.')
+
+
+def _raise_cannot_share_error(arg_1, reason):
+    raise ValueError(f'Cannot share the buffer of {type(arg_1).__name__} without copying: {reason}.')
+
+
+class ImageBatch(list):
+    """List of same-shaped images whose pixels can be used as a single array.
+
+    Batches are created by 'create_sitk_images' and 'create_vtk_images', and
+    'pixels' returns their pixels stacked along a new first axis.
+
+    """
+
+    def __init__(self, images, stacked_pixels=None):
+        super().__init__(images)
+        self._stacked_pixels = stacked_pixels
+
+    def pixels(self):
+        """The pixels of the images, stacked along the first axis.
+
+        For VTK images this is the buffer shared by all the images, so
+        modifying it modifies the images. SimpleITK images cannot share a
+        buffer, so their pixels are copied in a non-modifiable array.
+
+        """
+        if self._stacked_pixels is not None:
+            return self._stacked_pixels
+        np_array = numpy.stack([sitk.GetArrayViewFromImage(image) for image in self])
+        np_array.flags.writeable = False
+        return np_array
+
+
+def create_sitk_images(arg_1, data_type=None, *, count=None, spacing=None, origin=None, direction=None):
+    """Create a batch of SimpleITK images.
+
+    Args:
+        arg_1:     Either a numpy array containing the pixels of the images
+                   stacked along its first axis, or a tuple describing the
+                   shape of the images (see create_sitk_image).
+        data_type: If 'arg_1' is a shape, this argument can be used to specify
+                   the type of the images (if not specified the default is
+                   UInt8).
+        count:     The number of images, required if 'arg_1' is a shape.
+        spacing,
+        origin,
+        direction: Optionnally sets the attributes of the created images.
+
+    Returns:
+        A new instance of ImageBatch containing SimpleITK images.
+
+    """
+    if isinstance(arg_1, numpy.ndarray):
+        if data_type:
+            _raise_no_second_argument_needed_error(arg_1)
+        images = [sitk.GetImageFromArray(np_array, isVector=False) for np_array in arg_1]
+    else:
+        if count is None:
+            raise TypeError('The number of images is required to create images from a shape.')
+        data_type = data_type or sitk.sitkUInt8
+        if data_type in sitk_type_map:
+            data_type = sitk_type_map[data_type]
+        images = [sitk.Image(list(arg_1), data_type) for i in range(count)]
+
+    for image in images:
+        _set_image_attributes(image, spacing=spacing, origin=origin, direction=direction)
+    return ImageBatch(images)
+
+
+def create_vtk_images(arg_1, data_type=None, *, count=None, spacing=None, origin=None, direction=None):
+    """Create a batch of VTK images sharing a single buffer.
+
+    The pixels of all the images are allocated in one contiguous buffer (or
+    taken from the given array without copying, when possible), and each
+    image wraps its part of the buffer.
+
+    Args:
+        arg_1:     Either a numpy array containing the pixels of the images
+                   stacked along its first axis, or a tuple describing the
+                   shape of the images (see create_vtk_image).
+        data_type: If 'arg_1' is a shape, this argument can be used to specify
+                   the type of the images (if not specified the default is
+                   UInt8).
+        count:     The number of images, required if 'arg_1' is a shape.
+        spacing,
+        origin,
+        direction: Optionnally sets the attributes of the created images.
+
+    Returns:
+        A new instance of ImageBatch containing vtk.vtkImageData instances.
+
+    """
+    if isinstance(arg_1, numpy.ndarray):
+        if data_type:
+            _raise_no_second_argument_needed_error(arg_1)
+        stacked_pixels = arg_1
+        if _vtk_sharing_obstacle(stacked_pixels):
+            stacked_pixels = numpy.ascontiguousarray(stacked_pixels, dtype=stacked_pixels.dtype.newbyteorder('='))
+    else:
+        if count is None:
+            raise TypeError('The number of images is required to create images from a shape.')
+        stacked_pixels = numpy.zeros((count, *arg_1), dtype=data_type or numpy.uint8)
+
+    if stacked_pixels.ndim != 4:
+        raise TypeError('VTK images must have 3 dimensions (use SimpleITK images for other dimensions).')
+    if stacked_pixels.dtype.type not in vtk_type_map:
+        raise ValueError(f'Cannot create VTK images: the data type {stacked_pixels.dtype} has no VTK equivalent.')
+
+    images = []
+    for np_array in stacked_pixels:
+        image = vtk.vtkImageData()
+        image.SetDimensions(np_array.shape)
+        image.GetPointData().SetScalars(numpy_support.numpy_to_vtk(num_array=np_array.reshape(-1), deep=False))
+        _set_image_attributes(image, spacing=spacing, origin=origin, direction=direction)
+        images.append(image)
+    return ImageBatch(images, stacked_pixels)
+
+
+def create_mapped_image(path, arg_1, data_type=None, *, spacing=None, origin=None, direction=None):
+    """Create a memory-mapped image.
+
+    Args:
+        path:      The file backing the image. An NRRD header is written if the
+                   extension is '.nrrd', otherwise the file only contains the
+                   raw pixels.
+        arg_1:     An initializer argument that can be a SimpleITK image, a numpy
+                   array, a vtkImageData, a MappedImage (the pixels are copied
+                   to the file) or a tuple describing the shape of the image
+                   (the size along each axis).
+        data_type: If 'arg_1' is a shape, this argument can be used to specify
+                   the numpy type of the image (if not specified the default is
+                   UInt8).
+        spacing,
+        origin,
+        direction: Optionnally sets the attributes of the created image.
+
+    Returns:
+        A new instance of MappedImage, writable and initialized from 'arg_1'.
+
+    """
+    if isinstance(arg_1, (sitk.Image, numpy.ndarray, vtk.vtkImageData, MappedImage)):
+        if data_type:
+            _raise_no_second_argument_needed_error(arg_1)
+        np_array = pixels(arg_1)
+        if isinstance(arg_1, sitk.Image):
+            spacing = arg_1.GetSpacing() if spacing is None else spacing
+            origin = arg_1.GetOrigin() if origin is None else origin
+            direction = arg_1.GetDirection() if direction is None else direction
+        elif isinstance(arg_1, MappedImage):
+            spacing = arg_1.spacing() if spacing is None else spacing
+            origin = arg_1.origin() if origin is None else origin
+            direction = arg_1.direction() if direction is None else direction
+        image = allocate_mapped_image(path, np_array.shape[::-1], np_array.dtype.newbyteorder('='),
+                                      spacing=spacing, origin=origin, direction=direction)
+        image.pixels()[...] = np_array
+    else:
+        image = allocate_mapped_image(path, arg_1, data_type or numpy.uint8,
+                                      spacing=spacing, origin=origin, direction=direction)
+    return image
+
+
 def _set_image_attributes(image, *, spacing=None, origin=None, direction=None):
-    if spacing:
+    if spacing is not None:
         image.SetSpacing(spacing)
-    if origin:
+    if origin is not None:
         image.SetOrigin(origin)
-    if direction:
-        image.SetDirection(direction)
+    if direction is not None:
+        if isinstance(image, vtk.vtkImageData):
+            image.SetDirectionMatrix(direction)
+        else:
+            image.SetDirection(direction)
 
 
 def pixels(image):
     """The pixel array of the image.
 
     Returns a numpy array containing the pixel values of the image. The array is
-    modifiable for VTK images and non-modifiable for SimpleITK images.
+    modifiable for VTK images and non-modifiable for SimpleITK images. For
+    mapped images it is a numpy.memmap, which only reads the pixels from the
+    disk when they are accessed. Lazy images are returned as is, since they
+    can be indexed like arrays and only load the chunks that are accessed.
+    For image batches, the pixels of the images are stacked along the first
+    axis.
     For pratcical reasons this function can also accept numpy arrays (in which
     case the same array is returned).
 
@@ -153,8 +405,276 @@ def pixels(image):
         vtk_array = image.GetPointData().GetScalars()
         np_array = numpy_support.vtk_to_numpy(vtk_array)
         np_array.shape = image.GetDimensions()
+    elif isinstance(image, MappedImage):
+        np_array = image.pixels()
+    elif isinstance(image, LazyImage):
+        np_array = image
+    elif isinstance(image, ImageBatch):
+        np_array = image.pixels()
     elif isinstance(image, numpy.ndarray):
         np_array = image
     else:
         raise TypeError(f'Argument type not handled: {type(image)}.')
     return np_array
+
+
+class ImagePyramid():
+    """Multi-resolution pyramid of an image, for interactive viewing.
+
+    Level 0 is the image itself, and each following level halves the size of
+    the previous one along each axis (by averaging bins of pixels) until the
+    image is reduced to a single pixel. Levels are computed on demand and kept
+    in a cache which evicts the least recently used ones when its size exceeds
+    the memory budget.
+
+    Only 2D and 3D images are supported (use LazyImage.frame for 4D images).
+
+    """
+
+    def __init__(self, arg_1, *, memory_budget=None):
+        """
+        Args:
+            arg_1:         The full resolution image, of any type accepted by
+                           'create_sitk_image'.
+            memory_budget: The maximum size of the cached levels (in bytes).
+                           The most recently used level is always kept, and
+                           the size is unlimited by default.
+
+        """
+        self._image = create_sitk_image(arg_1)
+        if self._image.GetDimension() > 3:
+            raise TypeError('Image pyramids only support 2D and 3D images.')
+        self._memory_budget = memory_budget
+        self._levels = OrderedDict()
+        self._cached_bytes = 0
+        self._lock = threading.RLock()
+
+    def level_count(self):
+        return max(self._image.GetSize()).bit_length()
+
+    def level_size(self, index):
+        """The size of a level, which is known without computing the level.
+
+        """
+        size = self._image.GetSize()
+        for i in range(index):
+            size = tuple(max(s // 2, 1) for s in size)
+        return size
+
+    def level_for_resolution(self, resolution):
+        """The coarsest level that is at least as large as the resolution.
+
+        Args:
+            resolution: The minimum size of the level, either along each axis
+                        or as a single number for the largest axis (e.g. the
+                        number of screen pixels covered by the image).
+
+        Returns:
+            The index of the level (0 if no level is large enough).
+
+        """
+        for index in reversed(range(self.level_count())):
+            size = self.level_size(index)
+            if isinstance(resolution, (int, float)):
+                if max(size) >= resolution:
+                    return index
+            elif all(s >= r for s, r in zip(size, resolution)):
+                return index
+        return 0
+
+    def level(self, index, *, image_type='sitk'):
+        """A level of the pyramid.
+
+        Args:
+            index:      The index of the level (0 is the full resolution).
+            image_type: 'sitk' for a SimpleITK image, or 'vtk' for a VTK image
+                        sharing the pixels of the cached level (a 2D level
+                        is a VTK image with a single slice).
+
+        """
+        if not 0 <= index < self.level_count():
+            raise IndexError(f'Level {index} is out of bounds for a pyramid with {self.level_count()} levels.')
+
+        if index == 0:
+            image = self._image
+        else:
+            with self._lock:
+                image = self._levels.get(index)
+                if image is None:
+                    previous = self.level(index - 1)
+                    image = sitk.BinShrink(previous, [2 if s > 1 else 1 for s in previous.GetSize()])
+                    self._levels[index] = image
+                    self._cached_bytes += _sitk_image_bytes(image)
+                    self._evict()
+                else:
+                    self._levels.move_to_end(index)
+
+        if image_type == 'vtk':
+            # The axes of the VTK images are in the reverse order (see
+            # create_vtk_image), and 2D levels are wrapped as a single slice.
+            spacing = image.GetSpacing()[::-1]
+            origin = image.GetOrigin()[::-1]
+            if image.GetDimension() == 2:
+                vtk_image = create_vtk_image(sitk.GetArrayViewFromImage(image)[..., numpy.newaxis], share=True,
+                                             spacing=(*spacing, 1.0), origin=(*origin, 0.0))
+                vtk_image.GetPointData().GetScalars()._musicbox_owner = image
+                return vtk_image
+            return create_vtk_image(image, share=True, spacing=spacing, origin=origin)
+        return image
+
+    def memory_budget(self):
+        return self._memory_budget
+
+    def set_memory_budget(self, memory_budget):
+        with self._lock:
+            self._memory_budget = memory_budget
+            self._evict()
+
+    def cached_bytes(self):
+        """The total size of the cached levels (in bytes).
+
+        """
+        with self._lock:
+            return self._cached_bytes
+
+    def _evict(self):
+        if self._memory_budget is not None:
+            while self._cached_bytes > self._memory_budget and len(self._levels) > 1:
+                _, image = self._levels.popitem(last=False)
+                self._cached_bytes -= _sitk_image_bytes(image)
+
+
+class ImageSlicer():
+    """Extract the axis-aligned slices of a VTK image, with a cache.
+
+    The planes are 'axial' (constant z), 'coronal' (constant y) and
+    'sagittal' (constant x), in the index space of the VTK image. Slices are
+    arrays of shape (rows, columns) (plus the components, if there are more
+    than one), where the columns are along x for axial and coronal slices and
+    along y for sagittal slices.
+
+    The most recently extracted slices of each plane are kept in a cache
+    whose buffers are recycled when slices are evicted, so that scrolling
+    through the slices does not allocate memory once the cache is full. The
+    cache is cleared when the image is modified.
+
+    """
+
+    planes = ('axial', 'coronal', 'sagittal')
+
+    def __init__(self, image, *, cache_size=16):
+        """
+        Args:
+            image:      An instance of vtk.vtkImageData (3D).
+            cache_size: The maximum number of cached slices per plane.
+
+        """
+        self._image = image
+        self._cache_size = cache_size
+        self._caches = {plane: OrderedDict() for plane in self.planes}
+        self._mtime = None
+        self._lock = threading.RLock()
+
+    def image(self):
+        return self._image
+
+    def slice_count(self, plane):
+        return self._image.GetDimensions()[2 - self._plane_index(plane)]
+
+    def slice_shape(self, plane):
+        x, y, z = self._image.GetDimensions()
+        shape = {'axial': (y, x), 'coronal': (z, x), 'sagittal': (z, y)}[plane]
+        components = self._image.GetNumberOfScalarComponents()
+        return shape + (components,) if components > 1 else shape
+
+    def slice_spacing(self, plane):
+        """The spacing of the slices, as (column spacing, row spacing).
+
+        """
+        x, y, z = self._image.GetSpacing()
+        return {'axial': (x, y), 'coronal': (x, z), 'sagittal': (y, z)}[plane]
+
+    def slice_origin(self, plane):
+        """The origin of the slices, as (column origin, row origin).
+
+        """
+        x, y, z = self._image.GetOrigin()
+        return {'axial': (x, y), 'coronal': (x, z), 'sagittal': (y, z)}[plane]
+
+    def slice(self, plane, index, *, out=None):
+        """A slice of the image.
+
+        Args:
+            plane: The plane of the slice.
+            index: The index of the slice along the normal of the plane.
+            out:   An optional array of the shape of the slices (see
+                   slice_shape) in which the slice is copied.
+
+        Returns:
+            'out', or a read-only view of the cached slice if 'out' is None
+            (which does not allocate a new slice, and is not modified when the
+            image is: extract the slice again to get the new pixels).
+
+        """
+        if not 0 <= index < self.slice_count(plane):
+            raise IndexError(f'Slice {index} is out of bounds for {self.slice_count(plane)} {plane} slices.')
+
+        with self._lock:
+            cache = self._caches[plane]
+            mtime = max(self._image.GetMTime(), self._image.GetPointData().GetScalars().GetMTime())
+            if mtime != self._mtime:
+                for plane_cache in self._caches.values():
+                    plane_cache.clear()
+                self._mtime = mtime
+
+            cached = cache.get(index)
+            if cached is None:
+                buffer = None
+                if cache and len(cache) >= self._cache_size:
+                    evicted = cache.popitem(last=False)[1]
+                    # The buffers still referenced by returned views are not
+                    # recycled.
+                    if sys.getrefcount(evicted) <= 2:
+                        buffer = evicted
+                cached = self._extract(plane, index, buffer)
+                if self._cache_size > 0:
+                    cache[index] = cached
+            else:
+                cache.move_to_end(index)
+
+            if out is None:
+                view = cached.view()
+                view.flags.writeable = False
+                return view
+            numpy.copyto(out, cached)
+            return out
+
+    def clear_cache(self):
+        with self._lock:
+            for cache in self._caches.values():
+                cache.clear()
+
+    def _plane_index(self, plane):
+        try:
+            return self.planes.index(plane)
+        except ValueError:
+            raise KeyError(f'{plane} is not a valid plane') from None
+
+    def _extract(self, plane, index, buffer):
+        x, y, z = self._image.GetDimensions()
+        volume = numpy_support.vtk_to_numpy(self._image.GetPointData().GetScalars()).reshape(z, y, x, -1)
+        if plane == 'axial':
+            source = volume[index]
+        elif plane == 'coronal':
+            source = volume[:, index]
+        else:
+            source = volume[:, :, index]
+        source = source.reshape(self.slice_shape(plane))
+        if buffer is None:
+            return source.copy()
+        numpy.copyto(buffer, source)
+        return buffer
+
+
+def _sitk_image_bytes(image):
+    return image.GetNumberOfPixels() * image.GetNumberOfComponentsPerPixel() * image.GetSizeOfPixelComponent()
@@ -0,0 +1,204 @@
+# Copyright (c) 2024 IHU Liryc, Université de Bordeaux, Inria.
+# License: BSD-3-Clause
+
+
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import os
+
+import numpy
+import SimpleITK as sitk
+
+from .image import create_sitk_image, create_vtk_image, pixels
+
+
+def read_image(path, *, image_type='sitk'):
+    """Read an image file.
+
+    Args:
+        path:       The image file (any format supported by SimpleITK).
+        image_type: 'sitk' for a SimpleITK image, or 'vtk' for a VTK image
+                    (which shares the pixels of the SimpleITK image read, and
+                    whose axes are in the reverse order, see
+                    create_vtk_image).
+
+    Returns:
+        A new instance of SimpleITK.Image or vtk.vtkImageData.
+
+    """
+    return _convert(sitk.ReadImage(str(path)), image_type)
+
+
+def read_images(paths, *, image_type='sitk', max_workers=None, progress=None):
+    """Read image files in parallel.
+
+    The files are read by a pool of threads (SimpleITK releases the GIL while
+    reading and decompressing the files).
+
+    Args:
+        paths:       The image files.
+        image_type:  The type of the returned images (see read_image).
+        max_workers: The maximum number of threads (the default is the number
+                     of processors).
+        progress:    An optional function 'progress(done, total)', called from
+                     the calling thread each time a file has been read.
+
+    Returns:
+        A list of images, in the same order as 'paths'.
+
+    """
+    return _run_in_parallel(lambda path: read_image(path, image_type=image_type), list(paths), max_workers, progress)
+
+
+def write_images(images, paths, *, use_compression=False, max_workers=None, progress=None):
+    """Write images to files in parallel.
+
+    Args:
+        images:          The images, which can be of any type accepted by
+                         'create_sitk_image'.
+        paths:           The destination files (the format is deduced from the
+                         extension).
+        use_compression: Compress the files, if the format supports it.
+        max_workers,
+        progress:        The threading options (see read_images).
+
+    """
+    if len(images) != len(paths):
+        raise ValueError(f'Cannot write {len(images)} images to {len(paths)} files.')
+    _run_in_parallel(lambda item: _write_image(*item, use_compression), list(zip(images, paths)), max_workers, progress)
+
+
+def read_dicom_series(directory, *, series_id=None, image_type='sitk', max_workers=None, progress=None):
+    """Read a DICOM series as a volume, reading the slices in parallel.
+
+    Args:
+        directory:   The directory containing the series.
+        series_id:   The series to read, if the directory contains several
+                     series (the default is the first one found).
+        image_type,
+        max_workers,
+        progress:    See read_images ('progress' is called once per slice).
+
+    VTK images are filled in place while the slices are decoded (see
+    stream_dicom_series), without intermediate copies of the volume.
+
+    Returns:
+        A new instance of SimpleITK.Image or vtk.vtkImageData.
+
+    """
+    if image_type == 'vtk':
+        stream = stream_dicom_series(directory, series_id=series_id, max_workers=max_workers)
+        for image, done, total in stream:
+            if progress:
+                progress(done, total)
+        return image
+
+    paths = _dicom_series_paths(directory, series_id)
+    slices = read_images(paths, max_workers=max_workers, progress=progress)
+    image = create_sitk_image(numpy.concatenate([sitk.GetArrayViewFromImage(s) for s in slices]),
+                              spacing=_series_spacing(slices[0], paths),
+                              origin=slices[0].GetOrigin(),
+                              direction=slices[0].GetDirection())
+    return _convert(image, image_type)
+
+
+def stream_dicom_series(directory, *, series_id=None, max_workers=None):
+    """Read a DICOM series into a VTK image while yielding the progress.
+
+    The VTK image is allocated after reading the first slice, and the other
+    slices are decoded in parallel and copied into its pixels as soon as they
+    are available. The image is marked as modified after each slice, so that
+    views displaying it can show the partially loaded volume.
+
+    The spacing, origin and direction of the VTK image follow the axis order
+    of its pixel array (i.e. z first, see create_vtk_image).
+
+    Args:
+        directory,
+        series_id,
+        max_workers: See read_dicom_series.
+
+    Yields:
+        Tuples (image, done, total), where 'image' is always the same instance
+        of vtk.vtkImageData and 'done' the number of slices loaded so far.
+
+    """
+    paths = _dicom_series_paths(directory, series_id)
+    first_slice = sitk.ReadImage(paths[0])
+    slice_pixels = sitk.GetArrayViewFromImage(first_slice)[0]
+    spacing = _series_spacing(first_slice, paths)
+
+    image = create_vtk_image((len(paths), *slice_pixels.shape), slice_pixels.dtype.type,
+                             spacing=spacing[::-1], origin=first_slice.GetOrigin()[::-1],
+                             direction=first_slice.GetDirection()[::-1])
+    image_pixels = pixels(image)
+    image_pixels[0] = slice_pixels
+    image.Modified()
+    yield image, 1, len(paths)
+
+    executor = ThreadPoolExecutor(max_workers=max_workers or os.cpu_count(), thread_name_prefix="MusicBox I/O")
+    try:
+        futures = {executor.submit(sitk.ReadImage, path): i for i, path in enumerate(paths) if i > 0}
+        for done, future in enumerate(as_completed(futures), 2):
+            image_pixels[futures[future]] = sitk.GetArrayViewFromImage(future.result())[0]
+            image.GetPointData().GetScalars().Modified()
+            image.Modified()
+            yield image, done, len(paths)
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _dicom_series_paths(directory, series_id):
+    directory = str(directory)
+    if series_id:
+        paths = sitk.ImageSeriesReader.GetGDCMSeriesFileNames(directory, series_id)
+    else:
+        paths = sitk.ImageSeriesReader.GetGDCMSeriesFileNames(directory)
+    if not paths:
+        raise FileNotFoundError(f'No DICOM series found in {directory}.')
+    return paths
+
+
+def _series_spacing(first_slice, paths):
+    spacing = list(first_slice.GetSpacing())
+    if len(paths) > 1:
+        reader = sitk.ImageFileReader()
+        reader.SetFileName(paths[1])
+        reader.ReadImageInformation()
+        distance = numpy.linalg.norm(numpy.subtract(reader.GetOrigin(), first_slice.GetOrigin()))
+        spacing[2] = float(distance) or spacing[2]
+    return spacing
+
+
+def _write_image(image, path, use_compression):
+    if not isinstance(image, sitk.Image):
+        image = create_sitk_image(image)
+    sitk.WriteImage(image, str(path), use_compression)
+
+
+def _convert(image, image_type):
+    if image_type == 'sitk':
+        return image
+    elif image_type == 'vtk':
+        # The axes of the VTK image are in the reverse order.
+        return create_vtk_image(image, spacing=image.GetSpacing()[::-1], origin=image.GetOrigin()[::-1],
+                                direction=image.GetDirection()[::-1], share=True)
+    else:
+        raise ValueError(f'{image_type} is not a valid image type')
+
+
+def _run_in_parallel(function, items, max_workers, progress):
+    results = [None] * len(items)
+
+    with ThreadPoolExecutor(max_workers=max_workers or os.cpu_count(), thread_name_prefix="MusicBox I/O") as executor:
+        futures = {executor.submit(function, item): i for i, item in enumerate(items)}
+        try:
+            for done, future in enumerate(as_completed(futures), 1):
+                results[futures[future]] = future.result()
+                if progress:
+                    progress(done, len(items))
+        except BaseException:
+            for future in futures:
+                future.cancel()
+            raise
+
+    return results
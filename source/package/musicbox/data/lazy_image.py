@@ -0,0 +1,244 @@
+# Copyright (c) 2024 IHU Liryc, Université de Bordeaux, Inria.
+# License: BSD-3-Clause
+
+
+from collections import OrderedDict
+import threading
+
+import numpy
+import SimpleITK as sitk
+
+from .mapped_image import MappedImage
+
+
+class LazyImage():
+    """Image whose pixels are loaded in chunks on demand.
+
+    The image is split into chunks along its slowest axis (the time axis of 4D
+    images and the z axis of 3D images). Chunks are loaded when their pixels
+    are accessed and kept in a cache which evicts the least recently used ones
+    when its size exceeds the memory budget.
+
+    Indexing a lazy image behaves like indexing its pixel array (e.g. [t, z, y,
+    x] for 4D images) but only loads the required chunks. Converting it to a
+    numpy array (or passing it to 'create_sitk_image' or 'create_vtk_image')
+    loads all the chunks, use 'frame' to get a single frame as an image. The
+    cached pixels are read-only.
+
+    """
+
+    def __init__(self, load, size, data_type, *, chunk_size=1, memory_budget=None,
+                 spacing=None, origin=None, direction=None):
+        """
+        Args:
+            load:          A function 'load(start, stop)' that returns the
+                           pixels of the frames (i.e. the indices along the
+                           slowest axis) in [start, stop) as a numpy array.
+            size:          The size of the image along each axis (x first).
+            data_type:     The numpy type of the pixels.
+            chunk_size:    The number of frames loaded at once.
+            memory_budget: The maximum size of the cached chunks (in bytes).
+                           The most recently used chunk is always kept, and
+                           the size is unlimited by default.
+            spacing,
+            origin,
+            direction:     The attributes of the image (the defaults are unit
+                           spacing, zero origin and identity direction).
+
+        """
+        dimension = len(size)
+        self._load = load
+        self._size = tuple(int(s) for s in size)
+        self._dtype = numpy.dtype(data_type)
+        self._chunk_size = chunk_size
+        self._memory_budget = memory_budget
+        self._spacing = tuple(spacing if spacing is not None else (1.0,) * dimension)
+        self._origin = tuple(origin if origin is not None else (0.0,) * dimension)
+        self._direction = tuple(direction if direction is not None else numpy.identity(dimension).reshape(-1))
+        self._chunks = OrderedDict()
+        self._cached_bytes = 0
+        self._lock = threading.RLock()
+
+    @property
+    def shape(self):
+        return self._size[::-1]
+
+    @property
+    def dtype(self):
+        return self._dtype
+
+    @property
+    def ndim(self):
+        return len(self._size)
+
+    def __len__(self):
+        return self.shape[0]
+
+    def __array__(self, dtype=None, copy=None):
+        array = self[:]
+        return array if dtype is None else array.astype(dtype, copy=False)
+
+    def __getitem__(self, key):
+        if not isinstance(key, tuple):
+            key = (key,)
+        if not key or key[0] is Ellipsis:
+            key = (slice(None), *key)
+
+        index, rest = key[0], key[1:]
+
+        if isinstance(index, slice):
+            frames = range(*index.indices(len(self)))
+            array = numpy.empty((len(frames), *self.shape[1:]), dtype=self._dtype)
+            for i, frame in enumerate(frames):
+                array[i] = self._frame_pixels(frame)
+            return array[(slice(None), *rest)]
+        elif isinstance(index, (int, numpy.integer)):
+            if index < 0:
+                index += len(self)
+            if not 0 <= index < len(self):
+                raise IndexError(f'Index {index} is out of bounds for an image with {len(self)} frames.')
+            return self._frame_pixels(index)[rest]
+        else:
+            frames = numpy.arange(len(self))[index]
+            return numpy.stack([self._frame_pixels(frame) for frame in frames])[(slice(None), *rest)]
+
+    def size(self):
+        return self._size
+
+    def data_type(self):
+        return self._dtype
+
+    def spacing(self):
+        return self._spacing
+
+    def origin(self):
+        return self._origin
+
+    def direction(self):
+        return self._direction
+
+    def frame(self, index):
+        """A frame of the image, as a SimpleITK image.
+
+        The frame has one less dimension than the image, and its attributes are
+        those of the corresponding axes of the image.
+
+        """
+        dimension = self.ndim - 1
+        direction = numpy.array(self._direction).reshape(self.ndim, self.ndim)[:dimension, :dimension]
+        image = sitk.GetImageFromArray(self[index], isVector=False)
+        image.SetSpacing(self._spacing[:dimension])
+        image.SetOrigin(self._origin[:dimension])
+        image.SetDirection(direction.reshape(-1).tolist())
+        return image
+
+    def memory_budget(self):
+        return self._memory_budget
+
+    def set_memory_budget(self, memory_budget):
+        with self._lock:
+            self._memory_budget = memory_budget
+            self._evict()
+
+    def cached_bytes(self):
+        """The total size of the cached chunks (in bytes).
+
+        """
+        with self._lock:
+            return self._cached_bytes
+
+    def clear_cache(self):
+        with self._lock:
+            self._chunks.clear()
+            self._cached_bytes = 0
+
+    def _frame_pixels(self, frame):
+        chunk_index, position = divmod(frame, self._chunk_size)
+        return self._chunk(chunk_index)[position]
+
+    def _chunk(self, chunk_index):
+        with self._lock:
+            chunk = self._chunks.get(chunk_index)
+
+            if chunk is None:
+                start = chunk_index * self._chunk_size
+                stop = min(start + self._chunk_size, len(self))
+                chunk = numpy.asarray(self._load(start, stop), dtype=self._dtype)
+                chunk = chunk.reshape((stop - start, *self.shape[1:]))
+                chunk.flags.writeable = False
+                self._chunks[chunk_index] = chunk
+                self._cached_bytes += chunk.nbytes
+                self._evict()
+            else:
+                self._chunks.move_to_end(chunk_index)
+
+            return chunk
+
+    def _evict(self):
+        if self._memory_budget is not None:
+            while self._cached_bytes > self._memory_budget and len(self._chunks) > 1:
+                _, chunk = self._chunks.popitem(last=False)
+                self._cached_bytes -= chunk.nbytes
+
+
+def create_lazy_image(arg_1, size=None, data_type=None, *, chunk_size=1, memory_budget=None,
+                      spacing=None, origin=None, direction=None):
+    """Create a lazy image.
+
+    Args:
+        arg_1:         The source of the pixels, which can be a list of image
+                       files (one per frame, read with SimpleITK), a MappedImage
+                       or a function 'load(start, stop)' returning the pixels of
+                       the frames in [start, stop).
+        size,
+        data_type:     The size and numpy type of the image. They are required
+                       when 'arg_1' is a function and deduced otherwise.
+        chunk_size,
+        memory_budget: The loading and caching parameters (see LazyImage).
+        spacing,
+        origin,
+        direction:     Optionnally sets the attributes of the created image.
+
+    Returns:
+        A new instance of LazyImage.
+
+    """
+    if isinstance(arg_1, MappedImage):
+        mapped_image = arg_1
+        load = lambda start, stop: numpy.array(mapped_image.pixels()[start:stop])
+        size = size if size is not None else mapped_image.size()
+        data_type = data_type if data_type is not None else mapped_image.data_type().newbyteorder('=')
+        spacing = spacing if spacing is not None else mapped_image.spacing()
+        origin = origin if origin is not None else mapped_image.origin()
+        direction = direction if direction is not None else mapped_image.direction()
+    elif isinstance(arg_1, (list, tuple)):
+        paths = [str(path) for path in arg_1]
+        reader = sitk.ImageFileReader()
+        reader.SetFileName(paths[0])
+        reader.ReadImageInformation()
+        dimension = reader.GetDimension()
+        frame_size = reader.GetSize()
+        size = size if size is not None else (*frame_size, len(paths))
+        data_type = data_type if data_type is not None else _numpy_type(reader.GetPixelID())
+        spacing = spacing if spacing is not None else (*reader.GetSpacing(), 1.0)
+        origin = origin if origin is not None else (*reader.GetOrigin(), 0.0)
+        if direction is None:
+            direction = numpy.identity(dimension + 1)
+            direction[:dimension, :dimension] = numpy.array(reader.GetDirection()).reshape(dimension, dimension)
+            direction = direction.reshape(-1).tolist()
+
+        def load(start, stop):
+            return numpy.stack([sitk.GetArrayFromImage(sitk.ReadImage(path)) for path in paths[start:stop]])
+    elif callable(arg_1):
+        if size is None or data_type is None:
+            raise TypeError('The size and data type are required to create a lazy image from a function.')
+        load = arg_1
+    else:
+        raise TypeError(f'Cannot create a lazy image from {type(arg_1).__name__}.')
+
+    return LazyImage(load, size, data_type, chunk_size=chunk_size, memory_budget=memory_budget,
+                     spacing=spacing, origin=origin, direction=direction)
+
+
+def _numpy_type(pixel_id):
+    return sitk.GetArrayViewFromImage(sitk.Image([1, 1], pixel_id)).dtype
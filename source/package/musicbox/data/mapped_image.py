@@ -0,0 +1,358 @@
+# Copyright (c) 2024 IHU Liryc, Université de Bordeaux, Inria.
+# License: BSD-3-Clause
+
+
+import math
+from pathlib import Path
+import re
+
+import numpy
+
+
+class MappedImage():
+    """Image whose pixels are memory-mapped from a file.
+
+    The pixels are only read from the disk when they are accessed, which allows
+    working with images that are larger than the available memory. The pixel
+    array is indexed in reverse axis order (e.g. [t, z, y, x]) like the arrays
+    of SimpleITK images, so slicing a few frames of a 4D image only pages in
+    the corresponding bytes.
+
+    Use 'open_mapped_image' to map an existing file, or 'allocate_mapped_image'
+    to create a new one.
+
+    """
+
+    def __init__(self, path, size, data_type, *, offset=0, mode='r', spacing=None, origin=None, direction=None):
+        """
+        Args:
+            path:      The file containing the pixels.
+            size:      The size of the image along each axis (x first).
+            data_type: The numpy type of the pixels, which can include a byte
+                       order (e.g. '>i2').
+            offset:    The position of the first pixel in the file (in bytes).
+            mode:      The numpy.memmap mode ('r', 'r+' or 'c').
+            spacing,
+            origin,
+            direction: The attributes of the image (the defaults are unit
+                       spacing, zero origin and identity direction).
+
+        """
+        dimension = len(size)
+        self._path = Path(path)
+        self._size = tuple(int(s) for s in size)
+        self._spacing = tuple(float(v) for v in _or_default(spacing, (1.0,) * dimension))
+        self._origin = tuple(float(v) for v in _or_default(origin, (0.0,) * dimension))
+        self._direction = tuple(float(v) for v in _or_default(direction, numpy.identity(dimension).reshape(-1)))
+        self._pixels = numpy.memmap(self._path, dtype=numpy.dtype(data_type), mode=mode,
+                                    offset=offset, shape=self._size[::-1], order='C')
+
+    def path(self):
+        return self._path
+
+    def size(self):
+        return self._size
+
+    def data_type(self):
+        return self._pixels.dtype
+
+    def spacing(self):
+        return self._spacing
+
+    def origin(self):
+        return self._origin
+
+    def direction(self):
+        return self._direction
+
+    def pixels(self):
+        """The numpy.memmap of the pixels.
+
+        """
+        return self._pixels
+
+    def flush(self):
+        """Write modified pixels to the disk.
+
+        """
+        self._pixels.flush()
+
+
+def open_mapped_image(path, size=None, data_type=None, *, offset=0, mode='r'):
+    """Memory-map an image file.
+
+    The format is deduced from the file extension: NRRD ('.nrrd' and detached
+    '.nhdr' headers) and NIfTI-1 ('.nii' and '.hdr'/'.img' pairs) headers are
+    read from the file, other files are considered raw and require the 'size'
+    and 'data_type' arguments. Compressed files cannot be memory-mapped.
+
+    NIfTI intensity scaling is not applied, the stored values are returned.
+
+    Args:
+        path:      The image file.
+        size,
+        data_type,
+        offset:    The layout of raw files (see MappedImage).
+        mode:      The numpy.memmap mode ('r', 'r+' or 'c').
+
+    Returns:
+        A new instance of MappedImage.
+
+    """
+    path = Path(path)
+    suffix = path.suffix.lower()
+
+    if suffix == '.gz':
+        raise ValueError(f'Cannot memory-map the compressed file {path}.')
+    elif suffix in ('.nrrd', '.nhdr'):
+        kwargs = _read_nrrd_header(path)
+    elif suffix in ('.nii', '.hdr'):
+        kwargs = _read_nifti_header(path)
+    else:
+        if size is None or data_type is None:
+            raise TypeError(f'The size and data type are required to map the raw file {path}.')
+        kwargs = {'path': path, 'size': size, 'data_type': data_type, 'offset': offset}
+
+    return MappedImage(**kwargs, mode=mode)
+
+
+def allocate_mapped_image(path, size, data_type, *, spacing=None, origin=None, direction=None):
+    """Create a new image file and memory-map it.
+
+    The file is written with an NRRD header if the extension is '.nrrd', and as
+    raw pixels otherwise. The pixels are initialized to zero and the image is
+    writable.
+
+    Returns:
+        A new instance of MappedImage.
+
+    """
+    path = Path(path)
+    data_type = numpy.dtype(data_type)
+    dimension = len(size)
+    spacing = _or_default(spacing, (1.0,) * dimension)
+    origin = _or_default(origin, (0.0,) * dimension)
+    direction = _or_default(direction, numpy.identity(dimension).reshape(-1))
+
+    if path.suffix.lower() == '.nrrd':
+        header = _nrrd_header(size, data_type, spacing, origin, direction)
+    else:
+        header = b''
+
+    with open(path, 'wb') as file:
+        file.write(header)
+        file.truncate(len(header) + math.prod(size) * data_type.itemsize)
+
+    return MappedImage(path, size, data_type, offset=len(header), mode='r+',
+                       spacing=spacing, origin=origin, direction=direction)
+
+
+def _or_default(value, default):
+    return default if value is None else value
+
+
+_nrrd_types = {
+    'int8': ('signed char', 'int8', 'int8_t'),
+    'uint8': ('uchar', 'unsigned char', 'uint8', 'uint8_t'),
+    'int16': ('short', 'short int', 'signed short', 'signed short int', 'int16', 'int16_t'),
+    'uint16': ('ushort', 'unsigned short', 'unsigned short int', 'uint16', 'uint16_t'),
+    'int32': ('int', 'signed int', 'int32', 'int32_t'),
+    'uint32': ('uint', 'unsigned int', 'uint32', 'uint32_t'),
+    'int64': ('longlong', 'long long', 'long long int', 'signed long long',
+              'signed long long int', 'int64', 'int64_t'),
+    'uint64': ('ulonglong', 'unsigned long long', 'unsigned long long int', 'uint64', 'uint64_t'),
+    'float32': ('float',),
+    'float64': ('double',),
+}
+
+_nrrd_type_map = {name: numpy.dtype(key) for key, names in _nrrd_types.items() for name in names}
+
+
+def _read_nrrd_header(path):
+    fields = {}
+
+    with open(path, 'rb') as file:
+        magic = file.readline()
+        if not magic.startswith(b'NRRD'):
+            raise ValueError(f'{path} is not an NRRD file.')
+        while True:
+            line = file.readline()
+            if not line.strip():
+                break
+            line = line.decode('latin-1').rstrip('\r\n')
+            if line.startswith('#') or ':=' in line:
+                continue
+            name, _, value = line.partition(':')
+            fields[name.strip().lower()] = value.strip()
+        offset = file.tell()
+
+    encoding = fields.get('encoding', 'raw')
+    if encoding != 'raw':
+        raise ValueError(f'Cannot memory-map {path} because its data is {encoding}-encoded.')
+
+    data_type = _nrrd_type_map[fields['type']]
+    if data_type.itemsize > 1:
+        data_type = data_type.newbyteorder('>' if fields.get('endian') == 'big' else '<')
+
+    size = [int(s) for s in fields['sizes'].split()]
+    dimension = len(size)
+    spacing = [1.0] * dimension
+    origin = [0.0] * dimension
+    direction = numpy.identity(dimension)
+
+    if 'space directions' in fields:
+        vectors = re.findall(r'\([^)]*\)|none', fields['space directions'])
+        for axis, vector in enumerate(vectors):
+            if vector != 'none':
+                vector = _parse_nrrd_vector(vector)
+                spacing[axis] = numpy.linalg.norm(vector)
+                direction[:len(vector), axis] = vector / spacing[axis]
+        if 'space origin' in fields:
+            space_origin = _parse_nrrd_vector(fields['space origin'])
+            origin[:len(space_origin)] = space_origin
+        if fields.get('space') in ('right-anterior-superior', 'RAS'):
+            direction[:2] *= -1
+            origin[0] = -origin[0]
+            origin[1] = -origin[1]
+    elif 'spacings' in fields:
+        spacing = [1.0 if s == 'nan' else float(s) for s in fields['spacings'].split()]
+
+    data_file = fields.get('data file') or fields.get('datafile')
+    if data_file:
+        path = path.parent / data_file
+        offset = int(fields.get('byte skip', 0))
+
+    return {
+        'path': path,
+        'size': size,
+        'data_type': data_type,
+        'offset': offset,
+        'spacing': spacing,
+        'origin': origin,
+        'direction': direction.reshape(-1),
+    }
+
+
+def _parse_nrrd_vector(text):
+    return numpy.array([float(v) for v in text.strip('()').split(',')])
+
+
+def _nrrd_header(size, data_type, spacing, origin, direction):
+    dimension = len(size)
+    type_name = _nrrd_types[data_type.name][-1]
+    direction = numpy.array(direction).reshape(dimension, dimension)
+    vectors = ' '.join(
+        '(' + ','.join(repr(float(v)) for v in direction[:, axis] * spacing[axis]) + ')'
+        for axis in range(dimension)
+    )
+    if dimension == 3:
+        space = 'space: left-posterior-superior'
+    else:
+        space = f'space dimension: {dimension}'
+    lines = [
+        'NRRD0004',
+        f'type: {type_name}',
+        f'dimension: {dimension}',
+        space,
+        f'sizes: {" ".join(str(s) for s in size)}',
+        f'space directions: {vectors}',
+        f'endian: {"little" if _is_little_endian(data_type) else "big"}',
+        'encoding: raw',
+        f'space origin: ({",".join(repr(float(v)) for v in origin)})',
+    ]
+    header = ('\n'.join(lines) + '\n').encode('latin-1')
+    # Pad with a comment so that the pixels are aligned in memory.
+    padding = -(len(header) + 3) % 64
+    return header + b'#' + b' ' * padding + b'\n\n'
+
+
+def _is_little_endian(data_type):
+    return data_type.byteorder == '<' or (data_type.byteorder in '=|' and numpy.little_endian)
+
+
+_nifti_type_map = {
+    2: numpy.uint8,
+    4: numpy.int16,
+    8: numpy.int32,
+    16: numpy.float32,
+    64: numpy.float64,
+    256: numpy.int8,
+    512: numpy.uint16,
+    768: numpy.uint32,
+    1024: numpy.int64,
+    1280: numpy.uint64,
+}
+
+
+def _read_nifti_header(path):
+    with open(path, 'rb') as file:
+        header = file.read(348)
+
+    if len(header) < 348:
+        raise ValueError(f'{path} is not a NIfTI-1 file.')
+    elif numpy.frombuffer(header, '<i4', 1)[0] == 348:
+        byte_order = '<'
+    elif numpy.frombuffer(header, '>i4', 1)[0] == 348:
+        byte_order = '>'
+    else:
+        raise ValueError(f'{path} is not a NIfTI-1 file.')
+
+    def read(type, offset, count=1):
+        return numpy.frombuffer(header, f'{byte_order}{type}', count, offset)
+
+    dim = read('i2', 40, 8)
+    size = [int(s) for s in dim[1:dim[0] + 1]]
+    dimension = len(size)
+    datatype = int(read('i2', 70)[0])
+    if datatype not in _nifti_type_map:
+        raise ValueError(f'Cannot memory-map {path} because its NIfTI data type ({datatype}) is not supported.')
+    data_type = numpy.dtype(_nifti_type_map[datatype]).newbyteorder(byte_order)
+    pixdim = read('f4', 76, 8).astype(float)
+    offset = int(read('f4', 108)[0])
+    qform_code, sform_code = read('i2', 252, 2)
+    magic = header[344:348]
+
+    spatial_dimension = min(dimension, 3)
+    spacing = [float(s) if s > 0 else 1.0 for s in pixdim[1:dimension + 1]]
+    origin = [0.0] * dimension
+    direction = numpy.identity(dimension)
+
+    if sform_code > 0:
+        matrix = numpy.stack([read('f4', 280 + 16 * row, 4) for row in range(3)]).astype(float)
+        affine, translation = matrix[:, :3], matrix[:, 3]
+        norms = numpy.linalg.norm(affine, axis=0)
+        norms[norms == 0] = 1.0
+        affine = affine / norms
+        spacing[:spatial_dimension] = norms[:spatial_dimension]
+    elif qform_code > 0:
+        b, c, d = read('f4', 256, 3).astype(float)
+        a = math.sqrt(max(0.0, 1.0 - (b * b + c * c + d * d)))
+        affine = numpy.array([
+            [a * a + b * b - c * c - d * d, 2 * (b * c - a * d), 2 * (b * d + a * c)],
+            [2 * (b * c + a * d), a * a + c * c - b * b - d * d, 2 * (c * d - a * b)],
+            [2 * (b * d - a * c), 2 * (c * d + a * b), a * a + d * d - c * c - b * b],
+        ])
+        affine[:, 2] *= -1.0 if pixdim[0] < 0 else 1.0
+        translation = read('f4', 268, 3).astype(float)
+    else:
+        affine = numpy.identity(3)
+        translation = numpy.zeros(3)
+
+    # NIfTI uses RAS coordinates while SimpleITK uses LPS coordinates.
+    affine[:2] *= -1
+    translation[:2] *= -1
+    direction[:spatial_dimension, :spatial_dimension] = affine[:spatial_dimension, :spatial_dimension]
+    origin[:spatial_dimension] = translation[:spatial_dimension]
+
+    if magic == b'ni1\x00':
+        path = path.with_suffix('.img')
+
+    return {
+        'path': path,
+        'size': size,
+        'data_type': data_type,
+        'offset': offset,
+        'spacing': spacing,
+        'origin': origin,
+        'direction': direction.reshape(-1),
+    }
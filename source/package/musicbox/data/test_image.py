@@ -83,3 +83,185 @@ class TestVTKImageCreation(unittest.TestCase):
         input_image = create_vtk_image(input_pixels)
         output_image = create_vtk_image(input_image)
         self.assertTrue(numpy.array_equal(input_pixels, pixels(output_image)))
+
+
+class TestSharedImageCreation(unittest.TestCase):
+
+    test_shape = (2, 5, 3)
+
+    def test_vtk_image_shares_numpy_array(self):
+        input_pixels = numpy.random.rand(*self.test_shape)
+        image = create_vtk_image(input_pixels, share=True)
+        self.assertTrue(numpy.shares_memory(input_pixels, pixels(image)))
+
+    def test_vtk_image_shares_sitk_image(self):
+        input_image = create_sitk_image(numpy.random.rand(*self.test_shape))
+        image = create_vtk_image(input_image, share=True)
+        self.assertTrue(numpy.shares_memory(pixels(input_image), pixels(image)))
+
+    def test_vtk_image_shares_vtk_image(self):
+        input_image = create_vtk_image(self.test_shape)
+        image = create_vtk_image(input_image, share=True)
+        self.assertTrue(numpy.shares_memory(pixels(input_image), pixels(image)))
+
+    def test_shared_source_stays_alive(self):
+        input_pixels = numpy.random.rand(*self.test_shape)
+        image = create_vtk_image(create_sitk_image(input_pixels), share=True)
+        self.assertTrue(numpy.array_equal(input_pixels, pixels(image)))
+
+    def test_non_contiguous_array_cannot_be_shared(self):
+        input_pixels = numpy.random.rand(*self.test_shape).transpose()
+        with self.assertRaises(ValueError):
+            create_vtk_image(input_pixels, share=True)
+
+    def test_unsupported_type_cannot_be_shared(self):
+        input_pixels = numpy.zeros(self.test_shape, dtype=numpy.float16)
+        with self.assertRaises(ValueError):
+            create_vtk_image(input_pixels, share=True)
+
+    def test_sitk_image_cannot_share_numpy_array(self):
+        with self.assertRaises(ValueError):
+            create_sitk_image(numpy.zeros(self.test_shape), share=True)
+
+
+class TestImageDimensions(unittest.TestCase):
+
+    test_shape = (4, 2, 5, 3)
+
+    def test_4d_sitk_image_with_shape(self):
+        image = create_sitk_image(self.test_shape)
+        self.assertEqual(self.test_shape, image.GetSize())
+
+    def test_4d_sitk_image_with_numpy_array(self):
+        input_pixels = numpy.random.rand(*self.test_shape)
+        image = create_sitk_image(input_pixels)
+        self.assertEqual(self.test_shape[::-1], image.GetSize())
+
+
+class TestImagePyramid(unittest.TestCase):
+
+    test_shape = (16, 10, 3)
+
+    def test_level_sizes(self):
+        pyramid = ImagePyramid(create_sitk_image(self.test_shape))
+        self.assertEqual(pyramid.level_count(), 5)
+        for index in range(pyramid.level_count()):
+            self.assertEqual(pyramid.level(index).GetSize(), pyramid.level_size(index))
+        self.assertEqual(pyramid.level_size(4), (1, 1, 1))
+
+    def test_level_spacing(self):
+        pyramid = ImagePyramid(create_sitk_image(self.test_shape, spacing=(1.0, 1.0, 1.0)))
+        self.assertEqual(pyramid.level(2).GetSpacing(), (4.0, 4.0, 2.0))
+
+    def test_level_for_resolution(self):
+        pyramid = ImagePyramid(create_sitk_image(self.test_shape))
+        self.assertEqual(pyramid.level_for_resolution(4), 2)
+        self.assertEqual(pyramid.level_for_resolution((8, 2)), 1)
+        self.assertEqual(pyramid.level_for_resolution(1000), 0)
+
+    def test_memory_budget(self):
+        pyramid = ImagePyramid(create_sitk_image(self.test_shape), memory_budget=0)
+        pyramid.level(3)
+        self.assertEqual(pyramid.cached_bytes(), 2 * 1 * 1)
+
+    def test_vtk_level(self):
+        pyramid = ImagePyramid(numpy.random.rand(8, 8, 8))
+        image = pyramid.level(1, image_type='vtk')
+        self.assertTrue(numpy.array_equal(pixels(image), pixels(pyramid.level(1))))
+        self.assertEqual(image.GetSpacing(), (2.0, 2.0, 2.0))
+        self.assertEqual(image.GetOrigin(), (0.5, 0.5, 0.5))
+
+    def test_2d_vtk_level(self):
+        pyramid = ImagePyramid(numpy.random.rand(8, 6))
+        image = pyramid.level(1, image_type='vtk')
+        self.assertEqual(image.GetDimensions(), (4, 3, 1))
+        self.assertEqual(image.GetSpacing(), (2.0, 2.0, 1.0))
+        self.assertTrue(numpy.array_equal(pixels(image).reshape(4, 3), pixels(pyramid.level(1))))
+
+
+class TestImageSlicer(unittest.TestCase):
+
+    def setUp(self):
+        self.image = create_vtk_image(numpy.random.rand(4, 5, 6))
+        x, y, z = self.image.GetDimensions()
+        self.volume = numpy_support.vtk_to_numpy(self.image.GetPointData().GetScalars()).reshape(z, y, x)
+
+    def test_slices(self):
+        slicer = ImageSlicer(self.image)
+        self.assertEqual(slicer.slice_count('axial'), 6)
+        self.assertTrue(numpy.array_equal(slicer.slice('axial', 2), self.volume[2]))
+        self.assertTrue(numpy.array_equal(slicer.slice('coronal', 3), self.volume[:, 3]))
+        self.assertTrue(numpy.array_equal(slicer.slice('sagittal', 1), self.volume[:, :, 1]))
+        for plane in slicer.planes:
+            self.assertEqual(slicer.slice(plane, 0).shape, slicer.slice_shape(plane))
+        self.image.SetOrigin(1.0, 2.0, 3.0)
+        self.assertEqual(slicer.slice_origin('coronal'), (1.0, 3.0))
+        with self.assertRaises(IndexError):
+            slicer.slice('sagittal', 4)
+        with self.assertRaises(KeyError):
+            slicer.slice_count('oblique')
+
+    def test_recycled_buffers(self):
+        slicer = ImageSlicer(self.image, cache_size=2)
+        out = numpy.empty(slicer.slice_shape('axial'))
+        for index in range(6):
+            self.assertIs(slicer.slice('axial', index, out=out), out)
+            self.assertTrue(numpy.array_equal(out, self.volume[index]))
+        cache = slicer._caches['axial']
+        buffers = {id(b) for b in cache.values()}
+        slicer.slice('axial', 0)
+        slicer.slice('axial', 1)
+        self.assertEqual({id(b) for b in cache.values()}, buffers)
+
+    def test_returned_views(self):
+        slicer = ImageSlicer(self.image, cache_size=2)
+        view = slicer.slice('axial', 0)
+        self.assertFalse(view.flags.writeable)
+        self.assertTrue(numpy.shares_memory(view, slicer._caches['axial'][0]))
+        for index in range(1, 6):
+            slicer.slice('axial', index)
+        # The buffer of a view which is still referenced is not recycled.
+        self.assertTrue(numpy.array_equal(view, self.volume[0]))
+
+    def test_modified_image(self):
+        slicer = ImageSlicer(self.image)
+        slicer.slice('axial', 0)
+        self.volume[0] = 2
+        self.image.GetPointData().GetScalars().Modified()
+        self.assertTrue((slicer.slice('axial', 0) == 2).all())
+
+
+class TestImageBatchCreation(unittest.TestCase):
+
+    test_shape = (2, 5, 3)
+
+    def test_vtk_images_share_one_buffer(self):
+        images = create_vtk_images(self.test_shape, numpy.float32, count=4)
+        self.assertEqual(len(images), 4)
+        pixels(images)[2] = 1
+        self.assertTrue(numpy.all(pixels(images[2]) == 1))
+        self.assertTrue(numpy.all(pixels(images[1]) == 0))
+        self.assertEqual(pixels(images).shape, (4, *self.test_shape))
+
+    def test_vtk_images_with_numpy_array(self):
+        input_pixels = numpy.random.rand(4, *self.test_shape)
+        images = create_vtk_images(input_pixels)
+        self.assertTrue(numpy.shares_memory(input_pixels, pixels(images[3])))
+        self.assertTrue(numpy.array_equal(input_pixels[3], pixels(images[3])))
+
+    def test_vtk_images_with_unsupported_type(self):
+        with self.assertRaises(ValueError):
+            create_vtk_images(numpy.zeros((4, *self.test_shape), dtype=numpy.float16))
+        with self.assertRaises(ValueError):
+            create_vtk_images(self.test_shape, numpy.float16, count=4)
+
+    def test_sitk_images(self):
+        input_pixels = numpy.random.rand(4, *self.test_shape)
+        images = create_sitk_images(input_pixels)
+        self.assertIsInstance(images[0], sitk.Image)
+        self.assertTrue(numpy.array_equal(input_pixels, pixels(images)))
+
+    def test_sitk_images_with_shape(self):
+        images = create_sitk_images(self.test_shape, numpy.int16, count=3)
+        self.assertEqual(pixels(images).shape, (3, *self.test_shape[::-1]))
+        self.assertEqual(images[0].GetPixelIDValue(), sitk_type_map[numpy.int16])
@@ -0,0 +1,100 @@
+# Copyright (c) 2024 IHU Liryc, Université de Bordeaux, Inria.
+# License: BSD-3-Clause
+
+
+from pathlib import Path
+import tempfile
+import unittest
+
+from .image import *
+from .io import *
+
+
+class TestImageIO(unittest.TestCase):
+
+    test_shape = (2, 5, 3)
+
+    def setUp(self):
+        self._directory = tempfile.TemporaryDirectory()
+        self.directory = Path(self._directory.name)
+        self.input_pixels = [numpy.random.rand(*self.test_shape) for i in range(8)]
+        self.paths = [self.directory / f'image_{i}.nrrd' for i in range(8)]
+
+    def tearDown(self):
+        self._directory.cleanup()
+
+    def test_round_trip(self):
+        write_images(self.input_pixels, self.paths, max_workers=3)
+        images = read_images(self.paths, max_workers=3)
+        for input_pixels, image in zip(self.input_pixels, images):
+            self.assertIsInstance(image, sitk.Image)
+            self.assertTrue(numpy.array_equal(input_pixels, pixels(image)))
+
+    def test_vtk_images(self):
+        write_images(self.input_pixels, self.paths)
+        images = read_images(self.paths, image_type='vtk')
+        for input_pixels, image in zip(self.input_pixels, images):
+            self.assertIsInstance(image, vtk.vtkImageData)
+            self.assertTrue(numpy.array_equal(input_pixels, pixels(image)))
+
+    def test_vtk_image_attributes(self):
+        direction = (0.0, 1.0, 0.0, -1.0, 0.0, 0.0, 0.0, 0.0, 1.0)
+        input_image = create_sitk_image(self.input_pixels[0], spacing=(0.5, 0.7, 2.0), origin=(1.0, 2.0, 3.0),
+                                        direction=direction)
+        write_images([input_image], self.paths[:1])
+        image = read_image(self.paths[0], image_type='vtk')
+        self.assertTrue(numpy.array_equal(self.input_pixels[0], pixels(image)))
+        numpy.testing.assert_allclose(image.GetSpacing(), (2.0, 0.7, 0.5))
+        numpy.testing.assert_allclose(image.GetOrigin(), (3.0, 2.0, 1.0))
+        matrix = image.GetDirectionMatrix()
+        numpy.testing.assert_allclose([matrix.GetElement(i // 3, i % 3) for i in range(9)], direction[::-1])
+        with self.assertRaises(ValueError):
+            read_image(self.paths[0], image_type='numpy')
+
+    def test_progress(self):
+        calls = []
+        write_images(self.input_pixels, self.paths)
+        read_images(self.paths, progress=lambda done, total: calls.append((done, total)))
+        self.assertEqual(calls, [(i + 1, 8) for i in range(8)])
+
+    def test_errors_are_raised(self):
+        with self.assertRaises(RuntimeError):
+            read_images([self.directory / 'missing.nrrd'])
+
+    def test_dicom_series(self):
+        volume = self._write_dicom_series()
+        image = read_dicom_series(self.directory)
+        self.assertTrue(numpy.array_equal(pixels(volume), pixels(image)))
+        self.assertEqual(image.GetSpacing(), volume.GetSpacing())
+        self.assertEqual(image.GetOrigin(), volume.GetOrigin())
+
+    def test_dicom_series_as_vtk_image(self):
+        volume = self._write_dicom_series()
+        image = read_dicom_series(self.directory, image_type='vtk')
+        self.assertTrue(numpy.array_equal(pixels(volume), pixels(image)))
+        self.assertEqual(image.GetSpacing(), volume.GetSpacing()[::-1])
+        self.assertEqual(image.GetOrigin(), volume.GetOrigin()[::-1])
+
+    def test_dicom_series_stream(self):
+        volume = self._write_dicom_series()
+        progress = []
+        for image, done, total in stream_dicom_series(self.directory, max_workers=2):
+            progress.append(done)
+            self.assertTrue(numpy.array_equal(pixels(volume)[0], pixels(image)[0]))
+        self.assertEqual(progress, [1, 2, 3, 4])
+        self.assertTrue(numpy.array_equal(pixels(volume), pixels(image)))
+
+    def _write_dicom_series(self):
+        volume = create_sitk_image((numpy.random.rand(4, 6, 7) * 1000).astype(numpy.int16),
+                                   spacing=(0.5, 0.7, 2.0), origin=(1.0, 2.0, 3.0))
+        writer = sitk.ImageFileWriter()
+        writer.KeepOriginalImageUIDOn()
+        for i in range(volume.GetDepth()):
+            image_slice = volume[:, :, i]
+            position = volume.TransformIndexToPhysicalPoint((0, 0, i))
+            image_slice.SetMetaData('0020|0032', '\\'.join(str(p) for p in position))
+            image_slice.SetMetaData('0020|0037', '1\\0\\0\\0\\1\\0')
+            image_slice.SetMetaData('0020|000e', '1.2.3')
+            writer.SetFileName(str(self.directory / f'{i}.dcm'))
+            writer.Execute(image_slice)
+        return volume
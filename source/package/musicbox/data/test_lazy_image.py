@@ -0,0 +1,82 @@
+# Copyright (c) 2024 IHU Liryc, Université de Bordeaux, Inria.
+# License: BSD-3-Clause
+
+
+from pathlib import Path
+import tempfile
+import unittest
+
+from .image import *
+
+
+class TestLazyImage(unittest.TestCase):
+
+    test_size = (3, 5, 2, 6)
+
+    def setUp(self):
+        self.input_pixels = numpy.random.rand(*self.test_size[::-1])
+        self.loaded_frames = []
+
+    def _load(self, start, stop):
+        self.loaded_frames.extend(range(start, stop))
+        return self.input_pixels[start:stop]
+
+    def _create(self, **kwargs):
+        return create_lazy_image(self._load, self.test_size, numpy.float64, **kwargs)
+
+    def test_nothing_is_loaded_on_creation(self):
+        self._create()
+        self.assertEqual(self.loaded_frames, [])
+
+    def test_indexing_only_loads_required_frames(self):
+        image = self._create()
+        self.assertTrue(numpy.array_equal(image[2, 1], self.input_pixels[2, 1]))
+        self.assertTrue(numpy.array_equal(image[3:5, :, 0], self.input_pixels[3:5, :, 0]))
+        self.assertEqual(sorted(self.loaded_frames), [2, 3, 4])
+
+    def test_chunks_are_cached(self):
+        image = self._create(chunk_size=2)
+        image[0]
+        image[1]
+        self.assertEqual(self.loaded_frames, [0, 1])
+
+    def test_memory_budget_evicts_least_recently_used_chunks(self):
+        frame_bytes = self.input_pixels[0].nbytes
+        image = self._create(memory_budget=2 * frame_bytes)
+        image[0]
+        image[1]
+        image[0]
+        image[2]
+        self.assertEqual(image.cached_bytes(), 2 * frame_bytes)
+        image[0]
+        image[1]
+        self.assertEqual(self.loaded_frames, [0, 1, 2, 1])
+
+    def test_pixels_conversion(self):
+        image = self._create()
+        self.assertTrue(numpy.array_equal(numpy.asarray(pixels(image)), self.input_pixels))
+        sitk_image = create_sitk_image(image)
+        self.assertTrue(numpy.array_equal(pixels(sitk_image), self.input_pixels))
+
+    def test_frame_is_sitk_image(self):
+        image = self._create(spacing=(0.5, 1.0, 2.0, 40.0))
+        frame = image.frame(3)
+        self.assertEqual(frame.GetSize(), self.test_size[:3])
+        self.assertEqual(frame.GetSpacing(), (0.5, 1.0, 2.0))
+        self.assertTrue(numpy.array_equal(pixels(frame), self.input_pixels[3]))
+
+    def test_mapped_image_source(self):
+        with tempfile.TemporaryDirectory() as directory:
+            mapped_image = create_mapped_image(Path(directory) / 'image.nrrd', self.input_pixels)
+            image = create_lazy_image(mapped_image, memory_budget=0)
+            self.assertEqual(image.size(), self.test_size)
+            self.assertTrue(numpy.array_equal(image[4], self.input_pixels[4]))
+            del image, mapped_image
+
+    def test_mapped_image_source_with_array_attributes(self):
+        with tempfile.TemporaryDirectory() as directory:
+            mapped_image = create_mapped_image(Path(directory) / 'image.nrrd', self.input_pixels)
+            image = create_lazy_image(mapped_image, spacing=numpy.full(4, 2.0), direction=numpy.identity(4).ravel())
+            self.assertEqual(image.spacing(), (2.0,) * 4)
+            self.assertEqual(image.direction(), tuple(numpy.identity(4).ravel()))
+            del image, mapped_image
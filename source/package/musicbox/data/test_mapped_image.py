@@ -0,0 +1,103 @@
+# Copyright (c) 2024 IHU Liryc, Université de Bordeaux, Inria.
+# License: BSD-3-Clause
+
+
+from pathlib import Path
+import tempfile
+import unittest
+
+from .image import *
+
+
+class TestMappedImage(unittest.TestCase):
+
+    test_shape = (2, 5, 3)
+
+    def setUp(self):
+        self._directory = tempfile.TemporaryDirectory()
+        self.directory = Path(self._directory.name)
+
+    def tearDown(self):
+        self._directory.cleanup()
+
+    def test_pixels_are_memmap(self):
+        image = create_mapped_image(self.directory / 'image.nrrd', self.test_shape, numpy.float32)
+        self.assertIsInstance(pixels(image), numpy.memmap)
+        self.assertEqual(pixels(image).shape, self.test_shape[::-1])
+
+    def test_nrrd_round_trip(self):
+        path = self.directory / 'image.nrrd'
+        input_pixels = numpy.random.rand(*self.test_shape)
+        image = create_mapped_image(path, input_pixels, spacing=(0.5, 1.0, 2.0))
+        image.flush()
+        image = open_mapped_image(path)
+        self.assertTrue(numpy.array_equal(input_pixels, pixels(image)))
+        self.assertEqual(image.spacing(), (0.5, 1.0, 2.0))
+
+    def test_raw_file(self):
+        path = self.directory / 'image.raw'
+        input_pixels = numpy.arange(30, dtype=numpy.int16).reshape(self.test_shape)
+        input_pixels.tofile(path)
+        image = open_mapped_image(path, self.test_shape[::-1], numpy.int16)
+        self.assertTrue(numpy.array_equal(input_pixels, pixels(image)))
+
+    def test_nrrd_written_by_sitk(self):
+        self._test_file_written_by_sitk(self.directory / 'image.nrrd')
+
+    def test_nifti_written_by_sitk(self):
+        self._test_file_written_by_sitk(self.directory / 'image.nii')
+
+    def test_4d_nifti_written_by_sitk(self):
+        path = self.directory / 'image.nii'
+        input_image = sitk.GetImageFromArray(numpy.random.rand(4, *self.test_shape).astype(numpy.float32), isVector=False)
+        sitk.WriteImage(input_image, str(path), False)
+        image = open_mapped_image(path)
+        self.assertEqual(image.size(), input_image.GetSize())
+        self.assertTrue(numpy.array_equal(pixels(input_image)[1:3], pixels(image)[1:3]))
+
+    def test_sitk_image_from_mapped_image(self):
+        input_pixels = numpy.random.rand(*self.test_shape)
+        mapped_image = create_mapped_image(self.directory / 'image.nrrd', input_pixels, spacing=(0.5, 1.0, 2.0))
+        image = create_sitk_image(mapped_image)
+        self.assertTrue(numpy.array_equal(input_pixels, pixels(image)))
+        self.assertEqual(image.GetSpacing(), (0.5, 1.0, 2.0))
+
+    def test_vtk_image_shares_mapped_image(self):
+        mapped_image = create_mapped_image(self.directory / 'image.nrrd', self.test_shape, numpy.float32)
+        image = create_vtk_image(mapped_image, share=True)
+        pixels(image)[0, 0, 0] = 1
+        self.assertEqual(pixels(mapped_image)[0, 0, 0], 1)
+
+    def test_vtk_image_from_big_endian_file(self):
+        path = self.directory / 'image.raw'
+        input_pixels = numpy.arange(30, dtype='>i2').reshape(self.test_shape)
+        input_pixels.tofile(path)
+        image = create_vtk_image(open_mapped_image(path, self.test_shape[::-1], numpy.dtype('>i2')))
+        self.assertTrue(numpy.array_equal(input_pixels, pixels(image)))
+
+    def test_vtk_image_attributes_from_mapped_image(self):
+        mapped_image = create_mapped_image(self.directory / 'image.nrrd', self.test_shape, numpy.float32,
+                                           spacing=(0.5, 1.0, 2.0), origin=(1.0, 2.0, 3.0))
+        image = create_vtk_image(mapped_image)
+        self.assertEqual(image.GetSpacing(), (2.0, 1.0, 0.5))
+        self.assertEqual(image.GetOrigin(), (3.0, 2.0, 1.0))
+        image = create_vtk_image(mapped_image, spacing=(1.0, 1.0, 1.0))
+        self.assertEqual(image.GetSpacing(), (1.0, 1.0, 1.0))
+
+    def test_attributes_given_as_arrays(self):
+        input_image = create_sitk_image(self.test_shape, origin=(1.0, 2.0, 3.0))
+        image = create_mapped_image(self.directory / 'image.nrrd', input_image,
+                                    spacing=numpy.array([0.5, 1.0, 2.0]), origin=(0.0, 0.0, 0.0))
+        numpy.testing.assert_allclose(image.spacing(), (0.5, 1.0, 2.0))
+        numpy.testing.assert_allclose(image.origin(), (0.0, 0.0, 0.0))
+
+    def _test_file_written_by_sitk(self, path):
+        input_image = create_sitk_image(numpy.random.rand(*self.test_shape).astype(numpy.float32),
+                                        spacing=(0.5, 1.0, 2.0), origin=(1.0, 2.0, 3.0))
+        sitk.WriteImage(input_image, str(path), False)
+        image = open_mapped_image(path)
+        self.assertTrue(numpy.array_equal(pixels(input_image), pixels(image)))
+        self.assertEqual(image.size(), input_image.GetSize())
+        numpy.testing.assert_allclose(image.spacing(), input_image.GetSpacing())
+        numpy.testing.assert_allclose(image.origin(), input_image.GetOrigin())
+        numpy.testing.assert_allclose(image.direction(), input_image.GetDirection(), atol=1e-6)
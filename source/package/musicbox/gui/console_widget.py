@@ -9,11 +9,13 @@ from musicbox.core import completer, config, console
 from .line_edit import LineEdit
 
 if config.pyside_version() == 2:
-    from PySide2.QtCore import QCoreApplication, QEventLoop, Qt, Signal, Slot
-    from PySide2.QtWidgets import QLabel, QScrollArea, QVBoxLayout, QWidget
+    from PySide2.QtCore import Qt, QTimer, Signal, Slot
+    from PySide2.QtGui import QTextCursor
+    from PySide2.QtWidgets import QPlainTextEdit, QVBoxLayout, QWidget
 else:
-    from PySide6.QtCore import QCoreApplication, QEventLoop, Qt, Signal, Slot
-    from PySide6.QtWidgets import QLabel, QScrollArea, QVBoxLayout, QWidget
+    from PySide6.QtCore import Qt, QTimer, Signal, Slot
+    from PySide6.QtGui import QTextCursor
+    from PySide6.QtWidgets import QPlainTextEdit, QVBoxLayout, QWidget
 
 
 class ConsoleWidget(QWidget):
@@ -22,15 +24,30 @@ class ConsoleWidget(QWidget):
     (The console must be created before this widget)
     In addition to providing a GUI for the console, this widget adds code
     completion using the tab key.
+
+    The lines entered are run by the interpreter worker thread of the console,
+    so that the GUI stays responsive. Ctrl+C interrupts the running code. The
+    views and props are still created and modified in the main thread (see
+    view._ViewManager.call_in_main_thread).
+
+    The output is appended to a document which keeps the last
+    'scrollback_line_count' lines. Writes can be made from any thread: they
+    are buffered and the buffer is flushed to the document at most once per
+    'output_flush_interval' milliseconds.
     """
 
+    scrollback_line_count = 10000
+    output_flush_interval = 16
+
     run_ended = Signal()
 
-    def __init__(self, parent=None, *, size=(800, 600), title="MusicBox Python console", globals={}):
+    _output_written = Signal()
+
+    def __init__(self, parent=None, *, size=(800, 600), title="MusicBox Python console", globals={}, history=None):
         super().__init__(parent)
         self._init_window(size, title)
         self._init_output_widget()
-        self._init_console(globals)
+        self._init_console(globals, history)
         self._init_input_widget()
         self._init_fonts()
         self._init_code_completion()
@@ -43,20 +60,22 @@ class ConsoleWidget(QWidget):
         self.resize(*size)
 
     def _init_output_widget(self):
-        self._output_widget = QLabel()
-        self._output_widget.setAlignment(Qt.AlignBottom)
-        self._output_widget.setWordWrap(True)
-        self._output_widget.setTextFormat(Qt.PlainText)
-        self._scroll_area = QScrollArea()
-        self._scroll_area.setWidget(self._output_widget)
-        self._scroll_area.setWidgetResizable(True)
-        self._scroll_area.horizontalScrollBar().setEnabled(False)
-        scroll_bar = self._scroll_area.verticalScrollBar()
-        scroll_bar.rangeChanged.connect(lambda _, max : scroll_bar.setValue(max))
-        self.layout().addWidget(self._scroll_area)
-
-    def _init_console(self, globals):
-        self._console = console.Console(globals=globals)
+        self._output_widget = QPlainTextEdit()
+        self._output_widget.setReadOnly(True)
+        self._output_widget.setUndoRedoEnabled(False)
+        self._output_widget.setMaximumBlockCount(self.scrollback_line_count)
+        self._output_widget.setFocusPolicy(Qt.NoFocus)
+        self._output_buffer = []
+        self._output_lock = threading.Lock()
+        self._output_timer = QTimer(self)
+        self._output_timer.setSingleShot(True)
+        self._output_timer.timeout.connect(self._flush_output)
+        self._output_written.connect(self._schedule_output_flush)
+        self.layout().addWidget(self._output_widget)
+
+    def _init_console(self, globals, history):
+        self._console = console.Console(globals=globals, history=history)
+        self._history_search = None
 
     def _init_input_widget(self):
         self._input_widget = LineEdit()
@@ -68,6 +87,10 @@ class ConsoleWidget(QWidget):
         self._input_widget.up.connect(self._update_input_widget)
         self._input_widget.down.connect(self._console.move_down_history)
         self._input_widget.down.connect(self._update_input_widget)
+        self._input_widget.interrupt.connect(self._console.interrupt)
+        self._input_widget.search.connect(self._search_history)
+        self._console.submitted_line_done.connect(self._update_input_widget)
+        self._console.busy_changed.connect(self._set_busy)
 
     def _init_fonts(self):
         font = self._output_widget.font()
@@ -81,11 +104,13 @@ class ConsoleWidget(QWidget):
         self._input_widget.tab.connect(self._completer.complete)
         self._completer.possible_completions.connect(self._show_possible_completions)
         self._completer.successful_completion.connect(self._input_widget.setText)
+        # The lines run can modify the attributes of the objects.
+        self._console.submitted_line_done.connect(self._completer.clear_cache)
 
     def run(self, *, on_exit=sys.exit):
         self._setup_output_streams()
         self._console.run_ended.connect(self.run_ended)
-        self._console.run(command_line_thread=threading.main_thread())
+        self._console.run(use_worker=True)
         self._console.run_ended.connect(self._restore_output_streams)
 
     def _setup_output_streams(self):
@@ -101,34 +126,95 @@ class ConsoleWidget(QWidget):
   
     @Slot(str, str)
     def _handle_input(self, text, prompt):
-        print(f'{prompt}{text}')
-        self._output_widget.repaint()
+        # The output is written directly, since the console decorates the
+        # prints which do not come from the interpreter thread.
+        self.write(f'{prompt}{text}\n')
+        self._flush_output()
         self._input_widget.set_prompt()
         self._input_widget.setText()
-        self._input_widget.repaint()
-        QCoreApplication.instance().processEvents(QEventLoop.ExcludeUserInputEvents)
-        self._console.push(text)
-        self._update_input_widget()
+        self._console.submit(text)
+
+    @Slot(bool)
+    def _set_busy(self, busy):
+        self._input_widget.setReadOnly(busy)
+        if busy:
+            self.setCursor(Qt.BusyCursor)
+        else:
+            self.unsetCursor()
+
+    @Slot(str)
+    def _search_history(self, text):
+        """Replace the input with the most recent history entry matching it.
+
+        Searching again while the input is unchanged moves to the next older
+        match (see History.fuzzy_search).
+
+        """
+        if self._history_search and text == self._history_search[1][self._history_search[2]]:
+            query, matches, index = self._history_search
+            index = min(index + 1, len(matches) - 1)
+        else:
+            query, matches, index = text, self._console.history().fuzzy_search(text, limit=100), 0
+        if matches:
+            self._history_search = (query, matches, index)
+            self._input_widget.setText(matches[index])
 
     def _update_input_widget(self):
         self._input_widget.set_prompt(self._console.prompt())
         self._input_widget.setText(self._console.current_history_entry())
 
     def write(self, text):
-        self._output_widget.setText(f'{self._output_widget.text()}{text}')
+        with self._output_lock:
+            first_write = not self._output_buffer
+            self._output_buffer.append(text)
+        if first_write:
+            self._output_written.emit()
 
     def flush(self):
         pass
 
+    @Slot()
+    def _schedule_output_flush(self):
+        if not self._output_timer.isActive():
+            self._output_timer.start(self.output_flush_interval)
+
+    @Slot()
+    def _flush_output(self):
+        with self._output_lock:
+            text = ''.join(self._output_buffer)
+            self._output_buffer.clear()
+        if not text:
+            return
+
+        # Lines which would be discarded from the scrollback are not inserted.
+        lines = text.split('\n')
+        if len(lines) > self.scrollback_line_count:
+            text = '\n'.join(lines[-self.scrollback_line_count:])
+
+        scroll_bar = self._output_widget.verticalScrollBar()
+        at_bottom = scroll_bar.value() == scroll_bar.maximum()
+        cursor = QTextCursor(self._output_widget.document())
+        cursor.movePosition(QTextCursor.End)
+        cursor.insertText(text)
+        if at_bottom:
+            scroll_bar.setValue(scroll_bar.maximum())
+
+    def output_text(self):
+        """The text of the output pane (after flushing the pending output).
+
+        """
+        self._flush_output()
+        return self._output_widget.toPlainText()
+
     def showEvent(self, event):
         self.setFocus()
 
     @Slot(list)
     def _show_possible_completions(self, completions):
-        print(f'{self._input_widget.prompt()}{self._input_widget.text()}')
+        self.write(f'{self._input_widget.prompt()}{self._input_widget.text()}\n')
         for i in range(len(completions)):
-            sys.stdout.write(f'{completions[i]}\t\t')
-        sys.stdout.write('\n')
+            self.write(f'{completions[i]}\t\t')
+        self.write('\n')
 
 
 class _StreamWrapper():
@@ -3,12 +3,19 @@
 
 
 import sys
+import threading
+import time
 import unittest
 
 from musicbox import app
-from musicbox.core import console
+from musicbox.core import config, console
 from .console_widget import ConsoleWidget
 
+if config.pyside_version() == 2:
+    from PySide2.QtCore import QCoreApplication
+else:
+    from PySide6.QtCore import QCoreApplication
+
 
 class TestConsoleWidget(unittest.TestCase):
 
@@ -45,3 +52,77 @@ class TestConsoleWidget(unittest.TestCase):
         output = ''.join(capture.output).split()
         for name in names:
             self.assertIn(name, output)
+
+
+class TestConsoleOutput(unittest.TestCase):
+
+    def setUp(self):
+        self.console_widget = ConsoleWidget()
+
+    def test_buffered_output(self):
+        self.console_widget.write('first ')
+        self.console_widget.write('line\nsecond line')
+        self.assertEqual(self.console_widget._output_widget.toPlainText(), '')
+        self.assertEqual(self.console_widget.output_text(), 'first line\nsecond line')
+
+    def test_output_from_threads(self):
+        threads = [threading.Thread(target=self.console_widget.write, args=(f'{i}\n',)) for i in range(10)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        lines = self.console_widget.output_text().split()
+        self.assertEqual(sorted(lines, key=int), [str(i) for i in range(10)])
+
+    def test_history_search(self):
+        history = self.console_widget._console.history()
+        for entry in ('read_image(path)', 'mesh.box()', 'image = read_image(other)'):
+            history.add(entry)
+        self.console_widget._search_history('rdimg')
+        self.assertEqual(self.console_widget._input_widget.text(), 'image = read_image(other)')
+        self.console_widget._search_history('image = read_image(other)')
+        self.assertEqual(self.console_widget._input_widget.text(), 'read_image(path)')
+
+    def test_bounded_scrollback(self):
+        self.console_widget.write(''.join(f'{i}\n' for i in range(100000)))
+        self.console_widget.write('end')
+        lines = self.console_widget.output_text().split('\n')
+        self.assertLessEqual(len(lines), ConsoleWidget.scrollback_line_count)
+        self.assertEqual(lines[-2:], ['99999', 'end'])
+
+
+class TestConsoleExecution(unittest.TestCase):
+
+    def setUp(self):
+        self.console_widget = ConsoleWidget()
+        self.console_widget.run()
+
+    def tearDown(self):
+        self.console_widget._console.end_run()
+
+    def test_background_execution(self):
+        self.console_widget._handle_input('import threading; threading.current_thread().name', '>>> ')
+        self._wait_until(lambda: "'Console interpreter'" in self.console_widget.output_text())
+        self._wait_until(lambda: self.console_widget._input_widget.prompt() == '>>> ')
+
+    def test_interrupt(self):
+        self.console_widget._handle_input('sum(1 for _ in iter(int, 1))', '>>> ')
+        self._wait_until(self.console_widget._input_widget.isReadOnly)
+        self.assertTrue(self.console_widget._console.is_busy())
+        self.console_widget._input_widget.interrupt.emit()
+        self._wait_until(lambda: 'KeyboardInterrupt' in self.console_widget.output_text())
+        self._wait_until(lambda: not self.console_widget._input_widget.isReadOnly())
+
+    def test_completion_cache_is_cleared(self):
+        completer = self.console_widget._completer
+        completer.find_completions('threading.')
+        self.assertTrue(completer._cache)
+        self.console_widget._handle_input('test_value = 1', '>>> ')
+        self._wait_until(lambda: not completer._cache)
+
+    def _wait_until(self, condition):
+        end = time.monotonic() + 10
+        while not condition() and time.monotonic() < end:
+            QCoreApplication.processEvents()
+            time.sleep(0.005)
+        self.assertTrue(condition())
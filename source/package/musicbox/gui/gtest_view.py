@@ -2,12 +2,28 @@
 # License: BSD-3-Clause
 
 
+import gc
+from pathlib import Path
+import tempfile
+import threading
+import time
 import unittest
 
+import numpy
+import vtk
+from vtk.util import numpy_support
+
 from musicbox import mesh
+from musicbox.data.image import ImageSlicer, create_vtk_image
+from musicbox.core import config
 from .view import *
+from .view import _ViewManager
+
+if config.pyside_version() == 2:
+    from PySide2.QtCore import QCoreApplication
+else:
+    from PySide6.QtCore import QCoreApplication
 
-import time
 
 class TestView(unittest.TestCase):
 
@@ -17,11 +33,327 @@ class TestView(unittest.TestCase):
         prop2 = manager().find_or_create_prop(test_mesh, '3D')
         self.assertEqual(prop1, prop2)
 
+    def test_prop_cache_statistics(self):
+        view_manager = _ViewManager()
+        test_mesh = mesh.box()
+        prop = view_manager.find_or_create_prop(test_mesh, '3D')
+        view_manager.find_or_create_prop(test_mesh, '3D')
+        statistics = view_manager.cache_statistics()
+        self.assertEqual((statistics['hits'], statistics['misses'], statistics['props']), (1, 1, 1))
+        self.assertGreater(statistics['host_bytes'], 0)
+        self.assertGreater(statistics['gpu_bytes'], 0)
+        del test_mesh
+        gc.collect()
+        statistics = view_manager.cache_statistics()
+        self.assertEqual((statistics['releases'], statistics['props']), (1, 0))
+        self.assertEqual((statistics['host_bytes'], statistics['gpu_bytes']), (0, 0))
+
+    def test_displayed_prop_is_not_released(self):
+        view_manager = _ViewManager()
+        test_mesh = mesh.box()
+        prop = view_manager.find_or_create_prop(test_mesh, '3D')
+        renderer = vtk.vtkRenderer()
+        renderer.AddViewProp(prop)
+        del test_mesh
+        self.assertEqual(view_manager.cache_statistics()['props'], 1)
+        renderer.RemoveViewProp(prop)
+        self.assertEqual(view_manager.cache_statistics()['props'], 0)
+
+    def test_recreated_entry_observers(self):
+        view_manager = _ViewManager()
+        test_mesh = mesh.box()
+        view_manager.find_or_create_prop(test_mesh, '3D')
+        view_manager.set_memory_budgets(gpu=0)
+        view_manager.find_or_create_prop(mesh.sphere(), '3D')
+        self.assertEqual(view_manager.cache_statistics()['evictions'], 1)
+        self.assertFalse(test_mesh.HasObserver('DeleteEvent'))
+        view_manager.find_or_create_prop(test_mesh, '3D')
+        self.assertTrue(test_mesh.HasObserver('DeleteEvent'))
+
+    def test_pipeline_output_prop(self):
+        view_manager = _ViewManager()
+        source = vtk.vtkSphereSource()
+        source.Update()
+        prop = view_manager.find_or_create_prop(source.GetOutput(), '3D')
+        self.assertIs(view_manager.find_or_create_prop(source.GetOutput(), '3D'), prop)
+        statistics = view_manager.cache_statistics()
+        self.assertEqual((statistics['hits'], statistics['misses'], statistics['releases']), (1, 1, 0))
+
+    def test_prop_cache_eviction(self):
+        view_manager = _ViewManager()
+        meshes = [mesh.sphere(center=(i, 0, 0)) for i in range(4)]
+        props = [view_manager.find_or_create_prop(m, '3D') for m in meshes]
+        renderer = vtk.vtkRenderer()
+        renderer.AddViewProp(props[0])
+        view_manager.set_memory_budgets(gpu=view_manager.cache_statistics()['gpu_bytes'] // 2)
+        statistics = view_manager.cache_statistics()
+        self.assertEqual((statistics['evictions'], statistics['props']), (2, 2))
+        self.assertIs(view_manager.find_or_create_prop(meshes[0], '3D'), props[0])
+        self.assertIs(view_manager.find_or_create_prop(meshes[3], '3D'), props[3])
+        self.assertIsNot(view_manager.find_or_create_prop(meshes[1], '3D'), props[1])
+
     def test_view_creation(self):
         view = manager().create_view('3D')
         self.assertIsInstance(view, QVTKRenderWindowInteractor)
 
+    def test_2d_view(self):
+        image = create_vtk_image(numpy.random.randint(0, 100, (30, 20, 10), dtype=numpy.uint8))
+        view = manager().create_view('2D')
+        with self.assertRaises(IndexError):
+            view.set_slice_index(0)
+        view.add_data(image)
+        self.assertEqual((view.plane(), view.slice_count(), view.slice_index()), ('axial', 10, 5))
+        view.set_plane('sagittal')
+        self.assertEqual(view.slice_count(), 30)
+        with self.assertRaises(IndexError):
+            view.set_slice_index(30)
+        view.set_slice_index(3)
+        expected = view.slicer().slice('sagittal', 3)
+        displayed = numpy_support.vtk_to_numpy(view._slice_image.GetPointData().GetScalars())
+        self.assertTrue(numpy.array_equal(displayed.reshape(expected.shape), expected))
+        view._scroll(-10)
+        self.assertEqual(view.slice_index(), 0)
+        with self.assertRaises(KeyError):
+            view.set_plane('oblique')
+        with self.assertRaises(TypeError):
+            view.add_data(mesh.box())
+
     def test_primitives(self):
         view = manager().create_view('3D')
         box = mesh.box()
         view.add_data(box)
+
+    def test_lod_prop(self):
+        test_mesh = mesh.primitive.sphere(theta_resolution=200, phi_resolution=200)
+        view_manager = manager()
+        view_manager.lod_triangle_count = 1000
+        view_manager.lod_divisions = (32, 8)
+        try:
+            prop = view_manager.find_or_create_prop(test_mesh, '3D')
+        finally:
+            del view_manager.lod_triangle_count
+            del view_manager.lod_divisions
+        self.assertIsInstance(prop, vtk.vtkLODProp3D)
+        timeout = time.monotonic() + 30
+        while prop.GetNumberOfLODs() < 3 and time.monotonic() < timeout:
+            QCoreApplication.processEvents()
+            time.sleep(0.01)
+        self.assertEqual(prop.GetNumberOfLODs(), 3)
+        view = manager().create_view('3D')
+        view.add_data(test_mesh)
+        view.GetRenderWindow().Render()
+        rendered_mesh = prop.GetLODMapper(prop.GetLastRenderedLODID()).GetInput()
+        self.assertEqual(view.stats()['triangle_count'], rendered_mesh.GetNumberOfPolys())
+
+    def test_volume(self):
+        image = create_vtk_image(numpy.random.randint(0, 1000, (20, 30, 40), dtype=numpy.int16), share=True)
+        prop = manager().find_or_create_prop(image, '3D')
+        self.assertIsInstance(prop, vtk.vtkVolume)
+        self.assertIs(prop.GetMapper().GetInput(), image)
+        low, high = image.GetScalarRange()
+        self.assertEqual(prop.GetProperty().GetScalarOpacity().GetRange(), (low, high))
+        set_volume_preset(prop, 'ct-bone')
+        self.assertEqual(prop.GetProperty().GetRGBTransferFunction().GetRange(), (-1000, 1500))
+        with self.assertRaises(KeyError):
+            set_volume_preset(prop, 'unknown')
+        view = manager().create_view('3D')
+        view.add_data(image)
+        view.GetRenderWindow().Render()
+
+    def test_interactive_volume(self):
+        image = create_vtk_image(numpy.random.randint(0, 1000, (20, 30, 40), dtype=numpy.int16))
+        image.SetSpacing(1.0, 2.0, 3.0)
+        view_manager = manager()
+        view_manager.interactive_voxel_count = 2000
+        try:
+            view = view_manager.create_view('3D')
+            view.add_data(image)
+            prop = view_manager.find_or_create_prop(image, '3D')
+            level = self._wait_for_interactive_image(image)
+            self.assertEqual(level.GetDimensions(), (5, 7, 10))
+            self.assertEqual(level.GetSpacing(), (4.0, 8.0, 12.0))
+            view.interactor.SetEventInformation(100, 100)
+            view.interactor.InvokeEvent(vtk.vtkCommand.LeftButtonPressEvent)
+            self.assertIs(prop.GetMapper().GetInput(), level)
+            view.GetRenderWindow().Render()
+            view.interactor.InvokeEvent(vtk.vtkCommand.LeftButtonReleaseEvent)
+            self.assertIs(prop.GetMapper().GetInput(), image)
+        finally:
+            del view_manager.interactive_voxel_count
+
+    def test_interactive_slices(self):
+        image = create_vtk_image(numpy.random.randint(0, 100, (40, 30, 20), dtype=numpy.uint8))
+        view_manager = manager()
+        view_manager.interactive_voxel_count = 2000
+        try:
+            view = view_manager.create_view('2D')
+            view.add_data(image)
+            level = self._wait_for_interactive_image(image)
+            view.scroll_interaction_delay = 50
+            view._scroll(1)
+            self.assertIs(view._actor.GetMapper().GetInput(), view._interactive_slice_image)
+            self.assertEqual(view.slice_index(), 11)
+            expected = ImageSlicer(level).slice('axial', 2)
+            displayed = numpy_support.vtk_to_numpy(view._interactive_slice_image.GetPointData().GetScalars())
+            self.assertTrue(numpy.array_equal(displayed.reshape(expected.shape), expected))
+            self._process_events(0.2)
+            self.assertIs(view._actor.GetMapper().GetInput(), view._slice_image)
+            expected = view.slicer().slice('axial', 11)
+            displayed = numpy_support.vtk_to_numpy(view._slice_image.GetPointData().GetScalars())
+            self.assertTrue(numpy.array_equal(displayed.reshape(expected.shape), expected))
+            view.interactor.SetEventInformation(100, 100)
+            view.interactor.InvokeEvent(vtk.vtkCommand.LeftButtonPressEvent)
+            self.assertIs(view._actor.GetMapper().GetInput(), view._interactive_slice_image)
+            view.interactor.InvokeEvent(vtk.vtkCommand.LeftButtonReleaseEvent)
+            self.assertIs(view._actor.GetMapper().GetInput(), view._slice_image)
+        finally:
+            del view_manager.interactive_voxel_count
+
+    def test_offscreen_rendering(self):
+        renderer = OffscreenRenderer((64, 48), background=(1.0, 0.0, 0.0))
+        pixels = renderer.render(mesh.sphere())
+        self.assertEqual(pixels.shape, (48, 64, 3))
+        self.assertEqual(tuple(pixels[0, 0]), (255, 0, 0))
+        arrays = list(renderer.render_batch([mesh.box(), mesh.cone()]))
+        self.assertEqual(len(arrays), 2)
+        with tempfile.TemporaryDirectory() as directory:
+            paths = [Path(directory) / f'{i}.png' for i in range(2)]
+            renderer.render_batch([mesh.box(), mesh.cone()], paths)
+            self.assertTrue(all(path.stat().st_size > 0 for path in paths))
+
+    def test_render_files(self):
+        with tempfile.TemporaryDirectory() as directory:
+            writer = vtk.vtkXMLPolyDataWriter()
+            writer.SetInputData(mesh.sphere())
+            writer.SetFileName(str(Path(directory) / 'sphere.vtp'))
+            writer.Write()
+            paths = [Path(directory) / 'sphere.vtp'] * 2
+            output_paths = [Path(directory) / f'{i}.png' for i in range(2)]
+            done = []
+            render_files(paths, output_paths, size=(32, 32), max_workers=2,
+                         progress=lambda done_count, total: done.append(done_count))
+            self.assertEqual(done, [1, 2])
+            self.assertTrue(all(path.stat().st_size > 0 for path in output_paths))
+
+    def test_stats(self):
+        view = manager().create_view('3D')
+        view.add_data(mesh.box())
+        view.add_data(Glyphs(numpy.random.rand(10, 3), source=mesh.box()))
+        view.clear_stats()
+        view.GetRenderWindow().Render()
+        self.assertEqual(view.stats()['frame_count'], 0)
+        view.set_stats_enabled(True)
+        for i in range(5):
+            view.GetRenderWindow().Render()
+        stats = view.stats()
+        self.assertEqual(stats['frame_count'], 5)
+        self.assertEqual(stats['frame_time'][0].sum(), 5)
+        self.assertEqual(stats['triangle_count'], 12 * 11)
+        self.assertGreater(stats['gpu_bytes'], 0)
+        view.set_stats_overlay_visible(True)
+        self.assertTrue(view.stats_overlay_visible())
+        self.assertEqual(view.stats()['triangle_count'], 12 * 11)
+        view.set_stats_overlay_visible(False)
+        self.assertFalse(view.stats_overlay_visible())
+        view.set_stats_enabled(False)
+        view.clear_stats()
+        view.set_stats_overlay_visible(True)
+        view.GetRenderWindow().Render()
+        self.assertEqual(view.stats()['frame_count'], 1)
+
+    def test_coalesced_renders(self):
+        view = manager().create_view('3D')
+        view.add_data(mesh.box())
+        self._process_events(0.1)
+        view.set_stats_enabled(True)
+        view.clear_stats()
+        for i in range(100):
+            view.request_render()
+        self._process_events(0.1)
+        self.assertEqual(view.stats()['frame_count'], 1)
+
+    def test_call_in_main_thread(self):
+        view = manager().create_view('3D')
+        threads = []
+        results = []
+        def call():
+            results.append(view.call_in_main_thread(lambda: threads.append(threading.current_thread()) or 1))
+        self._process_events(0.1)
+        view.set_stats_enabled(True)
+        view.clear_stats()
+        worker = threading.Thread(target=call)
+        worker.start()
+        while worker.is_alive():
+            self._process_events(0.01)
+        self._process_events(0.1)
+        self.assertEqual(threads, [threading.main_thread()])
+        self.assertEqual(results, [1])
+        self.assertEqual(view.stats()['frame_count'], 1)
+
+    def test_views_created_from_worker_thread(self):
+        results = []
+        def create():
+            view = manager().create_view('3D')
+            view.add_data(mesh.box())
+            results.append(view)
+            try:
+                view.add_data(1)
+            except TypeError as e:
+                results.append(e)
+        worker = threading.Thread(target=create)
+        worker.start()
+        while worker.is_alive():
+            self._process_events(0.01)
+        view, error = results
+        self.assertEqual(view.thread(), QCoreApplication.instance().thread())
+        self.assertEqual(view.renderer.GetViewProps().GetNumberOfItems(), 1)
+        self.assertIsInstance(error, TypeError)
+
+    def test_glyphs(self):
+        positions = numpy.random.rand(1000, 3)
+        glyphs = Glyphs(positions, source=mesh.primitive.box(), scale=0.01)
+        self.assertIs(manager().find_or_create_prop(glyphs, '3D'), glyphs.actor())
+        view = manager().create_view('3D')
+        view.add_data(glyphs)
+        view.GetRenderWindow().Render()
+        self.assertEqual(glyphs.count(), 1000)
+        numpy.testing.assert_allclose(glyphs.positions(), positions, rtol=1e-6)
+
+    def test_glyph_updates(self):
+        glyphs = Glyphs(numpy.zeros((10, 3)), scalars=numpy.arange(10))
+        points = glyphs.positions()
+        glyphs.set_positions(numpy.ones((10, 3)))
+        glyphs.set_scalars(numpy.arange(10)[::-1])
+        self.assertTrue(numpy.shares_memory(points, glyphs.positions()))
+        self.assertTrue((glyphs.positions() == 1).all())
+        glyphs.set_colors(numpy.full((10, 3), 255))
+        self.assertEqual(glyphs.mapper().GetColorMode(), vtk.VTK_COLOR_MODE_DIRECT_SCALARS)
+        glyphs.set_positions(numpy.ones((20, 3)))
+        self.assertEqual(glyphs.count(), 20)
+        with self.assertRaises(ValueError):
+            glyphs.set_scalars(numpy.arange(10))
+
+    def test_glyph_count_changes(self):
+        glyphs = Glyphs(numpy.zeros((10, 3)), scalars=numpy.arange(10))
+        view = manager().create_view('3D')
+        view.add_data(glyphs)
+        glyphs.set_positions(numpy.random.rand(20, 3))
+        self.assertIsNone(glyphs.mapper().GetInput().GetPointData().GetScalars())
+        self.assertFalse(glyphs.mapper().GetScalarVisibility())
+        view.GetRenderWindow().Render()
+        glyphs.set_positions(numpy.random.rand(5, 3), colors=numpy.full((5, 3), 255))
+        self.assertEqual(glyphs.mapper().GetInput().GetPointData().GetScalars().GetNumberOfTuples(), 5)
+        self.assertTrue(glyphs.mapper().GetScalarVisibility())
+        view.GetRenderWindow().Render()
+
+    def _wait_for_interactive_image(self, image):
+        timeout = time.monotonic() + 30
+        while manager().interactive_image(image) is None and time.monotonic() < timeout:
+            time.sleep(0.01)
+        return manager().interactive_image(image)
+
+    def _process_events(self, duration):
+        end = time.monotonic() + duration
+        while time.monotonic() < end:
+            QCoreApplication.processEvents()
+            time.sleep(0.005)
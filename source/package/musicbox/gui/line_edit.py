@@ -6,9 +6,11 @@ from musicbox.core import config
 
 if config.pyside_version() == 2:
     from PySide2.QtCore import QEvent, QObject, Qt, Signal, Slot
+    from PySide2.QtGui import QKeySequence
     from PySide2.QtWidgets import QLineEdit
 else:
     from PySide6.QtCore import QEvent, QObject, Qt, Signal, Slot
+    from PySide6.QtGui import QKeySequence
     from PySide6.QtWidgets import QLineEdit
 
 
@@ -25,12 +27,18 @@ class LineEdit(QLineEdit):
     The 'line' signal sends the current prompt and the remaining text (without
     the prompt) when return is pressed.
 
+    The 'interrupt' signal is emitted when Ctrl+C is pressed without any
+    selected text, and the 'search' signal sends the current text (without the
+    prompt) when Ctrl+R is pressed.
+
     """
 
     up = Signal()
     down = Signal()
     tab = Signal(str)
     line = Signal(str, str)
+    interrupt = Signal()
+    search = Signal(str)
 
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -52,6 +60,10 @@ class LineEdit(QLineEdit):
             self.up.emit()
         elif key == Qt.Key_Down:
             self.down.emit()
+        elif event.matches(QKeySequence.Copy) and not self.hasSelectedText():
+            self.interrupt.emit()
+        elif key == Qt.Key_R and event.modifiers() & Qt.ControlModifier:
+            self.search.emit(self.text())
         elif (key != Qt.Key_Backspace and key != Qt.Key_Left) or self.cursorPosition() > len(self.prompt()):
             super().keyPressEvent(event)
         else:
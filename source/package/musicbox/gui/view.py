@@ -3,20 +3,52 @@
 
 
 from abc import ABC, abstractmethod
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+import functools
+import multiprocessing
+import os
+from pathlib import Path
+import sys
+import threading
+import time
+import weakref
+
+import numpy
 import vtk
 from vtk.qt.QVTKRenderWindowInteractor import QVTKRenderWindowInteractor
+from vtk.util import numpy_support
 
 from musicbox.core import config
+from musicbox.data.image import ImagePyramid, ImageSlicer, create_sitk_image
+from musicbox.mesh import primitive
 
 if config.pyside_version() == 2:
+    from PySide2.QtCore import QCoreApplication, QObject, Qt, QThread, QTimer, Signal
     from PySide2.QtWidgets import QWidget
 else:
+    from PySide6.QtCore import QCoreApplication, QObject, Qt, QThread, QTimer, Signal
     from PySide6.QtWidgets import QWidget
 
 
 _manager = None
 
 
+# Transfer functions of the volume props, as (value, color, opacity) points.
+# The values of the 'relative' presets are fractions of the scalar range of
+# the image, the others are absolute values (Hounsfield units for CT).
+volume_presets = {
+    'grayscale': ('relative', [(0.0, (0.0, 0.0, 0.0), 0.0), (1.0, (1.0, 1.0, 1.0), 0.8)]),
+    'mri': ('relative', [(0.0, (0.0, 0.0, 0.0), 0.0), (0.2, (0.5, 0.3, 0.2), 0.0),
+                         (0.5, (0.9, 0.7, 0.6), 0.3), (1.0, (1.0, 1.0, 1.0), 0.8)]),
+    'ct-bone': ('absolute', [(-1000, (0.0, 0.0, 0.0), 0.0), (150, (0.6, 0.3, 0.2), 0.0),
+                             (300, (0.95, 0.85, 0.7), 0.4), (1500, (1.0, 1.0, 1.0), 0.9)]),
+    'ct-soft-tissue': ('absolute', [(-1000, (0.0, 0.0, 0.0), 0.0), (-100, (0.6, 0.4, 0.3), 0.0),
+                                    (40, (0.85, 0.5, 0.4), 0.15), (80, (0.95, 0.8, 0.7), 0.3),
+                                    (400, (1.0, 1.0, 1.0), 0.5)]),
+}
+
+
 def manager():
     global _manager
     if not _manager:
@@ -24,36 +56,302 @@ def manager():
     return _manager
 
 
+def _in_main_thread(function):
+    """Decorate a function which creates or modifies widgets or props, so that
+    it is run in the main thread when called from another thread (e.g. by the
+    interpreter worker of the console).
+
+    """
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        return manager().call_in_main_thread(function, *args, **kwargs)
+    return wrapper
+
+
 class _ViewManager():
+    """Create the views and the props displaying data in the views.
 
-    def __init__(self):
-        self._props = {}
+    Meshes with more than 'lod_triangle_count' triangles are displayed by a
+    level-of-detail prop. Their simplified versions are computed in the
+    background (one for each number of divisions of 'lod_divisions', see
+    vtkQuadricClustering) and added to the prop when they are ready. The
+    renderer then selects a simplified version when the full mesh cannot be
+    rendered within the frame time budget of an interaction (see
+    _View.interactive_frame_rate), and the full mesh once the interaction
+    stops. Similarly, the images with more than 'interactive_voxel_count'
+    voxels are displayed from a coarse level of their pyramid (see
+    ImagePyramid) during the interactions, which is also computed in the
+    background (see interactive_image).
+
+    Props are cached so that the same data is displayed by the same prop in
+    all the views. The cache is indexed by the VTK object of the data rather
+    than by its Python wrapper (the outputs of a pipeline get a new wrapper
+    each time they are accessed), and the props keep their data alive through
+    their mappers. Props which are not displayed in any view are evicted,
+    least recently used first, when the estimated memory of the cached props
+    exceeds the host or GPU memory budget (see set_memory_budgets). The prop
+    of some data is also released when the data is deleted, or when the prop
+    is not displayed and its data is only referenced by the prop (the cache
+    is pruned at each lookup).
+
+    The views are widgets, and the props are rendered by the views in the main
+    thread, so the functions which create or modify them are run in the main
+    thread when they are called from other threads (see call_in_main_thread).
+
+    """
+
+    lod_triangle_count = 500_000
+    lod_divisions = (256, 64)
+    interactive_voxel_count = 2**22
+    volume_preset = 'grayscale'
+
+    def __init__(self, *, host_memory_budget=4 * 2**30, gpu_memory_budget=2 * 2**30):
+        self._props = OrderedDict()
+        self._host_memory_budget = host_memory_budget
+        self._gpu_memory_budget = gpu_memory_budget
+        self._cached_bytes = [0, 0]
+        self._statistics = {'hits': 0, 'misses': 0, 'evictions': 0, 'releases': 0}
+        self._lock = threading.RLock()
         self._views = []
+        self._interactive_images = {}
+        self._lod_executor = None
+        self._lod_loader = _LODLoader()
+        self._invoker = _MainThreadInvoker()
 
-    def find_or_create_prop(self, arg, view_mode):
-        prop = self._props.get(arg)
+        # The manager may be created by a worker thread.
+        application = QCoreApplication.instance()
+        if application:
+            self._lod_loader.moveToThread(application.thread())
+            self._invoker.moveToThread(application.thread())
+
+    def call_in_main_thread(self, function, *args, **kwargs):
+        """Call a function in the main thread and return its result.
+
+        When called from another thread, this function blocks until the main
+        thread has run the function, and it raises the exceptions raised by the
+        function. The function is called directly from the main thread, or if
+        there is no application.
+
+        """
+        return self._invoker.call(function, *args, **kwargs)
 
-        if prop:
-            return prop
+    def find_or_create_prop(self, arg, view_mode):
+        # VTK data objects are not hashable, so the props are indexed by the
+        # address of their VTK object, or by the id of the other objects,
+        # which are valid until the release callbacks are called.
+        if isinstance(arg, vtk.vtkObject):
+            key = arg.GetAddressAsString('vtkObject')
         else:
-            if isinstance(arg, vtk.vtkDataSet):
-                if isinstance(arg, vtk.vtkPolyData):
-                    mapper = vtk.vtkPolyDataMapper()
-                    mapper.SetInputData(arg)
-                    prop = vtk.vtkActor()
-                    prop.SetMapper(mapper)
-            elif isinstance(arg, vtk.vtkPolyDataAlgorithm):
+            key = id(arg)
+
+        with self._lock:
+            self._prune()
+            entry = self._props.get(key)
+            if entry:
+                self._props.move_to_end(key)
+                self._statistics['hits'] += 1
+                return entry[1]
+
+        reference_count = arg.GetReferenceCount() if isinstance(arg, vtk.vtkObject) else 0
+        prop = self._create_prop(arg)
+        sizes = _memory_sizes(arg)
+
+        with self._lock:
+            if isinstance(arg, vtk.vtkObject):
+                reference = _DataReference(arg, lambda reference: self._release(key, reference),
+                                           held=arg.GetReferenceCount() - reference_count)
+            else:
+                reference = weakref.ref(arg, lambda reference: self._release(key, reference))
+            self._props[key] = (reference, prop, sizes)
+            self._cached_bytes[0] += sizes[0]
+            self._cached_bytes[1] += sizes[1]
+            self._statistics['misses'] += 1
+            self._evict()
+        return prop
+
+    def memory_budgets(self):
+        """The host and GPU memory budgets of the prop cache (in bytes).
+
+        """
+        return self._host_memory_budget, self._gpu_memory_budget
+
+    def set_memory_budgets(self, *, host=None, gpu=None):
+        """Set the memory budgets of the prop cache.
+
+        Args:
+            host,
+            gpu:  The maximum estimated size of the data of the cached props
+                  in host and GPU memory (in bytes), or None for no limit.
+
+        """
+        with self._lock:
+            self._host_memory_budget = host
+            self._gpu_memory_budget = gpu
+            self._evict()
+
+    def cache_statistics(self):
+        """The statistics of the prop cache.
+
+        Returns:
+            A dict with the number of cached props ('props'), their estimated
+            size in host and GPU memory ('host_bytes' and 'gpu_bytes'), and the
+            number of cache 'hits', 'misses', 'evictions' (because of the
+            memory budgets) and 'releases' (because the data was released).
+
+        """
+        with self._lock:
+            self._prune()
+            return dict(self._statistics, props=len(self._props),
+                        host_bytes=self._cached_bytes[0], gpu_bytes=self._cached_bytes[1])
+
+    def _create_prop(self, arg):
+        prop = None
+
+        if isinstance(arg, Glyphs):
+            prop = arg.actor()
+        elif isinstance(arg, vtk.vtkImageData):
+            prop = create_volume(arg, preset=self.volume_preset)
+            self.interactive_image(arg)
+        elif isinstance(arg, vtk.vtkDataSet):
+            if isinstance(arg, vtk.vtkPolyData) and arg.GetNumberOfPolys() > self.lod_triangle_count:
+                prop = self._create_lod_prop(arg)
+            elif isinstance(arg, vtk.vtkPolyData):
                 mapper = vtk.vtkPolyDataMapper()
-                mapper.SetInputConnection(arg.GetOutputPort())
+                mapper.SetInputData(arg)
                 prop = vtk.vtkActor()
                 prop.SetMapper(mapper)
+        elif isinstance(arg, vtk.vtkPolyDataAlgorithm):
+            mapper = vtk.vtkPolyDataMapper()
+            mapper.SetInputConnection(arg.GetOutputPort())
+            prop = vtk.vtkActor()
+            prop.SetMapper(mapper)
 
         if not prop:
             raise TypeError(f'Cannot create prop from {type(arg).__name__}')
+        return prop
 
-        self._props[arg] = prop
+    def _release(self, key, reference):
+        with self._lock:
+            entry = self._props.get(key)
+            if entry and entry[0] is reference:
+                self._remove(key)
+                self._statistics['releases'] += 1
+
+    def _remove(self, key):
+        reference, _, sizes = self._props.pop(key)
+        if isinstance(reference, _DataReference):
+            reference.detach()
+        self._cached_bytes[0] -= sizes[0]
+        self._cached_bytes[1] -= sizes[1]
+
+    def _prune(self):
+        # The props keep their data alive through their mappers, so the data
+        # deletion alone does not release them.
+        for key, (reference, prop, _) in list(self._props.items()):
+            if (isinstance(reference, _DataReference) and prop.GetNumberOfConsumers() == 0
+                    and reference.released()):
+                self._remove(key)
+                self._statistics['releases'] += 1
+        for key, (_, reference) in list(self._interactive_images.items()):
+            if reference.released():
+                del self._interactive_images[key]
+                reference.detach()
+
+    def _evict(self):
+        # Props displayed in a view (which are consumers of their renderer)
+        # are kept, as well as the most recently used one.
+        for key in list(self._props)[:-1]:
+            if not self._over_budget():
+                break
+            entry = self._props.get(key)
+            if entry and entry[1].GetNumberOfConsumers() == 0:
+                self._remove(key)
+                self._statistics['evictions'] += 1
+
+    def _over_budget(self):
+        return any(budget is not None and size > budget
+                   for size, budget in zip(self._cached_bytes, self.memory_budgets()))
+
+    def _create_lod_prop(self, mesh):
+        mapper = vtk.vtkPolyDataMapper()
+        mapper.SetInputData(mesh)
+        prop = vtk.vtkLODProp3D()
+        prop.SetLODLevel(prop.AddLOD(mapper, 0.0), 0.0)
+
+        # The simplification works on a copy of the mesh structure so that
+        # the worker thread never shares pipeline connections with the views.
+        copy = vtk.vtkPolyData()
+        copy.ShallowCopy(mesh)
+        self._submit_lod_task(self._lod_loader.load, prop, copy, self.lod_divisions)
         return prop
 
+    def _submit_lod_task(self, function, *args):
+        with self._lock:
+            if not self._lod_executor:
+                self._lod_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="MusicBox LOD")
+            self._lod_executor.submit(function, *args)
+
+    def interactive_image(self, image):
+        """The image displayed instead of a large image during interactions.
+
+        This is the finest level of the pyramid of the image which has at most
+        'interactive_voxel_count' voxels. The level is computed in the
+        background the first time this function is called with the image, and
+        it is released with the image.
+
+        Args:
+            image: An instance of vtk.vtkImageData.
+
+        Returns:
+            An instance of vtk.vtkImageData, or None if the image is small
+            enough to be displayed as is or if the level is not computed yet.
+
+        """
+        if image.GetNumberOfPoints() <= self.interactive_voxel_count:
+            return None
+
+        key = image.GetAddressAsString('vtkObject')
+        with self._lock:
+            self._prune()
+            entry = self._interactive_images.get(key)
+            if entry:
+                return entry[0]
+
+            def release(reference):
+                with self._lock:
+                    if self._interactive_images.get(key) is entry:
+                        del self._interactive_images[key]
+
+            # The entry is filled by the LOD thread, unless the image was
+            # released in the meantime.
+            entry = [None, _DataReference(image, release)]
+            self._interactive_images[key] = entry
+
+        copy = vtk.vtkImageData()
+        copy.ShallowCopy(image)
+        self._submit_lod_task(self._load_interactive_image, entry, copy)
+        return None
+
+    def _load_interactive_image(self, entry, image):
+        # The pyramid works on a SimpleITK copy of the image, whose axes are in
+        # the reverse order (see ImagePyramid.level).
+        pyramid = ImagePyramid(create_sitk_image(image, spacing=image.GetSpacing()[::-1],
+                                                 origin=image.GetOrigin()[::-1]))
+        index = next((index for index in range(pyramid.level_count())
+                      if numpy.prod(pyramid.level_size(index)) <= self.interactive_voxel_count),
+                     pyramid.level_count() - 1)
+        level = pyramid.level(index, image_type='vtk')
+        with self._lock:
+            entry[0] = level
+
+    def request_render(self):
+        """Request a render of all the views (see _View.request_render).
+
+        """
+        for view in self._views:
+            view.request_render()
+
+    @_in_main_thread
     def create_view(self, mode):
         if mode == '2D':
             view = _View2D()
@@ -65,24 +363,975 @@ class _ViewManager():
         return view
 
 
+# The GPU buffers of each glyph instance drawn by vtkGlyph3DMapper: a float
+# 4x4 model matrix, a float 3x3 normal matrix and an RGBA color.
+_glyph_instance_gpu_bytes = 16 * 4 + 9 * 4 + 4
+
+
+def _memory_sizes(arg):
+    """Estimate the host and GPU memory used to display some data (in bytes).
+
+    """
+    if isinstance(arg, Glyphs):
+        source = arg.mapper().GetSource(0)
+        host, gpu = _memory_sizes(source)
+        host += arg.mapper().GetInput().GetActualMemorySize() * 1024
+        return host, gpu + arg.count() * _glyph_instance_gpu_bytes
+    if isinstance(arg, vtk.vtkAlgorithm):
+        arg = arg.GetOutputDataObject(0)
+
+    host = arg.GetActualMemorySize() * 1024
+    if isinstance(arg, vtk.vtkImageData):
+        scalars = arg.GetPointData().GetScalars()
+        gpu = scalars.GetNumberOfValues() * scalars.GetDataTypeSize() if scalars else 0
+    elif isinstance(arg, vtk.vtkPolyData):
+        # Float positions and normals, and 32 bit indices.
+        gpu = arg.GetNumberOfPoints() * 24 + arg.GetPolys().GetNumberOfConnectivityIds() * 4
+    else:
+        gpu = 0
+    return host, gpu
+
+
+def create_volume(image, *, preset='grayscale'):
+    """Create a volume prop rendering an image.
+
+    The prop uses a vtkSmartVolumeMapper, which renders on the GPU when
+    possible and falls back to CPU ray casting otherwise. The sample distance
+    is increased during interactions to keep the frame rate of the views.
+
+    Args:
+        image:  An instance of vtk.vtkImageData, which is used as is (the pixels
+                are not copied).
+        preset: The name of the initial transfer functions (see
+                volume_presets).
+
+    Returns:
+        A new instance of vtk.vtkVolume.
+
+    """
+    mapper = _create_volume_mapper(image)
+
+    volume_property = vtk.vtkVolumeProperty()
+    volume_property.ShadeOff()
+    volume_property.SetInterpolationTypeToLinear()
+
+    volume = vtk.vtkVolume()
+    volume.SetMapper(mapper)
+    volume.SetProperty(volume_property)
+    set_volume_preset(volume, preset)
+    return volume
+
+
+def _create_volume_mapper(image):
+    mapper = vtk.vtkSmartVolumeMapper()
+    mapper.SetInputData(image)
+    mapper.SetRequestedRenderModeToDefault()
+    mapper.AutoAdjustSampleDistancesOn()
+    mapper.InteractiveAdjustSampleDistancesOn()
+    mapper.SetInteractiveUpdateRate(_View.interactive_frame_rate)
+    return mapper
+
+
+@_in_main_thread
+def set_volume_preset(volume, preset):
+    """Set the transfer functions of a volume prop from a preset.
+
+    Args:
+        volume: An instance of vtk.vtkVolume.
+        preset: The name of a preset of volume_presets.
+
+    """
+    try:
+        scale, points = volume_presets[preset]
+    except KeyError:
+        raise KeyError(f'{preset} is not a valid volume preset') from None
+
+    if scale == 'relative':
+        low, high = volume.GetMapper().GetInput().GetScalarRange()
+        points = [(low + value * (high - low), color, opacity) for value, color, opacity in points]
+
+    colors = vtk.vtkColorTransferFunction()
+    opacities = vtk.vtkPiecewiseFunction()
+    for value, color, opacity in points:
+        colors.AddRGBPoint(value, *color)
+        opacities.AddPoint(value, opacity)
+    volume.GetProperty().SetColor(colors)
+    volume.GetProperty().SetScalarOpacity(opacities)
+
+
+class _DataReference():
+    """Reference to the data of a cache entry, which does not keep the data
+    alive.
+
+    The release function is called with the reference when the data is
+    deleted. The data is also considered released ('released') when it is
+    only referenced by the 'held' references of the objects created for the
+    entry (e.g. the mapper of a prop), and by the Python wrapper of the check.
+
+    """
+
+    def __init__(self, data, release, *, held=0):
+        self._weak_reference = vtk.vtkWeakReference()
+        self._weak_reference.Set(data)
+        self._held = held
+        self._tag = data.AddObserver('DeleteEvent', lambda caller, event: release(self))
+
+    def released(self):
+        data = self._weak_reference.Get()
+        if data is None:
+            return True
+        # A Python reference other than 'data' and the argument of getrefcount
+        # is a reference of the user to the wrapper.
+        return data.GetReferenceCount() <= self._held + 1 and sys.getrefcount(data) <= 2
+
+    def detach(self):
+        """Remove the deletion observer of the data.
+
+        """
+        data = self._weak_reference.Get()
+        if data is not None:
+            data.RemoveObserver(self._tag)
+
+
+class _MainThreadInvoker(QObject):
+    """Run the functions passed to 'call' in the thread of the invoker.
+
+    """
+
+    _call_requested = Signal(object)
+
+    def __init__(self):
+        super().__init__()
+        self._call_requested.connect(self._call, Qt.BlockingQueuedConnection)
+
+    def call(self, function, *args, **kwargs):
+        if not QCoreApplication.instance() or QThread.currentThread() == self.thread():
+            return function(*args, **kwargs)
+
+        outcome = []
+        def run():
+            try:
+                outcome.append((function(*args, **kwargs), None))
+            except BaseException as e:
+                outcome.append((None, e))
+        self._call_requested.emit(run)
+        result, exception = outcome[0]
+        if exception:
+            raise exception
+        return result
+
+    def _call(self, function):
+        function()
+
+
+class _LODLoader(QObject):
+    """Simplify meshes in a worker thread and add the results to LOD props.
+
+    The props are only modified in the thread of the loader (the main thread),
+    where the 'simplified' signal is delivered.
+
+    """
+
+    simplified = Signal(object, object, int)
+
+    def __init__(self):
+        super().__init__()
+        self.simplified.connect(self._add_lod)
+
+    def load(self, prop, mesh, divisions):
+        triangle_count = mesh.GetNumberOfPolys()
+        for level, division_count in enumerate(divisions, 1):
+            clustering = vtk.vtkQuadricClustering()
+            clustering.SetInputData(mesh)
+            clustering.SetNumberOfDivisions(division_count, division_count, division_count)
+            clustering.Update()
+            lod = clustering.GetOutput()
+            if lod.GetNumberOfPolys() * 2 > triangle_count:
+                continue
+            triangle_count = lod.GetNumberOfPolys()
+            self.simplified.emit(prop, lod, level)
+
+    def _add_lod(self, prop, mesh, level):
+        mapper = vtk.vtkPolyDataMapper()
+        mapper.SetInputData(mesh)
+        prop.SetLODLevel(prop.AddLOD(mapper, 0.0), float(level))
+
+
+class Glyphs():
+    """Copies of a mesh (the glyph) placed at many positions.
+
+    The glyphs are rendered by a vtkGlyph3DMapper, which draws all the copies
+    in a single instanced draw call. The positions, scalars and colors can be
+    updated without rebuilding the pipeline: arrays of the same size are
+    copied into the existing buffers.
+
+    Glyphs are displayed by adding them to a 3D view (see _View3D.add_data).
+
+    """
+
+    def __init__(self, positions, *, source=None, scalars=None, colors=None, scale=1.0):
+        """
+        Args:
+            positions: The positions of the glyphs, as an array of shape (N, 3).
+            source:    The glyph mesh (usually created with one of the
+                       functions of musicbox.mesh.primitive). The default is
+                       a sphere of diameter 1.
+            scalars:   Optional values of shape (N,) mapped to colors.
+            colors:    Optional RGB or RGBA colors of shape (N, 3) or (N, 4),
+                       as uint8 values.
+            scale:     The scale factor of the glyph mesh.
+
+        """
+        if source is None:
+            source = primitive.sphere(0.5, theta_resolution=12, phi_resolution=12)
+
+        self._points = vtk.vtkPolyData()
+        self._points.SetPoints(vtk.vtkPoints())
+
+        self._mapper = vtk.vtkGlyph3DMapper()
+        self._mapper.SetInputData(self._points)
+        self._mapper.SetSourceData(source)
+        self._mapper.SetScaleModeToNoDataScaling()
+        self._mapper.SetScaleFactor(scale)
+        self._mapper.OrientOff()
+        self._mapper.ScalarVisibilityOff()
+
+        self._actor = vtk.vtkActor()
+        self._actor.SetMapper(self._mapper)
+
+        self.set_positions(positions, scalars=scalars, colors=colors)
+
+    def actor(self):
+        return self._actor
+
+    def mapper(self):
+        return self._mapper
+
+    def count(self):
+        return self._points.GetNumberOfPoints()
+
+    def positions(self):
+        """The positions of the glyphs, as a numpy view of shape (N, 3).
+
+        Call 'modified' after modifying the view.
+
+        """
+        return numpy_support.vtk_to_numpy(self._points.GetPoints().GetData())
+
+    def set_positions(self, positions, *, scalars=None, colors=None):
+        """Move the glyphs.
+
+        When the number of glyphs changes, the scalars and colors of the
+        previous glyphs are removed (the glyphs are drawn with the color of
+        the actor) unless new ones are given.
+
+        Args:
+            positions: The positions of the glyphs, as an array of shape (N, 3).
+            scalars,
+            colors:    Optional new scalars or colors (see 'set_scalars' and
+                       'set_colors').
+
+        """
+        positions = numpy.asarray(positions).reshape(-1, 3)
+        points = self._points.GetPoints()
+        if points.GetNumberOfPoints() == len(positions) and points.GetDataType() == vtk.VTK_FLOAT:
+            self.positions()[:] = positions
+        else:
+            if points.GetNumberOfPoints() != len(positions):
+                self._points.GetPointData().Initialize()
+                self._mapper.ScalarVisibilityOff()
+            points.SetData(numpy_support.numpy_to_vtk(positions.astype(numpy.float32), deep=True))
+        self.modified()
+        if scalars is not None:
+            self.set_scalars(scalars)
+        if colors is not None:
+            self.set_colors(colors)
+
+    def set_scalars(self, scalars, *, scalar_range=None):
+        """Color the glyphs by mapping values to colors.
+
+        This replaces the colors set with 'set_colors'.
+
+        Args:
+            scalars:      The values, as an array of shape (N,).
+            scalar_range: The range of values mapped to the lookup table of the
+                          mapper (the default is the range of 'scalars').
+
+        """
+        scalars = numpy.asarray(scalars, dtype=numpy.float32).reshape(-1)
+        self._set_point_array(scalars, vtk.VTK_FLOAT)
+        self._mapper.SetColorModeToMapScalars()
+        self._mapper.SetScalarRange(scalar_range if scalar_range is not None else (scalars.min(), scalars.max()))
+        self._mapper.ScalarVisibilityOn()
+
+    def set_colors(self, colors):
+        """Color the glyphs with RGB or RGBA colors.
+
+        This replaces the scalars set with 'set_scalars'.
+
+        Args:
+            colors: The colors, as an array of uint8 values of shape (N, 3) or
+                    (N, 4).
+
+        """
+        self._set_point_array(numpy.asarray(colors, dtype=numpy.uint8), vtk.VTK_UNSIGNED_CHAR)
+        self._mapper.SetColorModeToDirectScalars()
+        self._mapper.ScalarVisibilityOn()
+
+    def modified(self):
+        self._points.GetPoints().Modified()
+        self._points.Modified()
+
+    def _set_point_array(self, array, data_type):
+        if len(array) != self.count():
+            raise ValueError(f'Expected {self.count()} values, got {len(array)}.')
+        current = self._points.GetPointData().GetScalars()
+        if current and current.GetDataType() == data_type and \
+                current.GetNumberOfComponents() == (array.shape[1] if array.ndim > 1 else 1):
+            numpy_support.vtk_to_numpy(current)[:] = array
+            current.Modified()
+        else:
+            self._points.GetPointData().SetScalars(numpy_support.numpy_to_vtk(array, deep=True))
+        self._points.Modified()
+
+
+class OffscreenRenderer():
+    """Render data to images without a display.
+
+    The data is rendered in an offscreen render window which is reused for
+    every image, with the props of the view manager. The OpenGL backend is
+    the default offscreen window of the VTK build (EGL or OSMesa, which can
+    be forced with the VTK_DEFAULT_OPENGL_WINDOW environment variable, e.g.
+    'vtkOSOpenGLRenderWindow').
+
+    """
+
+    def __init__(self, size=(512, 512), *, background=(0.0, 0.0, 0.0)):
+        """
+        Args:
+            size:       The size of the rendered images, as (width, height).
+            background: The RGB background color, with components in [0, 1].
+
+        """
+        self._renderer = vtk.vtkRenderer()
+        self._renderer.SetBackground(*background)
+        self._render_window = vtk.vtkRenderWindow()
+        self._render_window.SetOffScreenRendering(True)
+        self._render_window.SetSize(*size)
+        self._render_window.AddRenderer(self._renderer)
+
+        self._capture = vtk.vtkWindowToImageFilter()
+        self._capture.SetInput(self._render_window)
+        self._capture.SetInputBufferTypeToRGB()
+        self._capture.ReadFrontBufferOff()
+        self._writer = vtk.vtkPNGWriter()
+        self._writer.SetInputConnection(self._capture.GetOutputPort())
+
+    def size(self):
+        return tuple(self._render_window.GetSize())
+
+    def render_window(self):
+        return self._render_window
+
+    def render(self, data):
+        """Render some data, with the camera fitted to its bounds.
+
+        Args:
+            data: Any data accepted by _ViewManager.find_or_create_prop.
+
+        Returns:
+            The image as an array of uint8 of shape (height, width, 3), with
+            the first row at the top.
+
+        """
+        self._render_data(data)
+        image = self._capture.GetOutput()
+        width, height, _ = image.GetDimensions()
+        pixels = numpy_support.vtk_to_numpy(image.GetPointData().GetScalars())
+        return pixels.reshape(height, width, 3)[::-1].copy()
+
+    def save(self, data, path):
+        """Render some data to a PNG file.
+
+        """
+        self._render_data(data)
+        self._writer.SetFileName(str(path))
+        self._writer.Write()
+
+    def render_batch(self, datasets, paths=None):
+        """Render several datasets one after the other.
+
+        Args:
+            datasets: The data to render.
+            paths:    Optional PNG files, one for each dataset.
+
+        Returns:
+            If 'paths' is None, an iterator over the rendered arrays (see
+            render). Otherwise the files are written and None is returned.
+
+        """
+        if paths is None:
+            return (self.render(data) for data in datasets)
+        datasets, paths = list(datasets), list(paths)
+        if len(datasets) != len(paths):
+            raise ValueError(f'Expected {len(datasets)} paths, got {len(paths)}.')
+        for data, path in zip(datasets, paths):
+            self.save(data, path)
+
+    def _render_data(self, data):
+        prop = manager().find_or_create_prop(data, '3D')
+        self._renderer.AddViewProp(prop)
+        try:
+            self._renderer.ResetCamera()
+            self._render_window.Render()
+            self._capture.Modified()
+            self._capture.Update()
+        finally:
+            # Removing the prop lets the view manager evict it.
+            self._renderer.RemoveViewProp(prop)
+
+
+def render_files(paths, output_paths, *, size=(512, 512), background=(0.0, 0.0, 0.0), max_workers=None,
+                 progress=None):
+    """Render data files to PNG files in parallel worker processes.
+
+    Each process reads the files (meshes in the VTK, VTP, STL, PLY or OBJ
+    formats, and images in any format supported by SimpleITK) and renders them
+    with its own OffscreenRenderer. The processes are started with the 'spawn'
+    method, so this function can be called from a running application.
+
+    Args:
+        paths:        The data files.
+        output_paths: The PNG files, one for each data file.
+        size,
+        background:   The options of the renderers (see OffscreenRenderer).
+        max_workers:  The maximum number of processes (the default is the
+                      number of processors).
+        progress:     An optional function 'progress(done, total)', called
+                      from the calling thread each time a file is rendered.
+
+    """
+    paths = list(paths)
+    output_paths = list(output_paths)
+    if len(paths) != len(output_paths):
+        raise ValueError(f'Expected {len(paths)} output paths, got {len(output_paths)}.')
+
+    with ProcessPoolExecutor(max_workers=max_workers or os.cpu_count(),
+                             mp_context=multiprocessing.get_context('spawn'),
+                             initializer=_init_render_process, initargs=(size, background)) as executor:
+        futures = [executor.submit(_render_file, str(path), str(output_path))
+                   for path, output_path in zip(paths, output_paths)]
+        try:
+            for done, future in enumerate(as_completed(futures), 1):
+                future.result()
+                if progress:
+                    progress(done, len(paths))
+        except BaseException:
+            for future in futures:
+                future.cancel()
+            raise
+
+
+_process_renderer = None
+
+_mesh_readers = {
+    '.vtk': vtk.vtkPolyDataReader,
+    '.vtp': vtk.vtkXMLPolyDataReader,
+    '.stl': vtk.vtkSTLReader,
+    '.ply': vtk.vtkPLYReader,
+    '.obj': vtk.vtkOBJReader,
+}
+
+
+def _init_render_process(size, background):
+    global _process_renderer
+    _process_renderer = OffscreenRenderer(size, background=background)
+
+
+def _render_file(path, output_path):
+    _process_renderer.save(_read_data(path), output_path)
+
+
+def _read_data(path):
+    reader_type = _mesh_readers.get(Path(path).suffix.lower())
+    if reader_type:
+        reader = reader_type()
+        reader.SetFileName(path)
+        reader.Update()
+        return reader.GetOutput()
+    else:
+        from musicbox.data.io import read_image
+        return read_image(path, image_type='vtk')
+
+
+class _RenderStatistics():
+    """Record the frame times of a render window.
+
+    The frames are only recorded while the statistics are enabled or the
+    overlay is visible: before each recorded frame, the pipelines of the
+    visible props are updated explicitly in order to measure the update time
+    separately from the time spent drawing.
+
+    """
+
+    frame_count = 300
+    histogram_bins = (0.0, 0.004, 0.008, 0.016, 0.033, 0.066, 0.133, 0.266, numpy.inf)
+
+    def __init__(self, render_window, renderer):
+        self._renderer = renderer
+        self._times = deque(maxlen=self.frame_count)
+        self._frame_start = None
+        self._update_time = 0.0
+        self._enabled = False
+        self._overlay = None
+        render_window.AddObserver(vtk.vtkCommand.StartEvent, self._start_frame)
+        render_window.AddObserver(vtk.vtkCommand.EndEvent, self._end_frame)
+
+    def statistics(self, frame_budget):
+        """See _View.stats.
+
+        """
+        times = numpy.array(self._times).reshape(-1, 2)
+        frame_times = times.sum(axis=1)
+        triangle_count, voxel_count, gpu_bytes = self._scene_counts()
+        return {
+            'frame_count': len(times),
+            'frame_time': numpy.histogram(frame_times, self.histogram_bins),
+            'update_time': numpy.histogram(times[:, 0], self.histogram_bins),
+            'draw_time': numpy.histogram(times[:, 1], self.histogram_bins),
+            'mean_frame_time': frame_times.mean() if len(times) else 0.0,
+            'max_frame_time': frame_times.max() if len(times) else 0.0,
+            'frames_over_budget': int((frame_times > frame_budget).sum()),
+            'triangle_count': triangle_count,
+            'voxel_count': voxel_count,
+            'gpu_bytes': gpu_bytes,
+        }
+
+    def clear(self):
+        self._times.clear()
+
+    def set_enabled(self, enabled):
+        self._enabled = enabled
+
+    def enabled(self):
+        return self._enabled
+
+    def set_overlay_visible(self, visible):
+        if visible and not self._overlay:
+            self._overlay = vtk.vtkTextActor()
+            self._overlay.GetTextProperty().SetFontSize(14)
+            self._overlay.SetDisplayPosition(10, 10)
+            self._renderer.AddViewProp(self._overlay)
+        elif not visible and self._overlay:
+            self._renderer.RemoveViewProp(self._overlay)
+            self._overlay = None
+
+    def overlay_visible(self):
+        return self._overlay is not None
+
+    def _visible_mappers(self):
+        props = self._renderer.GetViewProps()
+        props.InitTraversal()
+        for i in range(props.GetNumberOfItems()):
+            prop = props.GetNextProp()
+            if not prop.GetVisibility() or prop is self._overlay:
+                continue
+            if isinstance(prop, vtk.vtkLODProp3D):
+                # The pick LOD is used until the prop is rendered.
+                lod_id = prop.GetLastRenderedLODID()
+                mapper = prop.GetLODMapper(lod_id if lod_id >= 0 else prop.GetPickLODID())
+            elif hasattr(prop, 'GetMapper'):
+                mapper = prop.GetMapper()
+            else:
+                continue
+            if mapper and mapper.GetNumberOfInputPorts() and mapper.GetNumberOfInputConnections(0):
+                    yield mapper
+
+    def _scene_counts(self):
+        triangle_count = voxel_count = gpu_bytes = 0
+        for mapper in self._visible_mappers():
+            data = mapper.GetInputDataObject(0, 0)
+            if isinstance(mapper, vtk.vtkGlyph3DMapper):
+                source = mapper.GetSource(0)
+                triangle_count += data.GetNumberOfPoints() * source.GetNumberOfPolys()
+                gpu_bytes += _memory_sizes(source)[1] + data.GetNumberOfPoints() * _glyph_instance_gpu_bytes
+            elif isinstance(data, vtk.vtkPolyData):
+                triangle_count += data.GetNumberOfPolys()
+                gpu_bytes += _memory_sizes(data)[1]
+            elif isinstance(data, vtk.vtkImageData):
+                voxel_count += data.GetNumberOfPoints()
+                gpu_bytes += _memory_sizes(data)[1]
+        return triangle_count, voxel_count, gpu_bytes
+
+    def _start_frame(self, render_window, event):
+        if not self._enabled and not self._overlay:
+            return
+        start = time.perf_counter()
+        for mapper in self._visible_mappers():
+            mapper.Update()
+        self._frame_start = time.perf_counter()
+        self._update_time = self._frame_start - start
+
+    def _end_frame(self, render_window, event):
+        if self._frame_start is None:
+            return
+        self._times.append((self._update_time, time.perf_counter() - self._frame_start))
+        self._frame_start = None
+        if self._overlay:
+            update_time, draw_time = self._times[-1]
+            triangle_count, voxel_count, _ = self._scene_counts()
+            self._overlay.SetInput(f'frame {1000 * (update_time + draw_time):.1f} ms '
+                                   f'(update {1000 * update_time:.1f} ms, draw {1000 * draw_time:.1f} ms)\n'
+                                   f'{triangle_count} triangles, {voxel_count} voxels')
+
+
 class _View(QVTKRenderWindowInteractor):
+    """Base class of the views.
+
+    Renders are requested with 'request_render' rather than by rendering
+    directly: requests are coalesced so that the view renders at most once
+    per display frame (see 'display_frame_rate'), and they can be made from
+    any thread.
+
+    """
+
+    interactive_frame_rate = 15.0
+    display_frame_rate = 60.0
+
+    _render_requested = Signal()
 
     def __init__(self, parent=None):
         super().__init__(parent)
 
+        self._last_render = 0.0
+        self._render_timer = QTimer(self)
+        self._render_timer.setSingleShot(True)
+        self._render_timer.timeout.connect(self._render)
+        self._render_requested.connect(self._schedule_render)
+
         self.renderer = vtk.vtkRenderer()
         self.renderer.ResetCamera()
         self.GetRenderWindow().AddRenderer(self.renderer)
+        self._statistics = _RenderStatistics(self.GetRenderWindow(), self.renderer)
         self.GetRenderWindow().Render()
 
         self.interactor = self.GetRenderWindow().GetInteractor()
+        self.interactor.SetDesiredUpdateRate(self.interactive_frame_rate)
         self.interactor.Initialize()
         self.interactor.Start()
 
+    def request_render(self):
+        """Render the view at the next display frame.
+
+        This function is thread-safe, and does nothing if a render is already
+        scheduled.
+
+        """
+        self._render_requested.emit()
+
+    def call_in_main_thread(self, function, *args, **kwargs):
+        """Call a function in the main thread, then request a render.
+
+        This is how props should be modified from other threads. The function
+        is run by the view manager (see _ViewManager.call_in_main_thread), and
+        its result is returned.
+
+        """
+        result = manager().call_in_main_thread(function, *args, **kwargs)
+        self.request_render()
+        return result
+
+    def _schedule_render(self):
+        if not self._render_timer.isActive():
+            delay = self._last_render + 1.0 / self.display_frame_rate - time.perf_counter()
+            self._render_timer.start(max(0, round(delay * 1000)))
+
+    def _render(self):
+        self._last_render = time.perf_counter()
+        self.GetRenderWindow().Render()
+
+    def _observe_interactions(self):
+        # vtkInteractorStyleSwitch does not forward the events of its styles.
+        style = self.interactor.GetInteractorStyle()
+        styles = [style]
+        if isinstance(style, vtk.vtkInteractorStyleSwitch):
+            current = style.GetCurrentStyle().GetClassName()[len('vtkInteractorStyle'):]
+            for name in ('JoystickActor', 'JoystickCamera', 'TrackballActor', 'TrackballCamera', 'MultiTouchCamera'):
+                getattr(style, f'SetCurrentStyleTo{name}')()
+                styles.append(style.GetCurrentStyle())
+            getattr(style, f'SetCurrentStyleTo{current}')()
+        for style in styles:
+            style.AddObserver(vtk.vtkCommand.StartInteractionEvent, lambda *args: self._start_interaction())
+            style.AddObserver(vtk.vtkCommand.EndInteractionEvent, lambda *args: self._end_interaction())
+
+    def _start_interaction(self):
+        pass
+
+    def _end_interaction(self):
+        pass
+
+    def stats(self):
+        """The render statistics of the recent frames of the view.
+
+        Only the frames rendered while the statistics are enabled (see
+        set_stats_enabled) or the overlay is visible are recorded.
+
+        Returns:
+            A dict with:
+                - 'frame_count': the number of recorded frames (the last
+                  _RenderStatistics.frame_count frames).
+                - 'frame_time', 'update_time', 'draw_time': the histograms
+                  (as returned by numpy.histogram) of the frame times and of
+                  the times spent updating the pipelines and drawing, in
+                  seconds.
+                - 'mean_frame_time', 'max_frame_time'.
+                - 'frames_over_budget': the number of frames slower than the
+                  interactive frame rate.
+                - 'triangle_count', 'voxel_count', 'gpu_bytes': the current
+                  size of the visible data, and an estimate of its size in GPU
+                  memory.
+
+        """
+        return self._statistics.statistics(1.0 / self.interactive_frame_rate)
+
+    def clear_stats(self):
+        self._statistics.clear()
+
+    def set_stats_enabled(self, enabled):
+        """Record the statistics of the frames (see stats).
+
+        The frames are also recorded while the overlay is visible. Recording
+        adds an explicit update of the pipelines of the visible props before
+        each frame.
+
+        """
+        self._statistics.set_enabled(enabled)
+
+    def stats_enabled(self):
+        return self._statistics.enabled()
+
+    @_in_main_thread
+    def set_stats_overlay_visible(self, visible):
+        """Show or hide the render statistics in the corner of the view.
+
+        """
+        self._statistics.set_overlay_visible(visible)
+        self.request_render()
+
+    def stats_overlay_visible(self):
+        return self._statistics.overlay_visible()
+
 
 class _View3D(_View):
+    """3D view, displaying meshes and volumes.
+
+    During the interactions, the volumes of large images are rendered from
+    a coarse level of the image (see _ViewManager.interactive_image), with a
+    second mapper so that the GPU textures of both levels are kept.
+
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._interactive_mappers = {}
+        self._full_mappers = []
+        self._observe_interactions()
 
+    @_in_main_thread
     def add_data(self, data):
         prop = manager().find_or_create_prop(data, '3D')
         self.renderer.AddViewProp(prop)
-            
+        self.request_render()
+
+    def _start_interaction(self):
+        # The mappers of the props which were removed from the view are
+        # dropped.
+        interactive_mappers, self._interactive_mappers = self._interactive_mappers, {}
+        props = self.renderer.GetViewProps()
+        for index in range(props.GetNumberOfItems()):
+            prop = props.GetItemAsObject(index)
+            if not isinstance(prop, vtk.vtkVolume) or not prop.GetVisibility():
+                continue
+            mapper = prop.GetMapper()
+            image = manager().interactive_image(mapper.GetInput())
+            if image is None:
+                continue
+            key = prop.GetAddressAsString('vtkObject')
+            interactive_mapper = interactive_mappers.get(key)
+            if not interactive_mapper or interactive_mapper.GetInput() is not image:
+                interactive_mapper = _create_volume_mapper(image)
+            self._interactive_mappers[key] = interactive_mapper
+            prop.SetMapper(interactive_mapper)
+            self._full_mappers.append((prop, mapper))
+
+    def _end_interaction(self):
+        for prop, mapper in self._full_mappers:
+            prop.SetMapper(mapper)
+        self._full_mappers.clear()
+        # The volumes may be displayed by other views.
+        manager().request_render()
+
+
+class _View2D(_View):
+    """Multi-planar reformat view, displaying axis-aligned slices of an image.
+
+    The slices are extracted by an ImageSlicer and copied into a display
+    buffer which is allocated once per plane, so that scrolling through the
+    slices (with the mouse wheel or 'set_slice_index') does not allocate
+    memory.
+
+    During the interactions (including scrolling, until no scroll happened
+    for 'scroll_interaction_delay' milliseconds), the slices of large images
+    are extracted from a coarse level of the image (see
+    _ViewManager.interactive_image), and the full slice is displayed when the
+    interaction ends.
+
+    """
+
+    scroll_interaction_delay = 200
+
+    _normal_axes = {'axial': 2, 'coronal': 1, 'sagittal': 0}
+
+    def __init__(self, parent=None, *, plane='axial'):
+        super().__init__(parent)
+        self._slicer = None
+        self._plane = plane
+        self._slice_index = 0
+        self._buffer = None
+        self._slice_image = vtk.vtkImageData()
+        self._interactive_slicer = None
+        self._interactive_buffer = None
+        self._interactive_slice_image = vtk.vtkImageData()
+        self._interacting = False
+        self._actor = vtk.vtkImageActor()
+        self._actor.GetMapper().SetInputData(self._slice_image)
+        self._actor.VisibilityOff()
+        self.renderer.AddViewProp(self._actor)
+        self.renderer.GetActiveCamera().ParallelProjectionOn()
+
+        self._scroll_timer = QTimer(self)
+        self._scroll_timer.setSingleShot(True)
+        self._scroll_timer.timeout.connect(self._end_interaction)
+
+        style = vtk.vtkInteractorStyleImage()
+        style.AddObserver(vtk.vtkCommand.MouseWheelForwardEvent, lambda *args: self._scroll(1))
+        style.AddObserver(vtk.vtkCommand.MouseWheelBackwardEvent, lambda *args: self._scroll(-1))
+        self.interactor.SetInteractorStyle(style)
+        self._observe_interactions()
+
+    @_in_main_thread
+    def add_data(self, data):
+        """Display an image, replacing the previous one.
+
+        Args:
+            data: An instance of vtk.vtkImageData, or an ImageSlicer (which
+                  can be shared by several views).
+
+        """
+        if isinstance(data, vtk.vtkImageData):
+            data = ImageSlicer(data)
+        elif not isinstance(data, ImageSlicer):
+            raise TypeError(f'Cannot display {type(data).__name__} in a 2D view')
+        self._end_interaction()
+        self._slicer = data
+        self._interactive_slicer = None
+        # Start computing the coarse level of large images.
+        manager().interactive_image(data.image())
+        low, high = data.image().GetScalarRange()
+        self._actor.GetProperty().SetColorWindow(high - low or 1.0)
+        self._actor.GetProperty().SetColorLevel((high + low) / 2)
+        self.set_plane(self._plane)
+
+    def slicer(self):
+        return self._slicer
+
+    def plane(self):
+        return self._plane
+
+    @_in_main_thread
+    def set_plane(self, plane):
+        """Display the middle slice of another plane (see ImageSlicer.planes).
+
+        """
+        if plane not in ImageSlicer.planes:
+            raise KeyError(f'{plane} is not a valid plane')
+        self._end_interaction()
+        self._plane = plane
+        if self._slicer:
+            self._buffer = self._allocate_buffer(self._slicer, self._slice_image)
+            self._actor.VisibilityOn()
+            self.set_slice_index(self.slice_count() // 2)
+            self.renderer.ResetCamera()
+
+    def slice_count(self):
+        return self._slicer.slice_count(self._plane) if self._slicer else 0
+
+    def slice_index(self):
+        return self._slice_index
+
+    @_in_main_thread
+    def set_slice_index(self, index):
+        if not 0 <= index < self.slice_count():
+            raise IndexError(f'Slice {index} is out of bounds for a plane with {self.slice_count()} slices.')
+        if self._interacting:
+            self._interactive_slicer.slice(self._plane, self._interactive_slice_index(index),
+                                           out=self._interactive_buffer)
+            slice_image = self._interactive_slice_image
+        else:
+            self._slicer.slice(self._plane, index, out=self._buffer)
+            slice_image = self._slice_image
+        self._slice_index = index
+        slice_image.GetPointData().GetScalars().Modified()
+        slice_image.Modified()
+        self.request_render()
+
+    def _scroll(self, step):
+        if self._slicer:
+            if not self._interacting:
+                self._start_interaction()
+                if self._interacting:
+                    self._scroll_timer.start(self.scroll_interaction_delay)
+            elif self._scroll_timer.isActive():
+                self._scroll_timer.start(self.scroll_interaction_delay)
+            self.set_slice_index(min(max(self._slice_index + step, 0), self.slice_count() - 1))
+
+    def _start_interaction(self):
+        if self._interacting or not self._slicer:
+            return
+        image = manager().interactive_image(self._slicer.image())
+        if image is None:
+            return
+        if not self._interactive_slicer or self._interactive_slicer.image() is not image:
+            self._interactive_slicer = ImageSlicer(image)
+        self._interactive_buffer = self._allocate_buffer(self._interactive_slicer, self._interactive_slice_image)
+        self._interacting = True
+        self._actor.GetMapper().SetInputData(self._interactive_slice_image)
+        self.set_slice_index(self._slice_index)
+
+    def _end_interaction(self):
+        self._scroll_timer.stop()
+        if self._interacting:
+            self._interacting = False
+            self._actor.GetMapper().SetInputData(self._slice_image)
+            self.set_slice_index(self._slice_index)
+
+    def _interactive_slice_index(self, index):
+        # The slice of the coarse level which is the closest to the full slice.
+        axis = self._normal_axes[self._plane]
+        image = self._slicer.image()
+        position = image.GetOrigin()[axis] + index * image.GetSpacing()[axis]
+        interactive_image = self._interactive_slicer.image()
+        interactive_index = round((position - interactive_image.GetOrigin()[axis])
+                                  / interactive_image.GetSpacing()[axis])
+        return min(max(interactive_index, 0), self._interactive_slicer.slice_count(self._plane) - 1)
+
+    def _allocate_buffer(self, slicer, slice_image):
+        shape = slicer.slice_shape(self._plane)
+        scalars = slicer.image().GetPointData().GetScalars()
+        buffer = numpy.empty(shape, dtype=numpy_support.get_numpy_array_type(scalars.GetDataType()))
+        slice_image.SetDimensions(shape[1], shape[0], 1)
+        slice_image.SetSpacing(*slicer.slice_spacing(self._plane), 1.0)
+        slice_image.SetOrigin(*slicer.slice_origin(self._plane), 0.0)
+        slice_image.GetPointData().SetScalars(
+            numpy_support.numpy_to_vtk(buffer.reshape(shape[0] * shape[1], -1), deep=False))
+        return buffer
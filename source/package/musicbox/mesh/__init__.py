@@ -6,10 +6,11 @@ import numpy
 import vtk
 from vtk.util import numpy_support
 
-from .primitive import box
+from .primitive import box, cone, cylinder, sphere, torus, tube
+from .spatial_index import SpatialIndex, spatial_index
 
 
-def create(arg_1, *, vertices=None, lines=None, triangles=None, strips=None):
+def create(arg_1, *, vertices=None, lines=None, triangles=None, strips=None, share=False):
     """Create a VTK mesh.
 
     Args:
@@ -38,6 +39,12 @@ def create(arg_1, *, vertices=None, lines=None, triangles=None, strips=None):
                    successive x1, y1, z1, x2, y2, z2 etc. values of the points
                    when the array is flattened to one dimension. In the case of a
                    number, the created array will be filled with zeroes.
+        strips:    An initializer defining the triangle strips of the mesh.
+        share:     If True, the mesh wraps the buffers of the point and cell
+                   arrays instead of copying them (see create_vtk_cell_array).
+                   Points are wrapped when they are contiguous float32 or
+                   float64 values, other arrays are converted first. A
+                   vtkPolyData initializer is shallow copied.
 
     Returns:
         A new instance of vtk.vtkPolyData.
@@ -46,27 +53,75 @@ def create(arg_1, *, vertices=None, lines=None, triangles=None, strips=None):
     mesh = vtk.vtkPolyData()
 
     if isinstance(arg_1, vtk.vtkPolyData):
-        if vertices or lines or polygons or strips:
+        if any(arg is not None for arg in (vertices, lines, triangles, strips)):
             _raise_no_other_argument_needed_error(arg_1)
+        if share:
+            mesh.ShallowCopy(arg_1)
+        else:
+            mesh.DeepCopy(arg_1)
     else:
         mesh.SetPoints(vtk.vtkPoints())
 
         if isinstance(arg_1, vtk.vtkDataArray):
-            mesh.GetPoints().DeepCopy(arg_1)
-        elif isinstance(arg_1, numpy.ndarray):
-            point_array = numpy_support.numpy_to_vtk(num_array=arg_1.reshape(-1), deep=True)
-            mesh.GetPoints().SetData(point_array)
+            arg_1 = numpy_support.vtk_to_numpy(arg_1)
+        if isinstance(arg_1, numpy.ndarray):
+            point_type = numpy.result_type(arg_1.dtype, numpy.float32)
+            mesh.GetPoints().SetData(_vtk_array(arg_1.reshape(-1, 3), point_type, share))
         else:
             mesh.GetPoints().SetNumberOfPoints(arg_1)
 
-        if vertices:
-            mesh.SetVertices(create_vtk_cell_array(vertices, cell_size=1))
-        if lines:
-            mesh.SetLines(create_vtk_cell_array(lines, cell_size=2))
-        if triangles:
-            mesh.SetPolys(create_vtk_cell_array(triangles, cell_size=3))
-        if strips:
-            mesh.SetStrips(create_vtk_cell_array(strips, cell_size=3))
+        if vertices is not None:
+            mesh.SetVerts(create_vtk_cell_array(vertices, cell_size=1, share=share))
+        if lines is not None:
+            mesh.SetLines(create_vtk_cell_array(lines, cell_size=2, share=share))
+        if triangles is not None:
+            mesh.SetPolys(create_vtk_cell_array(triangles, cell_size=3, share=share))
+        if strips is not None:
+            mesh.SetStrips(create_vtk_cell_array(strips, cell_size=3, share=share))
+    return mesh
+
+
+def concatenate(meshes, *, segment_ids=None, segment_array_name='SegmentId'):
+    """Create a single VTK mesh from many triangle meshes.
+
+    The points and triangles of all the meshes are concatenated at once, and
+    the point indices of each mesh are offset by the number of points of the
+    preceding meshes. The resulting mesh can be displayed with a single actor
+    instead of one per mesh.
+
+    Args:
+        meshes:             A sequence of (points, triangles) tuples of numpy
+                            arrays, with the shapes (N, 3) and (M, 3).
+        segment_ids:        The identifier of each mesh (the default is its
+                            position in 'meshes').
+        segment_array_name: The name of the cell data array containing the
+                            identifier of the mesh of each triangle.
+
+    Returns:
+        A new instance of vtk.vtkPolyData.
+
+    """
+    meshes = [(numpy.asarray(points).reshape(-1, 3), numpy.asarray(triangles).reshape(-1, 3))
+              for points, triangles in meshes]
+    if segment_ids is None:
+        segment_ids = numpy.arange(len(meshes))
+    elif len(segment_ids) != len(meshes):
+        raise ValueError(f'Cannot assign {len(segment_ids)} segment ids to {len(meshes)} meshes.')
+
+    point_counts = numpy.array([len(points) for points, _ in meshes], dtype=numpy.int64)
+    triangle_counts = numpy.array([len(triangles) for _, triangles in meshes], dtype=numpy.int64)
+    point_offsets = numpy.cumsum(point_counts) - point_counts
+
+    points = numpy.concatenate([points for points, _ in meshes] or [numpy.empty((0, 3), numpy.float32)])
+    triangles = numpy.concatenate([triangles for _, triangles in meshes] or [numpy.empty((0, 3), numpy.int64)])
+    index_type = numpy.int32 if points.shape[0] <= numpy.iinfo(numpy.int32).max else numpy.int64
+    triangles = triangles.astype(index_type)
+    triangles += numpy.repeat(point_offsets, triangle_counts).astype(index_type)[:, numpy.newaxis]
+
+    mesh = create(points, triangles=triangles, share=True)
+    segment_array = numpy_support.numpy_to_vtk(numpy.repeat(numpy.asarray(segment_ids), triangle_counts), deep=True)
+    segment_array.SetName(segment_array_name)
+    mesh.GetCellData().AddArray(segment_array)
     return mesh
 
 
@@ -74,9 +129,14 @@ def _raise_no_other_argument_needed_error(arg_1):
     raise TypeError(f'No additional argument is accepted with {type(arg_1)} as an initializer.')
 
 
-def create_vtk_cell_array(arg, *, cell_size=None):
+def create_vtk_cell_array(arg, *, cell_size=None, share=False):
     """Create a VTK cell array.
 
+    The cells of vtkDataArray and numpy initializers are stored with the
+    offsets/connectivity layout of VTK: the connectivity is the flattened
+    array of point indices and the offsets are implicit (all the cells have
+    the same size).
+
     Args:
         arg:       An initializer for the array that can be a vtkCellArray,
                    a vtkDataArray, a numpy array or the number of cells. The
@@ -85,6 +145,11 @@ def create_vtk_cell_array(arg, *, cell_size=None):
                    types).
         cell_size: When the first argument is a number, this argument must be
                    used to specify the cell size.
+        share:     If True, the connectivity of the created array wraps the
+                   buffer of 'arg' instead of copying it, and keeps 'arg' alive
+                   for as long as it is used. This requires contiguous int32 or
+                   int64 indices, other arrays are converted to int64 first. A
+                   vtkCellArray initializer is shallow copied.
 
     Returns:
         A new instance of vtk.vtkCellArray.
@@ -93,17 +158,35 @@ def create_vtk_cell_array(arg, *, cell_size=None):
     cell_array = vtk.vtkCellArray()
 
     if isinstance(arg, vtk.vtkCellArray):
-        cell_array.DeepCopy(arg)
+        if share:
+            cell_array.ShallowCopy(arg)
+        else:
+            cell_array.DeepCopy(arg)
     else:
         if isinstance(arg, vtk.vtkDataArray):
-            connectivity = vtk.vtkDataArray()
-            connectivity.DeepCopy(arg)
-            connectivity.SetNumberOfComponents(1)
-            cell_array.SetData(arg.GetNumberOfComponents(), connectivity)
-        elif isinstance(arg, numpy.ndarray):
-            connectivity = numpy_support.numpy_to_vtk(num_array=arg.reshape(-1), deep=True)
-            cell_array.SetData(arg.shape[1], connectivity)
+            arg = numpy_support.vtk_to_numpy(arg).reshape(arg.GetNumberOfTuples(), arg.GetNumberOfComponents())
+        if isinstance(arg, numpy.ndarray):
+            if arg.ndim != 2:
+                raise TypeError(f'Cell arrays must be created from 2D arrays of point indices (one row per cell), '
+                                f'got an array of shape {arg.shape}.')
+            if arg.dtype.type in (numpy.int32, numpy.int64):
+                index_type = arg.dtype.newbyteorder('=')
+            else:
+                index_type = numpy.dtype(numpy.int64)
+            array_type = vtk.VTK_TYPE_INT32 if index_type.itemsize == 4 else vtk.VTK_TYPE_INT64
+            cell_array.SetData(arg.shape[1], _vtk_array(arg.reshape(-1), index_type, share, array_type))
         else:
             cell_array.ResizeExact(arg, arg * cell_size)
 
     return cell_array
+
+
+def _vtk_array(np_array, data_type, share, array_type=None):
+    """Convert a numpy array to a VTK array of the given type.
+
+    When sharing, the array is only copied if it does not have the given type
+    or is not contiguous. The VTK array keeps the numpy buffer alive.
+
+    """
+    np_array = numpy.ascontiguousarray(np_array, dtype=data_type)
+    return numpy_support.numpy_to_vtk(num_array=np_array, deep=not share, array_type=array_type)
@@ -0,0 +1,54 @@
+# Copyright (c) 2024 IHU Liryc, Université de Bordeaux, Inria.
+# License: BSD-3-Clause
+
+
+from musicbox.core.benchmark import BenchmarkCase
+from . import *
+
+
+def benchmark_cases(sizes):
+    for point_type in (numpy.float32, numpy.float64):
+        for index_type in (numpy.int32, numpy.int64):
+            for size in sizes:
+                yield from _mesh_cases(numpy.dtype(point_type), numpy.dtype(index_type), size)
+    for size in sizes:
+        yield from _concatenation_cases(size)
+
+
+def _mesh_cases(point_type, index_type, size):
+    # Closed triangle meshes have about twice as many triangles as points.
+    point_count = max(size // (3 * point_type.itemsize + 6 * index_type.itemsize), 3)
+    triangle_count = 2 * point_count
+    points_size = 3 * point_count * point_type.itemsize
+    triangles_size = 3 * triangle_count * index_type.itemsize
+    parameters = {'point_type': point_type.name, 'index_type': index_type.name}
+
+    def new_triangles():
+        return numpy.random.randint(point_count, size=(triangle_count, 3)).astype(index_type)
+
+    def new_mesh_arrays():
+        return numpy.random.rand(point_count, 3).astype(point_type), new_triangles()
+
+    return [
+        BenchmarkCase('mesh.create', lambda p, t: create(p, triangles=t), setup=new_mesh_arrays,
+                      parameters=parameters, size=points_size + triangles_size),
+        BenchmarkCase('mesh.create', lambda p, t: create(p, triangles=t, share=True), setup=new_mesh_arrays,
+                      parameters={**parameters, 'share': True}, size=points_size + triangles_size),
+        BenchmarkCase('create_vtk_cell_array', create_vtk_cell_array, setup=lambda: (new_triangles(),),
+                      parameters=parameters, size=triangles_size),
+    ]
+
+
+def _concatenation_cases(size):
+    mesh_count = 100
+    # float32 points and two int64 triangles per point.
+    point_count = max(size // (mesh_count * 60), 3)
+    triangle_count = 2 * point_count
+
+    def new_meshes():
+        return ([(numpy.random.rand(point_count, 3).astype(numpy.float32),
+                  numpy.random.randint(point_count, size=(triangle_count, 3)))
+                 for i in range(mesh_count)],)
+
+    return [BenchmarkCase('mesh.concatenate', concatenate, setup=new_meshes,
+                          parameters={'mesh_count': mesh_count}, size=size)]
@@ -0,0 +1,43 @@
+# Copyright (c) 2024 IHU Liryc, Université de Bordeaux, Inria.
+# License: BSD-3-Clause
+
+
+from musicbox.core.benchmark import BenchmarkCase
+from . import *
+
+
+# The queries are much slower than the creation of meshes, so the largest
+# sizes are skipped.
+max_query_size = 2**20
+
+
+def benchmark_cases(sizes):
+    sphere = vtk.vtkSphereSource()
+    sphere.SetThetaResolution(300)
+    sphere.SetPhiResolution(300)
+    sphere.Update()
+    mesh = sphere.GetOutput()
+
+    yield BenchmarkCase('SpatialIndex', SpatialIndex, setup=lambda: (mesh,),
+                        parameters={'triangles': mesh.GetNumberOfCells()})
+
+    for size in sizes:
+        if size <= max_query_size:
+            yield from _query_cases(SpatialIndex(mesh), size)
+
+
+def _query_cases(index, size):
+    point_count = max(size // 24, 1)
+
+    def new_points():
+        # Points close to the surface of the sphere (of radius 0.5).
+        directions = numpy.random.randn(point_count, 3)
+        directions /= numpy.linalg.norm(directions, axis=1)[:, numpy.newaxis]
+        return (directions * (0.5 + 0.01 * numpy.random.randn(point_count, 1)),)
+
+    return [
+        BenchmarkCase('SpatialIndex.closest_points', index.closest_points, setup=new_points, size=size),
+        BenchmarkCase('SpatialIndex.ray_intersect', lambda points: index.ray_intersect(points, -points),
+                      setup=new_points, size=size),
+        BenchmarkCase('SpatialIndex.contains', index.contains, setup=new_points, size=size),
+    ]
@@ -2,8 +2,291 @@
 # License: BSD-3-Clause
 
 
-import vtk
+import functools
 
+import numpy
 
-def box(size=(1, 1, 1)):
-    return vtk.vtkCubeSource()
+
+def box(size=(1, 1, 1), *, center=(0, 0, 0)):
+    """Create a box mesh.
+
+    Args:
+        size:   The length of the box along each axis.
+        center: The center of the box, or an array of shape (N, 3) to create a
+                single mesh containing N boxes (see _create_mesh).
+
+    Returns:
+        A new instance of vtk.vtkPolyData.
+
+    """
+    return _create_mesh(*_box_arrays(tuple(float(s) for s in size)), center)
+
+
+def sphere(radius=0.5, *, center=(0, 0, 0), theta_resolution=16, phi_resolution=16):
+    """Create a sphere mesh.
+
+    Args:
+        radius:           The radius of the sphere.
+        center:           See box.
+        theta_resolution: The number of points around the z axis.
+        phi_resolution:   The number of points from pole to pole (included).
+
+    Returns:
+        A new instance of vtk.vtkPolyData.
+
+    """
+    return _create_mesh(*_sphere_arrays(float(radius), theta_resolution, phi_resolution), center)
+
+
+def cylinder(radius=0.5, height=1, *, center=(0, 0, 0), resolution=16, capping=True):
+    """Create a cylinder mesh along the z axis.
+
+    Args:
+        radius,
+        height:     The dimensions of the cylinder.
+        center:     See box.
+        resolution: The number of points around the axis.
+        capping:    Close the ends of the cylinder.
+
+    Returns:
+        A new instance of vtk.vtkPolyData.
+
+    """
+    return _create_mesh(*_cylinder_arrays(float(radius), float(radius), float(height), resolution, capping), center)
+
+
+def cone(radius=0.5, height=1, *, center=(0, 0, 0), resolution=16, capping=True):
+    """Create a cone mesh along the z axis, with the apex at the top.
+
+    Args:
+        radius,
+        height:     The dimensions of the cone.
+        center:     See box (the center is halfway between the base and the
+                    apex).
+        resolution: The number of points around the axis.
+        capping:    Close the base of the cone.
+
+    Returns:
+        A new instance of vtk.vtkPolyData.
+
+    """
+    return _create_mesh(*_cylinder_arrays(float(radius), 0.0, float(height), resolution, capping), center)
+
+
+def torus(ring_radius=0.5, cross_section_radius=0.1, *, center=(0, 0, 0), resolution=16,
+          cross_section_resolution=8):
+    """Create a torus mesh around the z axis.
+
+    Args:
+        ring_radius:              The distance from the center of the torus
+                                  to the center of the tube.
+        cross_section_radius:     The radius of the tube.
+        center:                   See box.
+        resolution:               The number of points around the z axis.
+        cross_section_resolution: The number of points around the tube.
+
+    Returns:
+        A new instance of vtk.vtkPolyData.
+
+    """
+    arrays = _torus_arrays(float(ring_radius), float(cross_section_radius), resolution, cross_section_resolution)
+    return _create_mesh(*arrays, center)
+
+
+def tube(points, radius=0.1, *, resolution=8, capping=False):
+    """Create a tube mesh along a polyline.
+
+    Args:
+        points:     The points of the polyline, as an array of shape (N, 3).
+        radius:     The radius of the tube.
+        resolution: The number of points around the polyline.
+        capping:    Close the ends of the tube.
+
+    Returns:
+        A new instance of vtk.vtkPolyData.
+
+    """
+    points = numpy.asarray(points, dtype=numpy.float64).reshape(-1, 3)
+    # Consecutive duplicate points have no direction.
+    if len(points) > 0:
+        points = points[numpy.concatenate(([True], numpy.any(numpy.diff(points, axis=0) != 0, axis=1)))]
+    if len(points) < 2:
+        raise ValueError('A tube requires at least 2 distinct points.')
+
+    segments = numpy.diff(points, axis=0)
+    segments /= numpy.linalg.norm(segments, axis=1)[:, numpy.newaxis]
+    tangents = numpy.concatenate((segments[:1], segments[:-1] + segments[1:], segments[-1:]))
+    lengths = numpy.linalg.norm(tangents, axis=1)
+    # The tangent of a U-turn is the direction of the incoming segment.
+    u_turns = numpy.flatnonzero(lengths < 1e-12)
+    tangents[u_turns], lengths[u_turns] = segments[u_turns - 1], 1.0
+    tangents /= lengths[:, numpy.newaxis]
+
+    normals = _transported_normals(points, tangents)
+    binormals = numpy.cross(normals, tangents)
+
+    angles = numpy.linspace(0, 2 * numpy.pi, resolution, endpoint=False)
+    circle = numpy.cos(angles)[:, numpy.newaxis, numpy.newaxis] * normals + \
+        numpy.sin(angles)[:, numpy.newaxis, numpy.newaxis] * binormals
+    tube_points = (points + radius * circle).transpose(1, 0, 2).reshape(-1, 3)
+    triangles = _grid_triangles(len(points), resolution, wrap_rows=False)
+
+    if capping:
+        first_center = len(tube_points)
+        tube_points = numpy.concatenate((tube_points, points[[0, -1]]))
+        ring = numpy.arange(resolution)
+        triangles = numpy.concatenate((triangles,
+                                       _fan_triangles(first_center, ring),
+                                       _fan_triangles(first_center + 1, (len(points) - 1) * resolution + ring[::-1])))
+
+    return _create_mesh(tube_points, triangles, (0, 0, 0))
+
+
+@functools.lru_cache(maxsize=128)
+def _box_arrays(size):
+    corners = numpy.array([[x, y, z] for z in (-0.5, 0.5) for y in (-0.5, 0.5) for x in (-0.5, 0.5)])
+    triangles = numpy.array([
+        [0, 2, 1], [1, 2, 3],  # -z
+        [4, 5, 6], [5, 7, 6],  # +z
+        [0, 1, 4], [1, 5, 4],  # -y
+        [2, 6, 3], [3, 6, 7],  # +y
+        [0, 4, 2], [2, 4, 6],  # -x
+        [1, 3, 5], [3, 7, 5],  # +x
+    ])
+    return _read_only(corners * size), _read_only(triangles)
+
+
+@functools.lru_cache(maxsize=128)
+def _sphere_arrays(radius, theta_resolution, phi_resolution):
+    theta = numpy.linspace(0, 2 * numpy.pi, theta_resolution, endpoint=False)
+    phi = numpy.linspace(0, numpy.pi, phi_resolution)[1:-1]
+    rings = numpy.stack((numpy.outer(numpy.sin(phi), numpy.cos(theta)),
+                         numpy.outer(numpy.sin(phi), numpy.sin(theta)),
+                         numpy.repeat(numpy.cos(phi), theta_resolution).reshape(len(phi), -1)), axis=-1)
+    points = numpy.concatenate((rings.reshape(-1, 3), [[0, 0, 1], [0, 0, -1]])) * radius
+
+    ring = numpy.arange(theta_resolution)
+    north, south = len(points) - 2, len(points) - 1
+    triangles = numpy.concatenate((_grid_triangles(len(phi), theta_resolution, wrap_rows=False),
+                                   _fan_triangles(north, ring),
+                                   _fan_triangles(south, (len(phi) - 1) * theta_resolution + ring[::-1])))
+    return _read_only(points), _read_only(triangles)
+
+
+@functools.lru_cache(maxsize=128)
+def _cylinder_arrays(bottom_radius, top_radius, height, resolution, capping):
+    """The arrays of a cylinder, or of a cone if the top radius is 0.
+
+    """
+    angles = numpy.linspace(0, 2 * numpy.pi, resolution, endpoint=False)
+    circle = numpy.stack((numpy.cos(angles), numpy.sin(angles), numpy.zeros(resolution)), axis=-1)
+    ring = numpy.arange(resolution)
+    top_center, bottom_center = [0, 0, height / 2], [0, 0, -height / 2]
+
+    if top_radius > 0:
+        points = numpy.concatenate((circle * top_radius + top_center, circle * bottom_radius + bottom_center,
+                                    [top_center, bottom_center]))
+        triangles = [_grid_triangles(2, resolution, wrap_rows=False)]
+        if capping:
+            triangles.append(_fan_triangles(2 * resolution, ring))
+        bottom_ring = resolution + ring
+    else:
+        points = numpy.concatenate((circle * bottom_radius + bottom_center, [top_center, bottom_center]))
+        triangles = [_fan_triangles(resolution, ring)]
+        bottom_ring = ring
+
+    if capping:
+        triangles.append(_fan_triangles(len(points) - 1, bottom_ring[::-1]))
+    return _read_only(points), _read_only(numpy.concatenate(triangles))
+
+
+@functools.lru_cache(maxsize=128)
+def _torus_arrays(ring_radius, cross_section_radius, resolution, cross_section_resolution):
+    theta = numpy.linspace(0, 2 * numpy.pi, resolution, endpoint=False)[:, numpy.newaxis]
+    phi = numpy.linspace(0, 2 * numpy.pi, cross_section_resolution, endpoint=False)
+    distance = ring_radius + cross_section_radius * numpy.cos(phi)
+    height = numpy.broadcast_to(cross_section_radius * numpy.sin(phi), (resolution, cross_section_resolution))
+    points = numpy.stack((distance * numpy.cos(theta), distance * numpy.sin(theta), height), axis=-1)
+    triangles = _grid_triangles(resolution, cross_section_resolution, wrap_rows=True)
+    return _read_only(points.reshape(-1, 3)), _read_only(triangles)
+
+
+def _transported_normals(points, tangents):
+    """The normals of rotation minimizing frames along a polyline.
+
+    The first normal is the projection of the axis which is the least aligned
+    with the first tangent, and each normal is carried to the next point by
+    two reflections (the double reflection method of Wang et al.), which
+    avoids twisting the tube.
+
+    """
+    normals = numpy.empty_like(tangents)
+    reference = numpy.identity(3)[numpy.argmin(numpy.abs(tangents[0]))]
+    normal = reference - tangents[0] * (tangents[0] @ reference)
+    normals[0] = normal / numpy.linalg.norm(normal)
+
+    for i in range(len(points) - 1):
+        v1 = points[i + 1] - points[i]
+        c1 = v1 @ v1
+        normal = normals[i] - 2 / c1 * (v1 @ normals[i]) * v1
+        tangent = tangents[i] - 2 / c1 * (v1 @ tangents[i]) * v1
+        v2 = tangents[i + 1] - tangent
+        c2 = v2 @ v2
+        if c2 > 0:
+            normal -= 2 / c2 * (v2 @ normal) * v2
+        length = numpy.linalg.norm(normal)
+        # The previous frame is kept if the reflections degenerate.
+        normals[i + 1] = normal / length if length > 1e-12 else normals[i]
+
+    return normals
+
+
+def _grid_triangles(row_count, column_count, *, wrap_rows):
+    """The triangles of a grid of points whose columns wrap around.
+
+    The points are stored row by row. Consecutive rows are connected, as well
+    as the last and first rows if 'wrap_rows' is True.
+
+    """
+    rows = numpy.arange(row_count if wrap_rows else row_count - 1)[:, numpy.newaxis]
+    columns = numpy.arange(column_count)
+    a = rows * column_count + columns
+    b = rows * column_count + (columns + 1) % column_count
+    c = (rows + 1) % row_count * column_count + columns
+    d = (rows + 1) % row_count * column_count + (columns + 1) % column_count
+    return numpy.concatenate((numpy.stack((a, c, b), axis=-1).reshape(-1, 3),
+                              numpy.stack((b, c, d), axis=-1).reshape(-1, 3)))
+
+
+def _fan_triangles(center, ring):
+    """The triangles joining a point to a closed ring of points.
+
+    The triangles face the side from which the ring is counterclockwise.
+
+    """
+    return numpy.stack((numpy.full(len(ring), center), ring, numpy.roll(ring, -1)), axis=-1)
+
+
+def _read_only(array):
+    array.flags.writeable = False
+    return array
+
+
+def _create_mesh(points, triangles, center):
+    """Create a mesh from the arrays of a primitive.
+
+    If 'center' is an array of shape (N, 3), the mesh contains N copies of the
+    primitive and a 'SegmentId' cell array with the index of the copy of each
+    triangle (see concatenate).
+
+    """
+    from . import concatenate, create
+
+    center = numpy.asarray(center, dtype=numpy.float64)
+
+    if center.ndim == 1:
+        # The cached triangles are copied, since the mesh connectivity can be
+        # modified through VTK even though the array is read-only.
+        return create(points + center, triangles=triangles.copy(), share=True)
+
+    return concatenate([(copy_points, triangles) for copy_points in points + center[:, numpy.newaxis]])
@@ -0,0 +1,261 @@
+# Copyright (c) 2024 IHU Liryc, Université de Bordeaux, Inria.
+# License: BSD-3-Clause
+
+
+from concurrent.futures import ThreadPoolExecutor
+import os
+
+import numpy
+import vtk
+from vtk.util import numpy_support
+
+
+class SpatialIndex():
+    """Spatial index of the triangles of a mesh, for batches of queries.
+
+    The queries are answered by a vtkStaticCellLocator built over the
+    triangles of the mesh. VTK has no batched version of the locator
+    queries, so the points and rays are passed one by one, but the locator
+    releases the GIL: the chunks of 'chunk_size' queries are processed
+    concurrently by 'max_workers' threads sharing the locator.
+
+    The index describes the mesh at the time it was built. Use 'spatial_index'
+    to get an index which is rebuilt when the mesh is modified.
+
+    """
+
+    chunk_size = 2**14
+
+    def __init__(self, mesh, *, max_workers=None):
+        """
+        Args:
+            mesh:        A vtkPolyData. Its polygons and triangle strips are
+                         triangulated, the other cells are ignored.
+            max_workers: The maximum number of threads processing the chunks
+                         of the queries (the default is the number of
+                         processors).
+
+        """
+        from . import create
+
+        self._mtime = mesh.GetMTime()
+        self._max_workers = max_workers or os.cpu_count()
+
+        points, triangles, self._cell_ids = _triangles(mesh)
+        if len(triangles) == 0:
+            raise ValueError('Cannot build a spatial index for a mesh without polygons.')
+
+        # Cell i of the locator is the triangle i of the index.
+        self._mesh = create(points, triangles=triangles, share=True)
+        self._locator = vtk.vtkStaticCellLocator()
+        self._locator.SetDataSet(self._mesh)
+        self._locator.BuildLocator()
+        bounds = numpy.array(self._mesh.GetBounds())
+        self._lower = bounds[0::2]
+        self._upper = bounds[1::2]
+
+    def mtime(self):
+        """The modification time of the mesh when the index was built.
+
+        """
+        return self._mtime
+
+    def closest_points(self, points):
+        """Find the closest points of the mesh surface.
+
+        Args:
+            points: An array of shape (N, 3).
+
+        Returns:
+            A tuple (closest_points, cell_ids, distances) of arrays of shape
+            (N, 3), (N,) and (N,), where 'cell_ids' contains the ids of the
+            cells of the mesh on which the closest points lie.
+
+        """
+        points = _point_array(points)
+        return self._map_chunks(self._closest_points, points)
+
+    def ray_intersect(self, origins, directions):
+        """Find the first intersections of rays with the mesh surface.
+
+        Args:
+            origins:    The origins of the rays, as an array of shape (N, 3).
+            directions: The directions of the rays, as an array of shape
+                        (N, 3) (or (3,) for a common direction).
+
+        Returns:
+            A tuple (intersections, cell_ids, distances) of arrays of shape
+            (N, 3), (N,) and (N,). Rays which do not intersect the surface have
+            NaN intersections and distances and a cell id of -1.
+
+        """
+        origins = _point_array(origins)
+        directions = numpy.broadcast_to(numpy.asarray(directions, dtype=numpy.float64), origins.shape)
+        with numpy.errstate(divide='ignore', invalid='ignore'):
+            directions = directions / numpy.linalg.norm(directions, axis=1)[:, numpy.newaxis]
+        return self._map_chunks(self._ray_intersect, origins, directions)
+
+    def contains(self, points):
+        """Test whether points are inside the mesh.
+
+        The mesh must be a closed surface. A point is inside if a ray cast
+        from it intersects the surface an odd number of times.
+
+        Args:
+            points: An array of shape (N, 3).
+
+        Returns:
+            A boolean array of shape (N,).
+
+        """
+        points = _point_array(points)
+        inside = numpy.all((points >= self._lower) & (points <= self._upper), axis=1)
+        candidates = numpy.flatnonzero(inside)
+        inside[candidates] = self._map_chunks(self._count_intersections, points[candidates]) % 2 == 1
+        return inside
+
+    def _map_chunks(self, function, *arrays):
+        """Apply a query to chunks of the arrays in parallel.
+
+        """
+        chunks = zip(*(_chunks(array, self.chunk_size) for array in arrays))
+        if len(arrays[0]) <= self.chunk_size or self._max_workers == 1:
+            results = [function(*chunk) for chunk in chunks]
+        else:
+            with ThreadPoolExecutor(max_workers=self._max_workers, thread_name_prefix="MusicBox Spatial Index") as executor:
+                results = list(executor.map(lambda chunk: function(*chunk), chunks))
+        if isinstance(results[0], tuple):
+            return tuple(numpy.concatenate(arrays) for arrays in zip(*results))
+        return numpy.concatenate(results)
+
+    def _closest_points(self, points):
+        # The cells and references are not shared between the threads.
+        cell = vtk.vtkGenericCell()
+        point, triangle, sub_id, squared_distance = [0.0, 0.0, 0.0], vtk.reference(0), vtk.reference(0), vtk.reference(0.0)
+        closest = numpy.empty(points.shape)
+        triangles = numpy.empty(len(points), dtype=numpy.int64)
+        squared_distances = numpy.empty(len(points))
+        for i, x in enumerate(points.tolist()):
+            self._locator.FindClosestPoint(x, point, cell, triangle, sub_id, squared_distance)
+            closest[i], triangles[i], squared_distances[i] = point, triangle, squared_distance
+        return closest, self._cell_ids[triangles], numpy.sqrt(squared_distances)
+
+    def _ray_intersect(self, origins, directions):
+        # The locator intersects segments, which end where the rays leave the
+        # bounding box of the mesh.
+        entries, exits = self._box_crossings(origins, directions)
+        ends = origins + directions * exits[:, numpy.newaxis]
+
+        cell = vtk.vtkGenericCell()
+        t, point, parametric_point = vtk.reference(0.0), [0.0, 0.0, 0.0], [0.0, 0.0, 0.0]
+        sub_id, triangle = vtk.reference(0), vtk.reference(0)
+        intersections = numpy.full(origins.shape, numpy.nan)
+        triangles = numpy.full(len(origins), -1, dtype=numpy.int64)
+        for i in numpy.flatnonzero(entries <= exits).tolist():
+            if self._locator.IntersectWithLine(origins[i].tolist(), ends[i].tolist(), 0.0, t, point,
+                                               parametric_point, sub_id, triangle, cell):
+                intersections[i], triangles[i] = point, triangle
+
+        found = triangles >= 0
+        distances = numpy.linalg.norm(intersections - origins, axis=1)
+        return intersections, numpy.where(found, self._cell_ids[triangles], -1), distances
+
+    def _count_intersections(self, origins):
+        # An arbitrary direction, unlikely to be aligned with the edges, whose
+        # signs are chosen towards the nearest faces of the bounding box to
+        # shorten the rays.
+        direction = numpy.array([0.5773, 0.5801, 0.5747])
+        signs = numpy.where(origins - self._lower < self._upper - origins, -1.0, 1.0)
+        directions = signs * (direction / numpy.linalg.norm(direction))
+        _, exits = self._box_crossings(origins, directions)
+        ends = origins + directions * exits[:, numpy.newaxis]
+
+        cell = vtk.vtkGenericCell()
+        points = vtk.vtkPoints()
+        cell_ids = vtk.vtkIdList()
+        counts = numpy.empty(len(origins), dtype=numpy.int64)
+        for i, (origin, end) in enumerate(zip(origins.tolist(), ends.tolist())):
+            self._locator.IntersectWithLine(origin, end, 0.0, points, cell_ids, cell)
+            counts[i] = points.GetNumberOfPoints()
+        return counts
+
+    def _box_crossings(self, origins, directions):
+        """The distances along the rays where they enter and leave the
+        bounding box of the mesh (slightly enlarged).
+
+        Returns an entry distance greater than the exit distance for the rays
+        which miss the box.
+
+        """
+        margin = 1e-6 * max(numpy.max(self._upper - self._lower), 1.0)
+        with numpy.errstate(divide='ignore', invalid='ignore'):
+            inverse_directions = 1 / directions
+            t_lower = (self._lower - margin - origins) * inverse_directions
+            t_upper = (self._upper + margin - origins) * inverse_directions
+        # fmin and fmax ignore the NaNs of rays lying in the plane of a face
+        # (and the rays without direction have NaN crossings).
+        entries = numpy.fmax(numpy.fmax.reduce(numpy.fmin(t_lower, t_upper), axis=1), 0)
+        exits = numpy.fmin.reduce(numpy.fmax(t_lower, t_upper), axis=1)
+        return entries, exits
+
+
+def spatial_index(mesh):
+    """The spatial index of a mesh.
+
+    The index is cached with the mesh and rebuilt when the modification time
+    of the mesh (which includes the modifications of its points and cells)
+    changes.
+
+    Args:
+        mesh: A vtkPolyData.
+
+    Returns:
+        An instance of SpatialIndex.
+
+    """
+    index = getattr(mesh, '_musicbox_spatial_index', None)
+    if index is None or index.mtime() != mesh.GetMTime():
+        index = SpatialIndex(mesh)
+        mesh._musicbox_spatial_index = index
+    return index
+
+
+def _triangles(mesh):
+    """The points, triangles and triangle cell ids of a mesh.
+
+    """
+    polys = mesh.GetPolys()
+    offsets = numpy_support.vtk_to_numpy(polys.GetOffsetsArray())
+
+    if mesh.GetNumberOfStrips() == 0 and numpy.all(numpy.diff(offsets) == 3):
+        triangles = numpy_support.vtk_to_numpy(polys.GetConnectivityArray()).reshape(-1, 3)
+        first_cell = mesh.GetNumberOfVerts() + mesh.GetNumberOfLines()
+        cell_ids = numpy.arange(first_cell, first_cell + len(triangles))
+    else:
+        copy = vtk.vtkPolyData()
+        copy.ShallowCopy(mesh)
+        cell_id_array = numpy_support.numpy_to_vtk(numpy.arange(mesh.GetNumberOfCells()), deep=True)
+        cell_id_array.SetName('_musicbox_cell_id')
+        copy.GetCellData().AddArray(cell_id_array)
+        triangle_filter = vtk.vtkTriangleFilter()
+        triangle_filter.PassVertsOff()
+        triangle_filter.PassLinesOff()
+        triangle_filter.SetInputData(copy)
+        triangle_filter.Update()
+        output = triangle_filter.GetOutput()
+        triangles = numpy_support.vtk_to_numpy(output.GetPolys().GetConnectivityArray()).reshape(-1, 3)
+        cell_ids = numpy_support.vtk_to_numpy(output.GetCellData().GetArray('_musicbox_cell_id'))
+
+    points = numpy_support.vtk_to_numpy(mesh.GetPoints().GetData()).astype(numpy.float64)
+    return points, triangles.astype(numpy.int64), numpy.asarray(cell_ids, dtype=numpy.int64)
+
+
+def _point_array(points):
+    points = numpy.asarray(points, dtype=numpy.float64)
+    if points.ndim != 2 or points.shape[1] != 3:
+        raise ValueError(f'Expected an array of shape (N, 3), got an array of shape {points.shape}.')
+    return points
+
+
+def _chunks(array, chunk_size):
+    return [array[i:i + chunk_size] for i in range(0, len(array), chunk_size)] or [array]
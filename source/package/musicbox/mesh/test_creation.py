@@ -12,3 +12,74 @@ class TestMeshCreation(unittest.TestCase):
     def test_output_is_vtk_poly_data(self):
         mesh = create(8, triangles=12)
         self.assertIsInstance(mesh, vtk.vtkPolyData)
+
+    def test_copy_of_poly_data(self):
+        mesh = create(numpy.random.rand(8, 3), triangles=numpy.random.randint(8, size=(12, 3)))
+        copy = create(mesh)
+        self.assertEqual(copy.GetNumberOfPoints(), 8)
+        self.assertEqual(copy.GetNumberOfCells(), 12)
+        copy.GetPoints().SetPoint(0, (1, 2, 3))
+        self.assertNotEqual(mesh.GetPoint(0), (1, 2, 3))
+
+    def test_vertices(self):
+        mesh = create(numpy.random.rand(4, 3), vertices=numpy.arange(4).reshape(4, 1))
+        self.assertEqual(mesh.GetNumberOfVerts(), 4)
+
+
+class TestSharedMeshCreation(unittest.TestCase):
+
+    def test_shared_buffers(self):
+        points = numpy.random.rand(8, 3).astype(numpy.float32)
+        triangles = numpy.random.randint(8, size=(12, 3)).astype(numpy.int64)
+        mesh = create(points, triangles=triangles, share=True)
+        self.assertTrue(numpy.shares_memory(numpy_support.vtk_to_numpy(mesh.GetPoints().GetData()), points))
+        self.assertTrue(numpy.shares_memory(numpy_support.vtk_to_numpy(mesh.GetPolys().GetConnectivityArray()),
+                                            triangles))
+
+    def test_buffers_are_kept_alive(self):
+        mesh = create(numpy.arange(24, dtype=numpy.float64).reshape(8, 3),
+                      triangles=numpy.arange(12, dtype=numpy.int32).reshape(4, 3), share=True)
+        self.assertEqual(mesh.GetPoint(7), (21.0, 22.0, 23.0))
+        self.assertEqual(mesh.GetCell(3).GetPointIds().GetId(2), 11)
+
+    def test_coercion(self):
+        points = numpy.arange(24, dtype=numpy.int32).reshape(8, 3)
+        triangles = numpy.arange(12, dtype=numpy.uint16).reshape(4, 3)
+        mesh = create(points, triangles=triangles, share=True)
+        self.assertEqual(mesh.GetPoints().GetDataType(), vtk.VTK_DOUBLE)
+        self.assertEqual(mesh.GetPolys().GetConnectivityArray().GetDataTypeSize(), 8)
+        self.assertEqual(mesh.GetCell(3).GetPointIds().GetId(2), 11)
+
+    def test_cell_array_from_vtk_data_array(self):
+        indices = numpy_support.numpy_to_vtk(numpy.arange(12).reshape(4, 3))
+        cell_array = create_vtk_cell_array(indices)
+        self.assertEqual(cell_array.GetNumberOfCells(), 4)
+        self.assertEqual(cell_array.GetMaxCellSize(), 3)
+
+    def test_cell_array_requires_2d_array(self):
+        with self.assertRaises(TypeError):
+            create_vtk_cell_array(numpy.arange(12))
+
+
+class TestMeshConcatenation(unittest.TestCase):
+
+    def test_concatenation(self):
+        tetrahedron = numpy.array([[0, 1, 2], [0, 1, 3], [0, 2, 3], [1, 2, 3]])
+        meshes = [(numpy.random.rand(4, 3) + i, tetrahedron) for i in range(3)]
+        mesh = concatenate(meshes, segment_ids=[10, 20, 30])
+        self.assertEqual(mesh.GetNumberOfPoints(), 12)
+        self.assertEqual(mesh.GetNumberOfCells(), 12)
+        self.assertEqual(mesh.GetCell(11).GetPointIds().GetId(2), 11)
+        numpy.testing.assert_array_equal(numpy_support.vtk_to_numpy(mesh.GetPoints().GetData())[8:], meshes[2][0])
+        segment_ids = numpy_support.vtk_to_numpy(mesh.GetCellData().GetArray('SegmentId'))
+        numpy.testing.assert_array_equal(segment_ids, numpy.repeat([10, 20, 30], 4))
+
+    def test_empty_concatenation(self):
+        mesh = concatenate([])
+        self.assertEqual(mesh.GetNumberOfPoints(), 0)
+        self.assertEqual(mesh.GetNumberOfCells(), 0)
+        self.assertEqual(mesh.GetCellData().GetArray('SegmentId').GetNumberOfTuples(), 0)
+
+    def test_wrong_segment_id_count(self):
+        with self.assertRaises(ValueError):
+            concatenate([(numpy.zeros((3, 3)), [[0, 1, 2]])], segment_ids=[1, 2])
@@ -0,0 +1,85 @@
+# Copyright (c) 2024 IHU Liryc, Université de Bordeaux, Inria.
+# License: BSD-3-Clause
+
+
+import unittest
+
+from . import *
+from .primitive import _sphere_arrays
+
+
+class TestPrimitives(unittest.TestCase):
+
+    def test_closed_surfaces(self):
+        curve = numpy.linspace(0, 4 * numpy.pi, 50)
+        meshes = {
+            'box': (box((1, 2, 3)), 6),
+            'sphere': (sphere(1, theta_resolution=64, phi_resolution=64), 4 / 3 * numpy.pi),
+            'cylinder': (cylinder(1, 2, resolution=64), 2 * numpy.pi),
+            'cone': (cone(1, 3, resolution=64), numpy.pi),
+            'torus': (torus(1, 0.25, resolution=64, cross_section_resolution=32), 2 * numpy.pi**2 / 16),
+            'tube': (tube(numpy.stack((numpy.cos(curve), numpy.sin(curve), curve / 5), axis=1), 0.1,
+                          resolution=32, capping=True), numpy.pi * 0.01 * 4 * numpy.pi * numpy.hypot(1, 0.2)),
+        }
+        for name, (mesh, volume) in meshes.items():
+            with self.subTest(name):
+                self.assertEqual(self._boundary_edge_count(mesh), 0)
+                # A positive volume means that the triangles face outwards.
+                self.assertAlmostEqual(self._volume(mesh) / volume, 1, places=1)
+
+    def test_box_size_and_center(self):
+        mesh = box((1, 2, 3), center=(1, 1, 1))
+        self.assertEqual(mesh.GetBounds(), (0.5, 1.5, 0.0, 2.0, -0.5, 2.5))
+
+    def test_multiple_centers(self):
+        centers = numpy.random.rand(100, 3)
+        mesh = sphere(0.1, center=centers, theta_resolution=8, phi_resolution=8)
+        single_sphere = sphere(0.1, theta_resolution=8, phi_resolution=8)
+        self.assertEqual(mesh.GetNumberOfPoints(), 100 * single_sphere.GetNumberOfPoints())
+        self.assertEqual(mesh.GetNumberOfCells(), 100 * single_sphere.GetNumberOfCells())
+        segment_ids = numpy_support.vtk_to_numpy(mesh.GetCellData().GetArray('SegmentId'))
+        numpy.testing.assert_array_equal(segment_ids, numpy.repeat(numpy.arange(100), single_sphere.GetNumberOfCells()))
+        points = numpy_support.vtk_to_numpy(mesh.GetPoints().GetData()).reshape(100, -1, 3)
+        numpy.testing.assert_allclose(points.mean(axis=1), centers, atol=1e-6)
+
+    def test_arrays_are_cached(self):
+        self.assertIs(_sphere_arrays(1.0, 8, 8), _sphere_arrays(1.0, 8, 8))
+        mesh = sphere(1.0, theta_resolution=8, phi_resolution=8)
+        bounds = mesh.GetBounds()
+        mesh.GetPoints().SetPoint(0, (5, 5, 5))
+        self.assertEqual(sphere(1.0, theta_resolution=8, phi_resolution=8).GetBounds(), bounds)
+        numpy_support.vtk_to_numpy(mesh.GetPolys().GetConnectivityArray())[:] = 0
+        connectivity = sphere(1.0, theta_resolution=8, phi_resolution=8).GetPolys().GetConnectivityArray()
+        numpy.testing.assert_array_equal(numpy_support.vtk_to_numpy(connectivity),
+                                         _sphere_arrays(1.0, 8, 8)[1].reshape(-1))
+
+    def test_tube_along_axes(self):
+        # The tangents are successively aligned with each axis.
+        points = [[0, 0, 0], [1, 0, 0], [1, 1, 0], [1, 2, 0], [1, 2, 1]]
+        mesh = tube(points, 0.1, resolution=8, capping=True)
+        tube_points = numpy_support.vtk_to_numpy(mesh.GetPoints().GetData())
+        self.assertTrue(numpy.isfinite(tube_points).all())
+        self.assertEqual(self._boundary_edge_count(mesh), 0)
+        self.assertGreater(self._volume(mesh), 0)
+
+    def test_tube_with_duplicate_points_and_u_turn(self):
+        points = [[0, 0, 0], [0, 0, 0], [1, 0, 0], [1, 0, 0], [0, 0, 0], [0, 1, 0]]
+        mesh = tube(points, 0.1, resolution=8)
+        tube_points = numpy_support.vtk_to_numpy(mesh.GetPoints().GetData())
+        self.assertEqual(len(tube_points), 4 * 8)
+        self.assertTrue(numpy.isfinite(tube_points).all())
+        with self.assertRaises(ValueError):
+            tube([[1, 2, 3], [1, 2, 3]])
+
+    def _volume(self, mesh):
+        points = numpy_support.vtk_to_numpy(mesh.GetPoints().GetData())
+        a, b, c = points[numpy_support.vtk_to_numpy(mesh.GetPolys().GetConnectivityArray()).reshape(-1, 3)].transpose(1, 0, 2)
+        return numpy.sum(numpy.einsum('ij,ij->i', a, numpy.cross(b, c))) / 6
+
+    def _boundary_edge_count(self, mesh):
+        edges = vtk.vtkFeatureEdges()
+        edges.SetInputData(mesh)
+        edges.FeatureEdgesOff()
+        edges.ManifoldEdgesOff()
+        edges.Update()
+        return edges.GetOutput().GetNumberOfCells()
@@ -0,0 +1,128 @@
+# Copyright (c) 2024 IHU Liryc, Université de Bordeaux, Inria.
+# License: BSD-3-Clause
+
+
+import unittest
+
+from . import *
+
+
+class TestSpatialIndex(unittest.TestCase):
+
+    def setUp(self):
+        sphere = vtk.vtkSphereSource()
+        sphere.SetThetaResolution(24)
+        sphere.SetPhiResolution(24)
+        sphere.Update()
+        self.mesh = sphere.GetOutput()
+        self.index = SpatialIndex(self.mesh)
+        self.points = numpy.random.default_rng(0).uniform(-1, 1, (200, 3))
+
+    def test_closest_points(self):
+        self._check_closest_points(self.index, self.points)
+
+    def test_interior_points(self):
+        # Many triangles are almost as close to the points near the center
+        # of the sphere as the closest one.
+        points = numpy.concatenate(([[0.0, 0.0, 0.0]], numpy.random.default_rng(1).uniform(-0.2, 0.2, (50, 3))))
+        self._check_closest_points(self.index, points)
+
+    def test_chunks(self):
+        index = SpatialIndex(self.mesh, max_workers=2)
+        index.chunk_size = 16
+        self._check_closest_points(index, self.points)
+        numpy.testing.assert_array_equal(index.contains(self.points), self.index.contains(self.points))
+        directions = numpy.random.default_rng(2).normal(size=self.points.shape)
+        numpy.testing.assert_allclose(index.ray_intersect(self.points, directions)[2],
+                                      self.index.ray_intersect(self.points, directions)[2])
+
+    def test_ray_intersect(self):
+        origins = numpy.array([[0.0, 0.0, 0.0], [2.0, 0.01, 0.02], [2.0, 0.0, 0.0]])
+        directions = numpy.array([[0.01, 0.02, 1.0], [-1.0, 0.0, 0.0], [1.0, 0.0, 0.0]])
+        intersections, cell_ids, distances = self.index.ray_intersect(origins, directions)
+        self.assertAlmostEqual(distances[0], 0.5, places=2)
+        self.assertAlmostEqual(distances[1], 1.5, places=2)
+        numpy.testing.assert_allclose(intersections[1], [2.0 - distances[1], 0.01, 0.02])
+        self.assertTrue(numpy.isnan(distances[2]))
+        self.assertEqual(cell_ids[2], -1)
+
+    def test_ray_without_direction(self):
+        intersections, cell_ids, distances = self.index.ray_intersect([[0.0, 0.0, 0.0]], [0.0, 0.0, 0.0])
+        self.assertTrue(numpy.isnan(distances[0]))
+        self.assertEqual(cell_ids[0], -1)
+
+    def test_contains(self):
+        radii = numpy.linalg.norm(self.points, axis=1)
+        inside = self.index.contains(self.points)
+        # The facets of the sphere are inside the sphere of radius 0.5.
+        self.assertTrue(numpy.all(inside[radii < 0.45]))
+        self.assertFalse(numpy.any(inside[radii > 0.5]))
+
+    def test_polygons_are_triangulated(self):
+        cube = vtk.vtkCubeSource()
+        cube.Update()
+        index = SpatialIndex(cube.GetOutput())
+        closest, cell_ids, distances = index.closest_points([[2.0, 0.1, 0.2], [0.1, 0.2, 0.4]])
+        numpy.testing.assert_allclose(closest, [[0.5, 0.1, 0.2], [0.1, 0.2, 0.5]])
+        numpy.testing.assert_allclose(distances, [1.5, 0.1])
+        self.assertLess(cell_ids.max(), cube.GetOutput().GetNumberOfCells())
+        self.assertTrue(numpy.all(index.contains([[0.0, 0.0, 0.0], [0.4, -0.4, 0.4]])))
+
+    def test_cached_index(self):
+        index = spatial_index(self.mesh)
+        self.assertIs(spatial_index(self.mesh), index)
+        self.mesh.GetPoints().Modified()
+        self.assertIsNot(spatial_index(self.mesh), index)
+
+    def test_mesh_without_polygons(self):
+        with self.assertRaises(ValueError):
+            SpatialIndex(create(numpy.zeros((3, 3)), lines=numpy.array([[0, 1], [1, 2]])))
+
+    def _check_closest_points(self, index, query_points):
+        closest, cell_ids, distances = index.closest_points(query_points)
+        points = numpy_support.vtk_to_numpy(self.mesh.GetPoints().GetData()).astype(numpy.float64)
+        triangles = points[numpy_support.vtk_to_numpy(self.mesh.GetPolys().GetConnectivityArray()).reshape(-1, 3)]
+        for point, distance in zip(query_points, distances):
+            candidates = _closest_points_on_triangles(numpy.tile(point, (len(triangles), 1)),
+                                                      triangles[:, 0], triangles[:, 1], triangles[:, 2])
+            self.assertAlmostEqual(distance, numpy.linalg.norm(candidates - point, axis=1).min())
+        numpy.testing.assert_allclose(numpy.linalg.norm(closest - query_points, axis=1), distances)
+        for point, cell_id in zip(closest, cell_ids):
+            cell_points = triangles[cell_id]
+            self.assertTrue(numpy.all(point >= cell_points.min(axis=0) - 1e-9))
+            self.assertTrue(numpy.all(point <= cell_points.max(axis=0) + 1e-9))
+
+
+def _closest_points_on_triangles(p, a, b, c):
+    """The closest points to p on the triangles (a, b, c) (Ericson, Real-Time
+    Collision Detection, 5.1.5).
+
+    """
+    def dot(u, v):
+        return numpy.einsum('ij,ij->i', u, v)
+
+    ab = b - a
+    ac = c - a
+    ap = p - a
+    d1, d2 = dot(ab, ap), dot(ac, ap)
+    ab_ab, ab_ac, ac_ac = dot(ab, ab), dot(ab, ac), dot(ac, ac)
+    d3, d4 = d1 - ab_ab, d2 - ab_ac
+    d5, d6 = d1 - ab_ac, d2 - ac_ac
+    va = d3 * d6 - d5 * d4
+    vb = d5 * d2 - d1 * d6
+    vc = d1 * d4 - d3 * d2
+
+    with numpy.errstate(divide='ignore', invalid='ignore'):
+        in_a = (d1 <= 0) & (d2 <= 0)
+        in_b = (d3 >= 0) & (d4 <= d3)
+        in_ab = (vc <= 0) & (d1 >= 0) & (d3 <= 0)
+        in_c = (d6 >= 0) & (d5 <= d6)
+        in_ac = (vb <= 0) & (d2 >= 0) & (d6 <= 0)
+        in_bc = (va <= 0) & (d4 - d3 >= 0) & (d5 - d6 >= 0)
+        bc = (d4 - d3) / ((d4 - d3) + (d5 - d6))
+        denominator = va + vb + vc
+        regions = [in_a, in_b, in_ab, in_c, in_ac, in_bc]
+        v = numpy.select(regions, [0, 1, d1 / (d1 - d3), 0, 0, 1 - bc], vb / denominator)
+        w = numpy.select(regions, [0, 0, 0, 1, d2 / (d2 - d6), bc], vc / denominator)
+
+    return a + ab * v[:, numpy.newaxis] + ac * w[:, numpy.newaxis]